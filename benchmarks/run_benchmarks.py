@@ -0,0 +1,984 @@
+# coding: UTF-8
+
+"""
+The benchmark suite of pconst. This runs offline with only the
+standard library, and saves the results as JSON so that regressions
+can be compared between commits.
+
+Examples
+--------
+Run all benchmarks and save the results (the file name will be the
+current git commit hash):
+
+$ python benchmarks/run_benchmarks.py
+
+Compare with the results of the other commit:
+
+$ python benchmarks/run_benchmarks.py --compare benchmarks/results/abc1234.json
+
+Run only the benchmarks whose names contain the specified text:
+
+$ python benchmarks/run_benchmarks.py --filter freeze
+"""
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from copy import deepcopy
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pconst.const import Const, ConstDict, ConstList  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+UNIT_SECONDS = 's/op'
+UNIT_BYTES = 'bytes/node'
+UNIT_BYTES_PER_INTERPRETER = 'bytes/interp'
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """
+    The decorator that registers the benchmark function. The function
+    will be called with `quick` argument and must return the tuple of
+    measured value and unit.
+
+    Parameters
+    ----------
+    func : function
+        The benchmark function.
+
+    Returns
+    -------
+    func : function
+        The same function.
+    """
+    BENCHMARKS.append(func)
+    return func
+
+
+def measure_seconds(func, number, repeat, setup=None):
+    """
+    Measure the best time per call of the specified function.
+
+    Parameters
+    ----------
+    func : function
+        The function to measure. If setup is specified, the return
+        value of setup will be passed as the argument.
+    number : int
+        The number of calls per one repeat.
+    repeat : int
+        The number of repeats. The best result will be used.
+    setup : function or None, default None
+        The function that creates the argument of each call
+        (not measured).
+
+    Returns
+    -------
+    seconds : float
+        The best time per call in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        args = [] if setup is None else [setup() for _ in range(number)]
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            if setup is None:
+                for _ in range(number):
+                    func()
+            else:
+                for arg in args:
+                    func(arg)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / number
+
+
+def measure_bytes(func):
+    """
+    Measure the memory size that is kept allocated by the value
+    that the specified function returns.
+
+    Parameters
+    ----------
+    func : function
+        The function that creates the value to measure.
+
+    Returns
+    -------
+    size : int
+        Allocated bytes by the function.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = func()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del value
+    return size
+
+
+def make_wide_dict(size):
+    """
+    Make the dict that has many scalar values.
+
+    Parameters
+    ----------
+    size : int
+        The number of keys.
+
+    Returns
+    -------
+    dict_val : dict
+        Created dict.
+    """
+    return {'key_%d' % i: i for i in range(size)}
+
+
+def make_deep_dict(depth):
+    """
+    Make the dict that is nested deeply.
+
+    Parameters
+    ----------
+    depth : int
+        The depth of nesting.
+
+    Returns
+    -------
+    dict_val : dict
+        Created dict.
+    """
+    dict_val = {'value': 0}
+    for i in range(depth):
+        dict_val = {'value': i, 'child': dict_val, 'items': [i, i + 1]}
+    return dict_val
+
+
+def make_records(size):
+    """
+    Make the list of dicts that have the same keys.
+
+    Parameters
+    ----------
+    size : int
+        The number of records.
+
+    Returns
+    -------
+    records : list of dict
+        Created records.
+    """
+    return [
+        {'id': i, 'name': 'product_%d' % i, 'price': i * 1.5,
+         'tags': ['a', 'b']}
+        for i in range(size)]
+
+
+@benchmark
+def define_scalar(quick):
+    """
+    Const.__setattr__ define throughput of scalar values.
+    """
+    number = 2000 if quick else 20000
+    names = ['NAME_%d' % i for i in range(number)]
+
+    def define():
+        for name in names:
+            setattr(const, name, 100)
+
+    best = None
+    for _ in range(3 if quick else 5):
+        const = Const()
+        seconds = timeit.timeit(define, number=1)
+        if best is None or seconds < best:
+            best = seconds
+    return best / number, UNIT_SECONDS
+
+
+@benchmark
+def define_dict(quick):
+    """
+    Const.__setattr__ define throughput of small dict values.
+    """
+    number = 500 if quick else 5000
+    const = Const()
+    counter = iter(range(10 ** 9))
+
+    def define(value):
+        setattr(const, 'NAME_%d' % next(counter), value)
+
+    seconds = measure_seconds(
+        func=define, number=number, repeat=3 if quick else 5,
+        setup=lambda: {'a': 100, 'b': [1, 2, 3], 'c': {'d': 'e'}})
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def read_attribute(quick):
+    """
+    Attribute read latency of the defined constant.
+    """
+    const = Const()
+    const.APPLE_PRICE = 100
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        'const.APPLE_PRICE', globals={'const': const},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def read_inherited_attribute(quick):
+    """
+    Attribute read latency of the constant that is defined in the
+    root of 20 layered namespaces (read from the deepest child).
+    """
+    const = Const()
+    const.APPLE_PRICE = 100
+    for _ in range(20):
+        const = const.new_child()
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        'const.APPLE_PRICE', globals={'const': const},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def read_dict_item(quick):
+    """
+    Item read latency of the constant dict.
+    """
+    const = Const()
+    const.APPLE_DATA = {'price': 100, 'name': 'apple'}
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        "const.APPLE_DATA['price']", globals={'const': const},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def read_attribute_instrumentation_disabled(quick):
+    """
+    Attribute and item read latency after the instrumentation is
+    enabled and disabled. This should be the same as read_attribute
+    and read_dict_item (zero cost when disabled).
+    """
+    const = Const()
+    const.APPLE_DATA = {'price': 100, 'name': 'apple'}
+    const.enable_instrumentation()
+    const.disable_instrumentation()
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        "const.APPLE_DATA['price']", globals={'const': const},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def read_attribute_instrumented(quick):
+    """
+    Attribute and item read latency while the instrumentation is
+    enabled.
+    """
+    const = Const()
+    const.APPLE_DATA = {'price': 100, 'name': 'apple'}
+    const.enable_instrumentation()
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        "const.APPLE_DATA['price']", globals={'const': const},
+        number=number, repeat=3 if quick else 5))
+    const.disable_instrumentation()
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def freeze_wide(quick):
+    """
+    Freezing cost of the dict that has many scalar values. The
+    passed dict is not changed (default mode).
+    """
+    size = 1000 if quick else 10000
+    seconds = measure_seconds(
+        func=lambda dict_val: ConstDict(dict_val=dict_val),
+        number=5, repeat=3 if quick else 5,
+        setup=lambda: make_wide_dict(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def freeze_wide_adopt(quick):
+    """
+    Freezing cost of the same value as freeze_wide, with taking
+    over the passed dict (adopt mode).
+    """
+    size = 1000 if quick else 10000
+    seconds = measure_seconds(
+        func=lambda dict_val: ConstDict(dict_val=dict_val, adopt=True),
+        number=5, repeat=3 if quick else 5,
+        setup=lambda: make_wide_dict(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def freeze_deep(quick):
+    """
+    Freezing cost of the deeply nested dict.
+    """
+    depth = 50 if quick else 200
+    seconds = measure_seconds(
+        func=lambda dict_val: ConstDict(dict_val=dict_val),
+        number=5, repeat=3 if quick else 5,
+        setup=lambda: make_deep_dict(depth=depth))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def freeze_repeated(quick):
+    """
+    Freezing cost of the list of many same-keys dicts. The passed
+    list is not changed (default mode).
+    """
+    size = 500 if quick else 5000
+    seconds = measure_seconds(
+        func=lambda list_value: ConstList(list_value=list_value),
+        number=3, repeat=3 if quick else 5,
+        setup=lambda: make_records(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def freeze_repeated_adopt(quick):
+    """
+    Freezing cost of the same value as freeze_repeated, with taking
+    over the passed list (adopt mode).
+    """
+    size = 500 if quick else 5000
+    seconds = measure_seconds(
+        func=lambda list_value: ConstList(
+            list_value=list_value, adopt=True),
+        number=3, repeat=3 if quick else 5,
+        setup=lambda: make_records(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def freeze_repeated_with_schema(quick):
+    """
+    Freezing cost of the same value as freeze_repeated, with the
+    schema validation in the same traversal.
+    """
+    size = 500 if quick else 5000
+    const = Const()
+    const.set_schema(schema={'RECORDS': [{
+        'id': int, 'name': str, 'price': float, 'tags': [str]}]})
+    seconds = measure_seconds(
+        func=lambda list_value: const._freeze_const_value(
+            name='RECORDS', value=list_value),
+        number=3, repeat=3 if quick else 5,
+        setup=lambda: make_records(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def redefine_same_value(quick):
+    """
+    Re-definition cost of the same dict value when accept_same_value
+    setting is enabled.
+    """
+    size = 100 if quick else 1000
+    const = Const()
+    const.accept_same_value()
+    const.DATA = make_wide_dict(size=size)
+    seconds = measure_seconds(
+        func=lambda dict_val: setattr(const, 'DATA', dict_val),
+        number=20, repeat=3 if quick else 5,
+        setup=lambda: make_wide_dict(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def pickle_roundtrip(quick):
+    """
+    Pickling and unpickling cost of the frozen nested value.
+    """
+    const_dict = ConstDict(dict_val={
+        'records': make_records(size=200 if quick else 2000),
+        'deep': make_deep_dict(depth=20)})
+    seconds = measure_seconds(
+        func=lambda: pickle.loads(pickle.dumps(const_dict)),
+        number=3, repeat=3 if quick else 5)
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def to_json_first(quick):
+    """
+    JSON export cost of the frozen nested value that has not been
+    exported yet.
+    """
+    size = 200 if quick else 2000
+    seconds = measure_seconds(
+        func=lambda const_dict: const_dict.to_json(),
+        number=3, repeat=3 if quick else 5,
+        setup=lambda: ConstDict(dict_val={
+            'records': make_records(size=size),
+            'deep': make_deep_dict(depth=20)}))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def to_json_repeated(quick):
+    """
+    JSON export cost of the same value as to_json_first, when the
+    value has already been exported (cached subtrees are reused).
+    """
+    const = Const()
+    const.DATA = {
+        'records': make_records(size=200 if quick else 2000),
+        'deep': make_deep_dict(depth=20)}
+    const.NAME = 'benchmark'
+    const.to_json()
+    seconds = measure_seconds(
+        func=const.to_json, number=100, repeat=3 if quick else 5)
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def memoize_hit(quick):
+    """
+    Call latency of the memoized function when the result of the
+    large constant dict argument is cached.
+    """
+    const = Const()
+    const.CONFIG = make_wide_dict(size=1000 if quick else 10000)
+    func = const.memoize(maxsize=128)(len)
+    func(const.CONFIG)
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        'func(const.CONFIG)', globals={'func': func, 'const': const},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+@benchmark
+def memory_per_node(quick):
+    """
+    Memory size per frozen node (a small dict with a nested list).
+    """
+    size = 1000 if quick else 10000
+    records = make_records(size=size)
+    size_bytes = measure_bytes(
+        func=lambda: ConstList(list_value=deepcopy(records)))
+    node_count = size * 2 + 1
+    return size_bytes / node_count, UNIT_BYTES
+
+
+def make_shape_records_const():
+    """
+    Make the Const object that stores repeated dict shapes as
+    ConstShapeRecord.
+
+    Returns
+    -------
+    const : Const
+        Created Const object.
+    """
+    const = Const()
+    const.enable_shape_records(min_count=2)
+    return const
+
+
+@benchmark
+def memory_per_node_shape_records(quick):
+    """
+    Memory size per frozen node (same as memory_per_node) when
+    repeated dict shapes are stored as ConstShapeRecord.
+    """
+    size = 1000 if quick else 10000
+    records = make_records(size=size)
+    const = make_shape_records_const()
+    size_bytes = measure_bytes(
+        func=lambda: const._freeze_const_value(
+            name='RECORDS', value=deepcopy(records)))
+    node_count = size * 2 + 1
+    return size_bytes / node_count, UNIT_BYTES
+
+
+@benchmark
+def freeze_repeated_shape_records(quick):
+    """
+    Freezing cost of the list of many same-keys dicts (same as
+    freeze_repeated) when they are stored as ConstShapeRecord.
+    """
+    size = 500 if quick else 5000
+    const = make_shape_records_const()
+    seconds = measure_seconds(
+        func=lambda list_value: const._freeze_const_value(
+            name='RECORDS', value=list_value),
+        number=3, repeat=3 if quick else 5,
+        setup=lambda: make_records(size=size))
+    return seconds, UNIT_SECONDS
+
+
+@benchmark
+def read_shape_record_item(quick):
+    """
+    Item read latency of the ConstShapeRecord (same as
+    read_dict_item).
+    """
+    const = make_shape_records_const()
+    const.APPLE_DATA = [
+        {'price': 100, 'name': 'apple'}, {'price': 200, 'name': 'grape'}]
+    apple_data = const.APPLE_DATA[0]
+    number = 100000 if quick else 1000000
+    seconds = min(timeit.repeat(
+        "apple_data['price']", globals={'apple_data': apple_data},
+        number=number, repeat=3 if quick else 5))
+    return seconds / number, UNIT_SECONDS
+
+
+def make_file_bundle(dir_path, file_count, constant_count):
+    """
+    Make the synthetic bundle of JSON constants files.
+
+    Parameters
+    ----------
+    dir_path : str
+        The directory to create files.
+    file_count : int
+        The number of files.
+    constant_count : int
+        The number of constants per file.
+
+    Returns
+    -------
+    paths : list of str
+        Created file paths.
+    """
+    paths = []
+    for i in range(file_count):
+        constants = {
+            'FILE_%d_CONST_%d' % (i, j): {
+                'id': j, 'name': 'constant_%d' % j,
+                'values': list(range(20)), 'nested': {'a': [j, j * 2]}}
+            for j in range(constant_count)}
+        path = os.path.join(dir_path, 'constants_%d.json' % i)
+        with open(path, 'w') as f:
+            json.dump(constants, f)
+        paths.append(path)
+    return paths
+
+
+def measure_load_files(quick, max_workers):
+    """
+    Measure the time to load the synthetic bundle of files.
+
+    Parameters
+    ----------
+    quick : bool
+        If True, the smaller bundle will be used.
+    max_workers : int
+        The number of threads passed to Const.load_files.
+
+    Returns
+    -------
+    seconds : float
+        The best time to load all files.
+    """
+    dir_path = tempfile.mkdtemp()
+    try:
+        paths = make_file_bundle(
+            dir_path=dir_path, file_count=16 if quick else 64,
+            constant_count=100 if quick else 500)
+        return measure_seconds(
+            func=lambda: Const().load_files(
+                paths=paths, max_workers=max_workers),
+            number=1, repeat=2 if quick else 3)
+    finally:
+        shutil.rmtree(dir_path)
+
+
+@benchmark
+def load_files_sequential(quick):
+    """
+    Time to load the synthetic bundle of files in the current
+    process.
+    """
+    return measure_load_files(quick=quick, max_workers=1), UNIT_SECONDS
+
+
+@benchmark
+def load_files_threads(quick):
+    """
+    Time to load the synthetic bundle of files by 4 threads. Local
+    files are not I/O bound, so this checks the overhead of threads.
+    """
+    return measure_load_files(quick=quick, max_workers=4), UNIT_SECONDS
+
+
+SHARED_STARTUP_CODE = """
+import json
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, root_dir)
+from pconst.const import Const
+
+if measure_memory:
+    tracemalloc.start()
+start = time.perf_counter()
+const = Const()
+if mode == 'attach':
+    const.attach_shared(payload)
+else:
+    for name, value in json.loads(payload).items():
+        setattr(const, name, value)
+for name in read_names.split(','):
+    getattr(const, name)
+seconds = time.perf_counter() - start
+size = None
+if measure_memory:
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+with open(result_path, 'w') as f:
+    json.dump({'seconds': seconds, 'bytes': size}, f)
+"""
+
+
+def run_in_new_interpreter(code, shared):
+    """
+    Run the code in the new subinterpreter. If subinterpreters are
+    not available, the code will be run in the current interpreter.
+
+    Parameters
+    ----------
+    code : str
+        The code to run.
+    shared : dict
+        The variables (str, bytes or int) to set before running.
+    """
+    try:
+        from concurrent import interpreters
+    except ImportError:
+        interpreters = None
+    if interpreters is not None:
+        interpreter = interpreters.create()
+        try:
+            interpreter.prepare_main(**shared)
+            interpreter.exec(code)
+        finally:
+            interpreter.close()
+        return
+    try:
+        import _xxsubinterpreters
+    except ImportError:
+        exec(code, dict(shared))
+        return
+    interpreter_id = _xxsubinterpreters.create()
+    try:
+        _xxsubinterpreters.run_string(interpreter_id, code, shared=shared)
+    finally:
+        _xxsubinterpreters.destroy(interpreter_id)
+
+
+def run_in_new_process(code, shared, tmp_dir):
+    """
+    Run the code in the new Python process. This is used for the
+    memory measurement, because tracemalloc can hang in the
+    subinterpreters (e.g., the _xxsubinterpreters module of
+    Python 3.11).
+
+    Parameters
+    ----------
+    code : str
+        The code to run.
+    shared : dict
+        The variables (str, bytes or int) to set before running.
+    tmp_dir : str
+        The directory to write the variables file.
+    """
+    shared_path = os.path.join(tmp_dir, 'shared.pickle')
+    with open(shared_path, 'wb') as f:
+        pickle.dump(shared, f)
+    prelude = (
+        'import pickle\n'
+        'with open(%r, "rb") as f:\n'
+        '    globals().update(pickle.load(f))\n' % shared_path)
+    subprocess.check_call([sys.executable, '-c', prelude + code])
+
+
+def measure_shared_startup(quick, mode, measure_memory=False):
+    """
+    Measure the startup time and memory of the Const namespace in
+    the new subinterpreter. The namespace is rebuilt from the JSON
+    text, or attached from the buffer of export_shared method, and
+    then 10 constants are read. The memory is measured in the new
+    process instead (see run_in_new_process).
+
+    Parameters
+    ----------
+    quick : bool
+        If True, the smaller dataset will be used.
+    mode : str
+        'rebuild' or 'attach'.
+    measure_memory : bool, default False
+        If True, the memory will be measured by tracemalloc (and
+        the time will be slower because of tracing).
+
+    Returns
+    -------
+    result : dict
+        The best 'seconds' and the 'bytes' that are allocated by the
+        namespace ('bytes' will be None if measure_memory is False).
+    """
+    constant_count = 100 if quick else 1000
+    constants = {
+        'CONST_%d' % i: {'records': make_records(size=20), 'id': i}
+        for i in range(constant_count)}
+    if mode == 'attach':
+        exporting_const = Const()
+        for name, value in constants.items():
+            setattr(exporting_const, name, value)
+        payload = exporting_const.export_shared()
+    else:
+        payload = json.dumps(constants)
+    read_names = ','.join('CONST_%d' % i for i in range(10))
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        result_path = os.path.join(tmp_dir, 'result.json')
+        best = None
+        shared = {
+            'root_dir': os.path.dirname(BENCHMARKS_DIR),
+            'mode': mode, 'payload': payload,
+            'read_names': read_names, 'result_path': result_path,
+            'measure_memory': int(measure_memory)}
+        for _ in range(3 if quick else 5):
+            if measure_memory:
+                run_in_new_process(
+                    code=SHARED_STARTUP_CODE, shared=shared,
+                    tmp_dir=tmp_dir)
+            else:
+                run_in_new_interpreter(
+                    code=SHARED_STARTUP_CODE, shared=shared)
+            with open(result_path, 'r') as f:
+                result = json.load(f)
+            if best is None or result['seconds'] < best['seconds']:
+                best = result
+    finally:
+        shutil.rmtree(tmp_dir)
+    return best
+
+
+@benchmark
+def shared_startup_rebuild(quick):
+    """
+    Startup time of the namespace in the new subinterpreter, by
+    rebuilding all constants from the JSON text.
+    """
+    result = measure_shared_startup(quick=quick, mode='rebuild')
+    return result['seconds'], UNIT_SECONDS
+
+
+@benchmark
+def shared_startup_attach(quick):
+    """
+    Startup time of the same namespace as shared_startup_rebuild,
+    by attaching the buffer of export_shared method.
+    """
+    result = measure_shared_startup(quick=quick, mode='attach')
+    return result['seconds'], UNIT_SECONDS
+
+
+@benchmark
+def shared_memory_rebuild(quick):
+    """
+    Memory allocated by the namespace of shared_startup_rebuild.
+    """
+    result = measure_shared_startup(
+        quick=quick, mode='rebuild', measure_memory=True)
+    return result['bytes'], UNIT_BYTES_PER_INTERPRETER
+
+
+@benchmark
+def shared_memory_attach(quick):
+    """
+    Memory allocated by the namespace of shared_startup_attach.
+    """
+    result = measure_shared_startup(
+        quick=quick, mode='attach', measure_memory=True)
+    return result['bytes'], UNIT_BYTES_PER_INTERPRETER
+
+
+def get_commit_hash():
+    """
+    Get the current git commit hash.
+
+    Returns
+    -------
+    commit_hash : str or None
+        The short commit hash. If git is not available, None will
+        be returned.
+    """
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARKS_DIR, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf-8').strip()
+
+
+def run_benchmarks(quick, name_filter=None):
+    """
+    Run the registered benchmarks.
+
+    Parameters
+    ----------
+    quick : bool
+        If True, the benchmarks will run with smaller sizes.
+    name_filter : str or None, default None
+        If specified, only the benchmarks whose names contain this
+        text will run.
+
+    Returns
+    -------
+    results : dict
+        Keys are benchmark names and values are dicts that have
+        `value` and `unit`.
+    """
+    results = {}
+    for func in BENCHMARKS:
+        name = func.__name__
+        if name_filter is not None and name_filter not in name:
+            continue
+        value, unit = func(quick=quick)
+        results[name] = {'value': value, 'unit': unit}
+        print('%-40s %14.4g %s' % (name, value, unit))
+    return results
+
+
+def save_results(results, output_path, quick):
+    """
+    Save the results with the environment information as JSON.
+
+    Parameters
+    ----------
+    results : dict
+        The benchmark results.
+    output_path : str
+        The JSON file path.
+    quick : bool
+        Whether the benchmarks ran with smaller sizes.
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    data = {
+        'commit': get_commit_hash(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(output_path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    print('Saved: %s' % output_path)
+
+
+def compare_results(results, base_path, threshold):
+    """
+    Print the ratio of the results to the base results.
+
+    Parameters
+    ----------
+    results : dict
+        The benchmark results.
+    base_path : str
+        The JSON file path of the base results.
+    threshold : float
+        The ratio that is regarded as the regression
+        (e.g., 1.2 means 20% slower or larger).
+
+    Returns
+    -------
+    regressions : list of str
+        The names of regressed benchmarks.
+    """
+    with open(base_path, 'r') as f:
+        base_data = json.load(f)
+    print('\nCompared with: %s (commit: %s)' % (
+        base_path, base_data.get('commit')))
+    regressions = []
+    for name, result in results.items():
+        base_result = base_data['results'].get(name)
+        if base_result is None or not base_result['value']:
+            print('%-40s %14s' % (name, 'new'))
+            continue
+        ratio = result['value'] / base_result['value']
+        mark = ''
+        if ratio > threshold:
+            mark = '  <- regression'
+            regressions.append(name)
+        print('%-40s %13.2fx%s' % (name, ratio, mark))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pconst benchmarks.')
+    parser.add_argument(
+        '--quick', action='store_true',
+        help='Run with smaller sizes.')
+    parser.add_argument(
+        '--filter', default=None,
+        help='Run only the benchmarks whose names contain this text.')
+    parser.add_argument(
+        '--output', default=None,
+        help='The JSON file path to save results. Default is '
+             'benchmarks/results/<commit hash>.json.')
+    parser.add_argument(
+        '--compare', default=None,
+        help='The JSON file path of the results to compare with.')
+    parser.add_argument(
+        '--threshold', type=float, default=1.2,
+        help='The ratio that is regarded as the regression.')
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick, name_filter=args.filter)
+    output_path = args.output
+    if output_path is None:
+        output_path = os.path.join(
+            RESULTS_DIR, '%s.json' % (get_commit_hash() or 'latest'))
+    save_results(results=results, output_path=output_path, quick=args.quick)
+    if args.compare is None:
+        return
+    regressions = compare_results(
+        results=results, base_path=args.compare, threshold=args.threshold)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
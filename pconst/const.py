@@ -4,25 +4,104 @@
 This module provides const-like function on Python.
 """
 
-from copy import deepcopy
+import concurrent.futures
+import functools
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping, Sequence
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 NOT_SETTABLE_CONST_NAMES = [
     'ConstantError',
     'ConstDict',
     'ConstList',
+    'SortedConstList',
+    'ConstRecordList',
+    'DiskConstDict',
+    'ConstGroup',
+    'ConstShapeRecord',
     '_has_key',
     '_is_settable_const_name',
     '_is_constructor',
     '_is_acceptable_value',
     'accept_same_value',
     'reject_same_value',
+    '_names',
+    '_is_names_sorted',
+    '_value_names',
+    '_add_name',
+    '_remove_name',
+    '_get_sorted_names',
+    '_add_to_name_index',
+    '_remove_from_name_index',
+    'names_with_prefix',
+    'names_of_value',
+    'enable_columnar_records',
+    'disable_columnar_records',
+    'enable_shape_records',
+    'disable_shape_records',
+    '_instrumentation',
+    'enable_instrumentation',
+    'disable_instrumentation',
+    'instrumentation_snapshot',
+    'memory_report',
+    '_define_many',
+    'load_files',
+    'ConstantSchemaError',
+    'SchemaRange',
+    '_schema',
+    '_is_strict_schema',
+    'set_schema',
+    '_freeze_const_value',
+    'register_freezer',
+    'unregister_freezer',
+    'adopt',
+    'to_json',
+    'to_msgpack',
+    '_parent',
+    '_children',
+    '_inherited',
+    'new_child',
+    '_propagate_to_children',
+    'load_env',
+    'memoize',
+    '_shared_names',
+    'export_shared',
+    'attach_shared',
+    '_decode_shared_name',
+    '_decode_shared_names',
 ]
 
+DISK_CONST_DICT_MAGIC = b'PCONSTD1'
+_DISK_HEADER_STRUCT = struct.Struct('<8sQQQ')
+_DISK_SLOT_STRUCT = struct.Struct('<QQ')
+_DISK_RECORD_STRUCT = struct.Struct('<II')
+
 ERR_MSG_NOT_SETTABLE_CONST_NAME = (
     'Specified constant name is not settable. '
     'Please set constant name except following list: %s' % NOT_SETTABLE_CONST_NAMES
 )
 
+# The set of NOT_SETTABLE_CONST_NAMES for the O(1) check on each
+# constant definition.
+_NOT_SETTABLE_CONST_NAME_SET = frozenset(NOT_SETTABLE_CONST_NAMES)
+
 
 class ConstantError(Exception):
     """
@@ -38,6 +117,47 @@ class ConstantError(Exception):
         super(ConstantError, self).__init__(err_msg)
 
 
+class ConstantSchemaError(ConstantError):
+    """
+    Error class that will use when the constant value does not match
+    the schema that is set by Const.set_schema method.
+
+    Parameters
+    ----------
+    err_msg : str
+        error message that describes the mismatch.
+
+    Attributes
+    ----------
+    path : list
+        The reversed path (keys and indexes, and the constant name
+        at the end) to the mismatched value. This will be appended
+        while the error propagates to the parent values.
+    """
+
+    def __init__(self, err_msg):
+        super(ConstantSchemaError, self).__init__(err_msg)
+        self.err_msg = err_msg
+        self.path = []
+
+    def __str__(self):
+        """
+        Get the error message with the path to the mismatched value
+        (e.g., DB['port']).
+
+        Returns
+        -------
+        output_str : str
+            The error message.
+        """
+        if not self.path:
+            return self.err_msg
+        path = list(reversed(self.path))
+        path_str = str(path[0]) + ''.join('[%r]' % key for key in path[1:])
+        return 'Constant value of "%s" does not match the schema: %s' % (
+            path_str, self.err_msg)
+
+
 class ConstDict(dict):
     """
     The class that makes dict value not editable.
@@ -46,14 +166,42 @@ class ConstDict(dict):
     ----------
     dict_val : dict
         The dict value that will be set unchangeable recursively.
+    record_min_rows : int or None, default None
+        If specified, nested lists of same-keys dicts that have at
+        least this number of rows will be stored column-wise as
+        ConstRecordList.
+    validator : _SchemaValidator or None, default None
+        The compiled schema of this dict. Nested values will be
+        validated while they are converted.
+    adopt : bool, default False
+        If False, the passed dict will not be changed, and converted
+        values will be stored in the shallow copy of it. If True, the
+        passed dict (and nested dicts and lists) will be taken over
+        and nested values will be replaced in place, which skips the
+        shallow copy of each dict and list. The caller must not use
+        the passed dict after that. In both modes, this dict stores
+        its own entries (the storage of the passed dict can not be
+        reused by dict subclass), and the passed dict (or its copy)
+        is kept as _original_dict.
+    shapes : dict or None, default None
+        If specified, nested dicts whose keys (tuple of keys in the
+        order) are in this dict will be converted to the shape record
+        classes of the values (see ConstShapeRecord).
 
     Attributes
     ----------
     _original_dict : dict
-        Original dict that passed to argument.
+        The dict of converted values that is used by the output
+        of print function.
     _is_constructor : bool
         If current timing is executing constructor,
         this bool will set to True.
+    _json_cache : str or None
+        The JSON text of this dict. This will be None until the
+        first to_json method call.
+    _msgpack_cache : bytes or None
+        The msgpack bytes of this dict. This will be None until the
+        first to_msgpack method call.
 
     Raises
     ------
@@ -61,14 +209,25 @@ class ConstDict(dict):
         If the passed value type is not dict.
     """
     _is_constructor = False
+    _json_cache = None
+    _msgpack_cache = None
 
-    def __init__(self, dict_val):
+    def __init__(
+        self,
+        dict_val,
+        record_min_rows=None,
+        validator=None,
+        adopt=False,
+        shapes=None,
+    ):
         self.__dict__['_is_constructor'] = True
         if not isinstance(dict_val, dict):
             err_msg = 'The type of passed value is not dict.'
             raise ValueError(err_msg)
-        self._original_dict = deepcopy(dict_val)
-        dict_val = self._replace_dict_val_to_const(dict_val=dict_val)
+        dict_val = self._replace_dict_val_to_const(
+            dict_val=dict_val, record_min_rows=record_min_rows,
+            validator=validator, adopt=adopt, shapes=shapes)
+        self._original_dict = dict_val
         super(ConstDict, self).__init__(dict_val)
 
         self._is_constructor = False
@@ -76,6 +235,10 @@ class ConstDict(dict):
     def _replace_dict_val_to_const(
         self,
         dict_val,
+        record_min_rows=None,
+        validator=None,
+        adopt=False,
+        shapes=None,
     ):
         """
         Replace values in dict to ConstDict or ConstList.
@@ -84,26 +247,50 @@ class ConstDict(dict):
         ----------
         dict_val : dict
             All values that this dict has will replace to ConstDict
-            or CostList if values are dict or list.
+            or CostList if values are dict or list (and the other
+            types that have freezers, e.g., set to frozenset).
+        record_min_rows : int or None, default None
+            The minimum number of rows to store list of same-keys
+            dicts as ConstRecordList.
+        validator : _SchemaValidator or None, default None
+            The compiled schema of this dict. If it has the schemas
+            of values, all values will be validated in this loop.
+        adopt : bool, default False
+            If True, values will be replaced in the passed dict.
+            Otherwise the passed dict will not be changed and the
+            new dict will be returned.
+        shapes : dict or None, default None
+            The shape record classes of nested dicts. Keys are
+            tuples of dict keys.
 
         Returns
         -------
         dict_val : dict
             Replaced dict.
+
+        Raises
+        ------
+        ConstantSchemaError
+            If a value does not match the schema.
         """
+        children = None if validator is None else validator.children
+        replaced_dict = dict_val if adopt else dict_val.copy()
         for key, value in dict_val.items():
-            if (not isinstance(value, dict)
-                    and not isinstance(value, list)):
-                continue
-
-            if isinstance(value, dict):
-                dict_val[key] = ConstDict(dict_val=value)
+            if children is not None:
+                try:
+                    replaced_dict[key] = _freeze_value(
+                        value=value, record_min_rows=record_min_rows,
+                        validator=children[key], adopt=adopt, shapes=shapes)
+                except ConstantSchemaError as e:
+                    e.path.append(key)
+                    raise
                 continue
-
-            if isinstance(value, list):
-                dict_val[key] = ConstList(list_value=value)
+            freezer = _FREEZER_CACHE[type(value)]
+            if freezer is None:
                 continue
-        return dict_val
+            replaced_dict[key] = freezer(
+                value, record_min_rows, None, adopt, shapes)
+        return replaced_dict
 
     def __setitem__(self, key, item):
         """
@@ -149,6 +336,57 @@ class ConstDict(dict):
         """
         return str(self._original_dict)
 
+    def __reduce__(self):
+        """
+        Pickle this object by the dict value, because the default
+        pickling of dict subclass calls __setitem__ method that raises
+        ConstantError.
+
+        Returns
+        -------
+        reduce_value : tuple
+            The class and the constructor arguments.
+        """
+        return (self.__class__, (dict(self),))
+
+    def to_json(self):
+        """
+        Get the JSON text of this dict. Because the value never
+        changes, the JSON text of this dict will be cached at the
+        first call, and after that the cached text will be reused.
+        Nested dicts and lists reuse their own cached texts if they
+        have been exported, but they do not cache the texts of this
+        call (so the cache size does not grow with the depth).
+
+        Returns
+        -------
+        json_str : str
+            The compact JSON text.
+
+        Raises
+        ------
+        TypeError
+            If the dict has values that can not be converted to JSON.
+        """
+        return _to_json_text(value=self, is_root=True)
+
+    def to_msgpack(self):
+        """
+        Get the msgpack bytes of this dict. The bytes will be cached
+        in the same way as to_json method.
+
+        Returns
+        -------
+        msgpack_bytes : bytes
+            The msgpack bytes.
+
+        Raises
+        ------
+        ImportError
+            If the msgpack library is not installed.
+        """
+        return _to_msgpack_bytes(value=self, is_root=True)
+
     def __delitem__(self, key):
         """
         This method will always raise error to disallow dict
@@ -215,39 +453,337 @@ class ConstList(list):
     ----------
     list_value : list
         The list value that will be set unchangeable recursively.
+    record_min_rows : int or None, default None
+        If specified, nested lists of same-keys dicts that have at
+        least this number of rows will be stored column-wise as
+        ConstRecordList.
+    validator : _SchemaValidator or None, default None
+        The compiled schema of this list. Elements will be validated
+        while they are converted.
+    adopt : bool, default False
+        If False, the passed list will not be changed, and converted
+        values will be stored in the shallow copy of it. If True, the
+        passed list (and nested dicts and lists) will be taken over
+        and nested values will be replaced in place, which skips the
+        shallow copy of each dict and list. The caller must not use
+        the passed list after that. In both modes, this list stores
+        its own elements (the storage of the passed list can not be
+        reused by list subclass), and the passed list (or its copy)
+        is kept as _original_list.
+    shapes : dict or None, default None
+        If specified, nested dicts whose keys (tuple of keys in the
+        order) are in this dict will be converted to the shape record
+        classes of the values (see ConstShapeRecord).
 
     Attributes
     ----------
     _original_list : list
-        Original list that passed to argument.
+        The list of converted values that is used by the output
+        of print function.
     _is_constructor : bool
         If current timing is executing constructor,
         this bool will set to True.
+    _first_positions : dict or None
+        Hash index of the hashable values. Keys are list values
+        and values are the first index of each value. This will
+        be None until the index is built.
+    _duplicate_positions : dict or None
+        Sorted indexes of the hashable values that appear more
+        than once in the list.
+    _unhashable_positions : list or None
+        Indexes of the values that can not be hashed. These values
+        will be checked by linear scan.
+    _json_cache : str or None
+        The JSON text of this list. This will be None until the
+        first to_json method call.
+    _msgpack_cache : bytes or None
+        The msgpack bytes of this list. This will be None until the
+        first to_msgpack method call.
 
     Raises
     ------
     ValueError
         If the passed value is not list.
+
+    Notes
+    -----
+    Because the list value never changes after constructor, the
+    hash index will be built at the first time of `in` operator,
+    index or count method call (or build_index method call), and
+    after that these operations take O(1) time for hashable values.
     """
 
     _is_constructor = False
+    _first_positions = None
+    _duplicate_positions = None
+    _unhashable_positions = None
+    _json_cache = None
+    _msgpack_cache = None
 
-    def __init__(self, list_value):
+    def __init__(
+        self,
+        list_value,
+        record_min_rows=None,
+        validator=None,
+        adopt=False,
+        shapes=None,
+    ):
         self.__dict__['_is_constructor'] = True
         if not isinstance(list_value, list):
             err_msg = 'The type of passed value is not list.'
             raise ValueError(err_msg)
-        self._original_list = deepcopy(list_value)
+        item_validator = None if validator is None else validator.item
+        replaced_list = list_value if adopt else list_value[:]
         for i, value in enumerate(list_value):
-            if isinstance(value, dict):
-                list_value[i] = ConstDict(dict_val=value)
+            if item_validator is not None:
+                try:
+                    replaced_list[i] = _freeze_value(
+                        value=value, record_min_rows=record_min_rows,
+                        validator=item_validator, adopt=adopt,
+                        shapes=shapes)
+                except ConstantSchemaError as e:
+                    e.path.append(i)
+                    raise
                 continue
-            if isinstance(value, list):
-                list_value[i] = ConstList(list_value=value)
+            freezer = _FREEZER_CACHE[type(value)]
+            if freezer is None:
                 continue
-        super(ConstList, self).__init__(list_value)
+            replaced_list[i] = freezer(
+                value, record_min_rows, None, adopt, shapes)
+        self._original_list = replaced_list
+        super(ConstList, self).__init__(replaced_list)
         self._is_constructor = False
 
+    def build_index(self):
+        """
+        Build the hash index that will be used by `in` operator,
+        index and count methods. If this method is not called,
+        the index will be built at the first time of these
+        operations.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.ALLOWED_IDS = list(range(100000))
+        >>> const.ALLOWED_IDS.build_index()
+        >>> 99999 in const.ALLOWED_IDS
+        [Out] True
+        """
+        first_positions = {}
+        duplicate_positions = {}
+        unhashable_positions = []
+        for i, value in enumerate(list.__iter__(self)):
+            try:
+                first_position = first_positions.setdefault(value, i)
+            except TypeError:
+                unhashable_positions.append(i)
+                continue
+            if first_position == i:
+                continue
+            if value in duplicate_positions:
+                duplicate_positions[value].append(i)
+                continue
+            duplicate_positions[value] = [first_position, i]
+        self.__dict__['_first_positions'] = first_positions
+        self.__dict__['_duplicate_positions'] = duplicate_positions
+        self.__dict__['_unhashable_positions'] = unhashable_positions
+
+    def _get_hashable_positions(self, value):
+        """
+        Get the sorted indexes of the specified value by the hash
+        index. The hash index will be built if it is not built yet.
+
+        Parameters
+        ----------
+        value : *
+            The value to search.
+
+        Returns
+        -------
+        positions : list
+            Sorted indexes of the specified value. Values that
+            can not be hashed are not included.
+
+        Raises
+        ------
+        TypeError
+            If the specified value is not hashable.
+        """
+        if self._first_positions is None:
+            self.build_index()
+        duplicate_positions = self._duplicate_positions.get(value)
+        if duplicate_positions is not None:
+            return duplicate_positions
+        first_position = self._first_positions.get(value)
+        if first_position is None:
+            return []
+        return [first_position]
+
+    def _get_unhashable_positions(self, value, start, stop):
+        """
+        Get the indexes of the unhashable values that are equal to
+        the specified value by linear scan.
+
+        Parameters
+        ----------
+        value : *
+            The value to search.
+        start : int
+            Start index (inclusive) of the search range.
+        stop : int
+            Stop index (exclusive) of the search range.
+
+        Returns
+        -------
+        positions : list
+            Sorted indexes of the equal unhashable values.
+        """
+        positions = []
+        for i in self._unhashable_positions:
+            if i < start or i >= stop:
+                continue
+            item = list.__getitem__(self, i)
+            if item is value or item == value:
+                positions.append(i)
+        return positions
+
+    def __contains__(self, value):
+        """
+        Return True if the list contains the specified value.
+        Hashable values are searched by the hash index.
+
+        Parameters
+        ----------
+        value : *
+            The value to search.
+
+        Returns
+        -------
+        result : bool
+            True if the list contains the specified value.
+        """
+        try:
+            if self._get_hashable_positions(value=value):
+                return True
+        except TypeError:
+            return super(ConstList, self).__contains__(value)
+        positions = self._get_unhashable_positions(
+            value=value, start=0, stop=len(self))
+        return len(positions) > 0
+
+    def index(self, value, start=0, stop=sys.maxsize):
+        """
+        Return the first index of the specified value. Hashable
+        values are searched by the hash index.
+
+        Parameters
+        ----------
+        value : *
+            The value to search.
+        start : int, default 0
+            Start index (inclusive) of the search range.
+        stop : int, default sys.maxsize
+            Stop index (exclusive) of the search range.
+
+        Returns
+        -------
+        index : int
+            The first index of the specified value.
+
+        Raises
+        ------
+        ValueError
+            If the specified value is not in the list.
+        """
+        try:
+            hashable_positions = self._get_hashable_positions(value=value)
+        except TypeError:
+            return super(ConstList, self).index(value, start, stop)
+        start, stop, _ = slice(start, stop).indices(len(self))
+        candidates = self._get_unhashable_positions(
+            value=value, start=start, stop=stop)
+        i = bisect_left(hashable_positions, start)
+        if i < len(hashable_positions) and hashable_positions[i] < stop:
+            candidates.append(hashable_positions[i])
+        if not candidates:
+            err_msg = '%r is not in list' % (value,)
+            raise ValueError(err_msg)
+        return min(candidates)
+
+    def count(self, value):
+        """
+        Return the number of occurrences of the specified value.
+        Hashable values are counted by the hash index.
+
+        Parameters
+        ----------
+        value : *
+            The value to count.
+
+        Returns
+        -------
+        count : int
+            The number of occurrences of the specified value.
+        """
+        try:
+            hashable_positions = self._get_hashable_positions(value=value)
+        except TypeError:
+            return super(ConstList, self).count(value)
+        unhashable_positions = self._get_unhashable_positions(
+            value=value, start=0, stop=len(self))
+        return len(hashable_positions) + len(unhashable_positions)
+
+    def __reduce__(self):
+        """
+        Pickle this object by the list value, because the default
+        pickling of list subclass calls extend method that raises
+        ConstantError.
+
+        Returns
+        -------
+        reduce_value : tuple
+            The class and the constructor arguments.
+        """
+        return (self.__class__, (list(self),))
+
+    def to_json(self):
+        """
+        Get the JSON text of this list. Because the value never
+        changes, the JSON text of this list will be cached at the
+        first call, and after that the cached text will be reused.
+        Nested dicts and lists reuse their own cached texts if they
+        have been exported, but they do not cache the texts of this
+        call (so the cache size does not grow with the depth).
+
+        Returns
+        -------
+        json_str : str
+            The compact JSON text.
+
+        Raises
+        ------
+        TypeError
+            If the list has values that can not be converted to JSON.
+        """
+        return _to_json_text(value=self, is_root=True)
+
+    def to_msgpack(self):
+        """
+        Get the msgpack bytes of this list. The bytes will be cached
+        in the same way as to_json method.
+
+        Returns
+        -------
+        msgpack_bytes : bytes
+            The msgpack bytes.
+
+        Raises
+        ------
+        ImportError
+            If the msgpack library is not installed.
+        """
+        return _to_msgpack_bytes(value=self, is_root=True)
+
     def append(self, object):
         """
         This method will always raise error to disallow list
@@ -411,6 +947,42 @@ class ConstList(list):
         )
         raise ConstantError(err_msg)
 
+    def __iadd__(self, other):
+        """
+        This method will always raise error to disallow list
+        value update (e.g., const_list += [1]).
+
+        Parameters
+        ----------
+        other : Iterable
+            The iterable object that will be appended to list.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = '+= operator is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def __imul__(self, other):
+        """
+        This method will always raise error to disallow list
+        value update (e.g., const_list *= 2).
+
+        Parameters
+        ----------
+        other : int
+            The number of repetitions.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = '*= operator is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
     def __reversed__(self):
         """
         This method will always raise error to disallow list
@@ -470,83 +1042,4628 @@ class ConstList(list):
         return str(self._original_list)
 
 
-class Const(object):
+class SortedConstList(ConstList):
     """
-    The class that provides const-like function on Python.
-    This will set as module, so you can skip initialization.
+    The class that makes sorted list value not editable and provides
+    floor, ceiling, rank and range slice queries in O(log n) time.
 
-    Attributes
+    Parameters
     ----------
-    ConstantError : class
-        Error class that will use when invalid constant
-        manipulation is done.
-    ConstDict : class
-        The class that makes dict value not editable.
-    ConstList : class
-        The class that makes list value not editable.
-    _is_constructor : bool
-        If current timing is executing constructor,
-        this bool will set to True.
+    list_value : list
+        The sorted (ascending order) list value that will be set
+        unchangeable recursively.
+    adopt : bool, default False
+        If True, the passed list will be taken over and changed in
+        place instead of copied (see ConstList).
+
+    Raises
+    ------
+    ValueError
+        - If the passed value is not list.
+        - If the passed list value is not sorted.
+        - If the passed list value has values that can not be
+          compared (e.g., int and str).
 
     Examples
     --------
     >>> from pconst import const
-    >>> const.a = 'apple'
-    >>> const.a
-    [Out] 'apple'
-
-    # Following code will raise ConstantError.
-    >>> const.a = 'apple'
-    >>> const.a = 'orange'
-    [Out] ConstantError: Constant value of "a" is not editable.
-
-    # Also can use dict or list.
-    >>> const.fruit = {'apple': 100}
-    >>> const.fruit['apple']
+    >>> const.PRICE_TIERS = const.SortedConstList(
+    ...     list_value=[0, 100, 500, 1000])
+    >>> const.PRICE_TIERS.floor(300)
     [Out] 100
-
-    # Following code will raise ConstantError.
-    >>> const.fruit['apple'] = 200
-    [Out] ConstantError: Update dict value is not allowed.
-
-    Notes
-    -----
-    Following names are used by this class, so you can't set the
-    same constant names (e.g., const.ConstantError = 'apple').
-    - 'ConstantError'
-    - 'ConstDict'
-    - 'ConstList'
-    - '_has_key'
-    - '_is_settable_const_name'
-    - '_is_constructor'
-    - '_is_acceptable_value'
-    - 'accept_same_value'
-    - 'reject_same_value'
     """
 
-    _is_constructor = True
-    __accept_same_value = False
-
-    def __init__(self):
-        super(Const, self).__init__()
-        self.ConstantError = ConstantError
-        self.ConstDict = ConstDict
-        self.ConstList = ConstList
-        self._is_constructor = False
+    def __init__(self, list_value, adopt=False):
+        super(SortedConstList, self).__init__(
+            list_value=list_value, adopt=adopt)
+        for i in range(1, len(self)):
+            try:
+                is_sorted = not self[i] < self[i - 1]
+            except TypeError:
+                err_msg = (
+                    'The passed list value has values that can not be '
+                    'compared.')
+                raise ValueError(err_msg)
+            if not is_sorted:
+                err_msg = 'The passed list value is not sorted.'
+                raise ValueError(err_msg)
 
-    def accept_same_value(self):
-        """
-        Switch to a setting that allows equivalent value to be set.
+    def floor(self, value):
         """
-        self.__accept_same_value = True
+        Get the largest element that is less than or equal to the
+        specified value.
 
-    def reject_same_value(self):
-        """
-        Switch to a setting that does not allow equivalent value to be set.
+        Parameters
+        ----------
+        value : *
+            The value to compare.
+
+        Returns
+        -------
+        element : * or None
+            The largest element that is less than or equal to the
+            specified value. If there is no such element, None
+            will be returned.
         """
-        self.__accept_same_value = False
+        i = bisect_right(self, value)
+        if i == 0:
+            return None
+        return self[i - 1]
 
-    def _has_key(self, name):
+    def ceiling(self, value):
+        """
+        Get the smallest element that is greater than or equal to
+        the specified value.
+
+        Parameters
+        ----------
+        value : *
+            The value to compare.
+
+        Returns
+        -------
+        element : * or None
+            The smallest element that is greater than or equal to
+            the specified value. If there is no such element, None
+            will be returned.
+        """
+        i = bisect_left(self, value)
+        if i == len(self):
+            return None
+        return self[i]
+
+    def rank(self, value):
+        """
+        Get the number of elements that are less than the specified
+        value. This is also the bucket index of the value when the
+        elements are used as thresholds.
+
+        Parameters
+        ----------
+        value : *
+            The value to compare.
+
+        Returns
+        -------
+        rank : int
+            The number of elements that are less than the specified
+            value.
+        """
+        return bisect_left(self, value)
+
+    def range_slice(self, lower=None, upper=None):
+        """
+        Get the elements that are greater than or equal to lower
+        and less than upper.
+
+        Parameters
+        ----------
+        lower : * or None, default None
+            The lower bound (inclusive). If None is specified,
+            elements will be taken from the beginning.
+        upper : * or None, default None
+            The upper bound (exclusive). If None is specified,
+            elements will be taken until the end.
+
+        Returns
+        -------
+        sliced_list : SortedConstList
+            The elements in the specified range.
+        """
+        start = 0
+        stop = len(self)
+        if lower is not None:
+            start = bisect_left(self, lower)
+        if upper is not None:
+            stop = max(bisect_left(self, upper), start)
+        return SortedConstList(list_value=self[start:stop], adopt=True)
+
+
+class _ConstMapping(Mapping):
+    """
+    The base class of not editable mappings that are not dict
+    subclasses (e.g., ConstRecord). Methods that update values
+    will always raise ConstantError, the same as ConstDict.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, key, item):
+        """
+        This method will always raise error to disallow dict
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = "Update dict value is not allowed."
+        raise ConstantError(err_msg)
+
+    def __delitem__(self, key):
+        """
+        This method will always raise error to disallow dict
+        value deletion.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Deletion of dict value is not allowed.'
+        raise ConstantError(err_msg)
+
+    def clear(self):
+        """
+        This method will always raise error to disallow dict
+        value deletion.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'To reset dict values is not allowed.'
+        raise ConstantError(err_msg)
+
+    def update(self, *args, **kwargs):
+        """
+        This method will always raise error to disallow dict
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'To update dict values is not allowed.'
+        raise ConstantError(err_msg)
+
+    def pop(self, *args):
+        """
+        This method will always raise error to disallow dict
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'pop method is disallowed to not update dict value.'
+        raise ConstantError(err_msg)
+
+    def popitem(self):
+        """
+        This method will always raise error to disallow dict
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'popitem method is disallowed to not update dict value.'
+        raise ConstantError(err_msg)
+
+    def setdefault(self, *args):
+        """
+        This method will always raise error to disallow dict
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = (
+            'setdefault method is disallowed to not update dict value.')
+        raise ConstantError(err_msg)
+
+
+class ConstRecord(_ConstMapping):
+    """
+    The class of a row of ConstRecordList. This behaves like a
+    ConstDict, but the values are read from the columns of the
+    ConstRecordList, so a row does not have its own dict.
+
+    Parameters
+    ----------
+    record_list : ConstRecordList
+        The record list that has this row.
+    row : int
+        The row index.
+    """
+
+    __slots__ = ('_record_list', '_row')
+
+    def __init__(self, record_list, row):
+        self._record_list = record_list
+        self._row = row
+
+    def __getitem__(self, key):
+        """
+        Get the value of specified key from the column.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        value : *
+            The value of the specified key at this row.
+
+        Raises
+        ------
+        KeyError
+            If the specified key does not exist.
+        """
+        return self._record_list._columns[key][self._row]
+
+    def __iter__(self):
+        """
+        Iterate the keys of this row.
+
+        Returns
+        -------
+        iterator : iterator
+            The iterator of the keys.
+        """
+        return iter(self._record_list._keys)
+
+    def __len__(self):
+        """
+        Get the number of keys of this row.
+
+        Returns
+        -------
+        length : int
+            The number of keys.
+        """
+        return len(self._record_list._keys)
+
+    def __contains__(self, key):
+        """
+        Return True if this row has the specified key.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        result : bool
+            True if this row has the specified key.
+        """
+        return key in self._record_list._columns
+
+    def __repr__(self):
+        """
+        Get the same text as dict value.
+
+        Returns
+        -------
+        output_str : str
+            The text that display to console or output cell.
+        """
+        return str(dict(self.items()))
+
+
+class ConstShapeRecord(_ConstMapping):
+    """
+    The base class of not editable dicts that have the same keys
+    (shape). One subclass is created per shape, and its __slots__
+    store the values, so each record has neither its own hash table
+    nor instance dict. The subclass has the index of keys to slot
+    names, so reading a value is a fixed-offset access after one
+    dict lookup. This behaves like a ConstDict (mapping API and
+    ConstantError on mutation).
+
+    Attributes
+    ----------
+    _keys : tuple
+        The keys of the shape, in the order of the original dict.
+        This is the class attribute of each subclass.
+    _key_slots : dict
+        The index of slot names. Keys are dict keys. This is the
+        class attribute of each subclass.
+
+    Notes
+    -----
+    Shape records are created by the freezer when the shape records
+    setting of Const is enabled (see Const.enable_shape_records).
+    Subclasses are cached per shape and shared by all constants
+    while their records exist. Each subclass also has the
+    _instrumentation_targets slot that is set only while the record
+    is instrumented (see Const.enable_instrumentation).
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.enable_shape_records(min_count=2)
+    >>> const.SERVERS = [
+    ...     {'host': 'a', 'port': 80}, {'host': 'b', 'port': 443}]
+    >>> isinstance(const.SERVERS[0], const.ConstShapeRecord)
+    [Out] True
+    >>> const.SERVERS[1]['port']
+    [Out] 443
+    """
+
+    __slots__ = ()
+    _keys = ()
+    _key_slots = {}
+
+    @classmethod
+    def _from_dict(
+        cls,
+        dict_val,
+        record_min_rows=None,
+        validator=None,
+        adopt=False,
+        shapes=None,
+    ):
+        """
+        Create the record of this shape from the dict. Values will
+        be converted to not editable values.
+
+        Parameters
+        ----------
+        dict_val : dict
+            The dict that has the keys of this shape in the same
+            order.
+        record_min_rows : int or None, default None
+            The minimum number of rows to store nested list of
+            same-keys dicts as ConstRecordList.
+        validator : _SchemaValidator or None, default None
+            The compiled schema of the dict.
+        adopt : bool, default False
+            If True, nested dicts and lists will be taken over
+            and changed in place instead of copied.
+        shapes : dict or None, default None
+            The shape record classes of nested dicts.
+
+        Returns
+        -------
+        record : ConstShapeRecord
+            The created record.
+
+        Raises
+        ------
+        ConstantSchemaError
+            If a value does not match the schema.
+        """
+        children = None if validator is None else validator.children
+        key_slots = cls._key_slots
+        record = object.__new__(cls)
+        for key, value in dict_val.items():
+            if children is not None:
+                try:
+                    value = _freeze_value(
+                        value=value, record_min_rows=record_min_rows,
+                        validator=children[key], adopt=adopt, shapes=shapes)
+                except ConstantSchemaError as e:
+                    e.path.append(key)
+                    raise
+            else:
+                freezer = _FREEZER_CACHE[type(value)]
+                if freezer is not None:
+                    value = freezer(
+                        value, record_min_rows, None, adopt, shapes)
+            object.__setattr__(record, key_slots[key], value)
+        return record
+
+    def __getitem__(self, key):
+        """
+        Get the value of specified key from the slot.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        value : *
+            The value of the specified key.
+
+        Raises
+        ------
+        KeyError
+            If the specified key does not exist.
+        """
+        return getattr(self, self._key_slots[key])
+
+    def __iter__(self):
+        """
+        Iterate the keys of this record.
+
+        Returns
+        -------
+        iterator : iterator
+            The iterator of the keys.
+        """
+        return iter(self._keys)
+
+    def __len__(self):
+        """
+        Get the number of keys of this record.
+
+        Returns
+        -------
+        length : int
+            The number of keys.
+        """
+        return len(self._keys)
+
+    def __contains__(self, key):
+        """
+        Return True if this record has the specified key.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        result : bool
+            True if this record has the specified key.
+        """
+        try:
+            return key in self._key_slots
+        except TypeError:
+            return False
+
+    def __setattr__(self, name, value):
+        """
+        This method will always raise error in order to prevent the
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Update dict value is not allowed.'
+        raise ConstantError(err_msg)
+
+    def __delattr__(self, name):
+        """
+        This method will always raise error in order to prevent the
+        value deletion.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Deletion of dict value is not allowed.'
+        raise ConstantError(err_msg)
+
+    def __reduce__(self):
+        """
+        Pickle this object by the keys and values, because the class
+        of each shape is created dynamically.
+
+        Returns
+        -------
+        reduce_value : tuple
+            The function and the arguments.
+        """
+        return (_make_shape_record, (
+            self._keys, tuple(self[key] for key in self._keys)))
+
+    def __repr__(self):
+        """
+        Get the same text as dict value.
+
+        Returns
+        -------
+        output_str : str
+            The text that display to console or output cell.
+        """
+        return str(dict(self.items()))
+
+
+_SHAPE_RECORD_CLASSES = weakref.WeakValueDictionary()
+
+
+def _get_shape_key(keys):
+    """
+    Get the key of the shape that distinguishes the equal keys of
+    different types (e.g., 1, 1.0 and True), so that each of them
+    has its own shape record class.
+
+    Parameters
+    ----------
+    keys : tuple
+        The dict keys in the order.
+
+    Returns
+    -------
+    shape_key : tuple
+        The keys as they are if all keys are str (the common case,
+        which needs no extra tuple), or the tuple of the types of
+        the keys and the keys.
+    """
+    for key in keys:
+        if type(key) is not str:
+            return tuple(map(type, keys)), keys
+    return keys
+
+
+def _get_shape_record_class(keys):
+    """
+    Get the ConstShapeRecord subclass of the specified shape. The
+    class will be created at the first call and cached while it is
+    used (the cache holds weak references, so the classes of the
+    shapes that no longer have records will be freed).
+
+    Parameters
+    ----------
+    keys : tuple
+        The dict keys in the order.
+
+    Returns
+    -------
+    record_class : type
+        The ConstShapeRecord subclass.
+    """
+    shape_key = _get_shape_key(keys=keys)
+    record_class = _SHAPE_RECORD_CLASSES.get(shape_key)
+    if record_class is not None:
+        return record_class
+    slot_names = tuple('_v%d' % i for i in range(len(keys)))
+    record_class = type('ConstShapeRecord', (ConstShapeRecord,), {
+        '__slots__': slot_names + ('_instrumentation_targets',),
+        '_keys': keys, '__module__': __name__})
+    record_class._key_slots = dict(zip(keys, slot_names))
+    _SHAPE_RECORD_CLASSES[shape_key] = record_class
+    return record_class
+
+
+def _make_shape_record(keys, values):
+    """
+    Create the shape record from the keys and values. This will be
+    used by unpickling.
+
+    Parameters
+    ----------
+    keys : tuple
+        The dict keys in the order.
+    values : tuple
+        The values of the keys (already not editable values).
+
+    Returns
+    -------
+    record : ConstShapeRecord
+        The created record.
+    """
+    record_class = _get_shape_record_class(keys=keys)
+    return record_class._from_dict(dict_val=dict(zip(keys, values)))
+
+
+def _count_dict_shapes(value, min_count):
+    """
+    Count the shapes (tuples of keys) of the dicts in the value
+    (including the nested dicts) that are not converted yet, and
+    get the shape record classes of the repeated shapes. Only the
+    dicts, lists and tuples are visited, and the other values
+    (e.g., str and int) are skipped without being pushed.
+
+    Parameters
+    ----------
+    value : *
+        The value to count.
+    min_count : int
+        The minimum number of dicts to use the shape record class.
+
+    Returns
+    -------
+    shapes : dict or None
+        Keys are the shape keys (see _get_shape_key) and values are
+        the shape record classes. If there are no repeated shapes,
+        None will be returned.
+    """
+    counts = {}
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if isinstance(value, ConstDict):
+                continue
+            keys = tuple(value)
+            shape_key = _get_shape_key(keys=keys)
+            shape_count = counts.get(shape_key)
+            if shape_count is None:
+                counts[shape_key] = [1, keys]
+            else:
+                shape_count[0] += 1
+            items = value.values()
+        elif isinstance(value, (list, tuple)):
+            if isinstance(value, ConstList):
+                continue
+            items = value
+        else:
+            continue
+        for item in items:
+            if isinstance(item, (dict, list, tuple)):
+                stack.append(item)
+    shapes = {
+        shape_key: _get_shape_record_class(keys=keys)
+        for shape_key, (count, keys) in counts.items()
+        if keys and count >= min_count}
+    return shapes or None
+
+
+class ConstRecordList(Sequence):
+    """
+    The class that stores list of dicts that have the same keys
+    column-wise, and makes them not editable. Each column is stored
+    as a typed array (int or float values) or a tuple, so rows do
+    not have their own dict and shadow copy.
+
+    Parameters
+    ----------
+    records : list of dict
+        The dicts that have the same keys.
+    record_min_rows : int or None, default None
+        The minimum number of rows to store nested list of same-keys
+        dicts as ConstRecordList.
+    validator : _SchemaValidator or None, default None
+        The compiled schema of this list. Records will be validated
+        while they are converted.
+    adopt : bool, default False
+        If True, nested dicts and lists of the records will be taken
+        over and changed in place instead of copied.
+    shapes : dict or None, default None
+        The shape record classes of nested dicts.
+
+    Attributes
+    ----------
+    _keys : tuple
+        The keys of each record, in the order of the first record.
+    _columns : dict
+        The columns of records. Keys are record keys and values are
+        array or tuple.
+    _length : int
+        The number of records.
+    _json_cache : str or None
+        The JSON text of this list. This will be None until the
+        first export of the constant whose value is this list.
+    _msgpack_cache : bytes or None
+        The msgpack bytes of this list. This will be None until the
+        first export of the constant whose value is this list.
+
+    Raises
+    ------
+    ValueError
+        - If the passed value is not list.
+        - If the passed records do not have the same keys.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> products = const.ConstRecordList(records=[
+    ...     {'id': 1, 'price': 100},
+    ...     {'id': 2, 'price': 200}])
+    >>> products[1]['price']
+    [Out] 200
+    >>> sum(products.column('price'))
+    [Out] 300
+    """
+
+    _json_cache = None
+    _msgpack_cache = None
+
+    def __init__(
+        self,
+        records,
+        record_min_rows=None,
+        validator=None,
+        adopt=False,
+        shapes=None,
+    ):
+        if not isinstance(records, list):
+            err_msg = 'The type of passed value is not list.'
+            raise ValueError(err_msg)
+        if records and not _is_record_list(
+                list_value=records, record_min_rows=1):
+            err_msg = 'The passed records do not have the same keys.'
+            raise ValueError(err_msg)
+        keys = tuple(records[0].keys()) if records else ()
+        item_validator = None if validator is None else validator.item
+        if item_validator is not None and records:
+            # All records are dicts of the same keys, so the dict
+            # schema check (type and keys) of the first record is the
+            # check of all records. The other checks (e.g., functions
+            # or SchemaRange) depend on values, so all records are
+            # checked.
+            if item_validator.children is None:
+                checked_records = records
+            else:
+                checked_records = records[:1]
+            for row, record in enumerate(checked_records):
+                try:
+                    item_validator.check_value(value=record)
+                except ConstantSchemaError as e:
+                    e.path.append(row)
+                    raise
+        columns = {}
+        for key in keys:
+            if item_validator is None or item_validator.children is None:
+                column = [
+                    _freeze_value(
+                        value=record[key], record_min_rows=record_min_rows,
+                        adopt=adopt, shapes=shapes)
+                    for record in records]
+            else:
+                column = self._freeze_validated_column(
+                    records=records, key=key,
+                    record_min_rows=record_min_rows,
+                    validator=item_validator.children[key], adopt=adopt,
+                    shapes=shapes)
+            columns[key] = _to_typed_column(column=column)
+        self._keys = keys
+        self._columns = columns
+        self._length = len(records)
+
+    def _freeze_validated_column(
+        self,
+        records,
+        key,
+        record_min_rows,
+        validator,
+        adopt=False,
+        shapes=None,
+    ):
+        """
+        Convert the values of the specified key to not editable
+        values with the schema validation.
+
+        Parameters
+        ----------
+        records : list of dict
+            The dicts that have the same keys.
+        key : *
+            The record key.
+        record_min_rows : int or None
+            The minimum number of rows to store nested list of
+            same-keys dicts as ConstRecordList.
+        validator : _SchemaValidator
+            The compiled schema of the values.
+        adopt : bool, default False
+            If True, nested dicts and lists will be taken over
+            and changed in place instead of copied.
+        shapes : dict or None, default None
+            The shape record classes of nested dicts.
+
+        Returns
+        -------
+        column : list
+            Converted values.
+
+        Raises
+        ------
+        ConstantSchemaError
+            If a value does not match the schema.
+        """
+        column = []
+        for row, record in enumerate(records):
+            try:
+                column.append(_freeze_value(
+                    value=record[key], record_min_rows=record_min_rows,
+                    validator=validator, adopt=adopt, shapes=shapes))
+            except ConstantSchemaError as e:
+                e.path.append(key)
+                e.path.append(row)
+                raise
+        return column
+
+    def __len__(self):
+        """
+        Get the number of records.
+
+        Returns
+        -------
+        length : int
+            The number of records.
+        """
+        return self._length
+
+    def __getitem__(self, index):
+        """
+        Get the record (row) at the specified index.
+
+        Parameters
+        ----------
+        index : int or slice
+            The index of the record.
+
+        Returns
+        -------
+        record : ConstRecord or list of ConstRecord
+            The record that behaves like a ConstDict. If slice is
+            specified, list of records will be returned.
+
+        Raises
+        ------
+        IndexError
+            If the index is out of range.
+        """
+        if isinstance(index, slice):
+            return [
+                ConstRecord(record_list=self, row=row)
+                for row in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            err_msg = 'list index out of range'
+            raise IndexError(err_msg)
+        return ConstRecord(record_list=self, row=index)
+
+    def column(self, key):
+        """
+        Get all values of the specified key. This can be used for
+        vectorized scans without creating records.
+
+        Parameters
+        ----------
+        key : *
+            The record key.
+
+        Returns
+        -------
+        column : memoryview or tuple
+            Read-only memoryview if the column is stored as typed
+            array (int or float values), otherwise tuple.
+
+        Raises
+        ------
+        KeyError
+            If the specified key does not exist.
+        """
+        column = self._columns[key]
+        if isinstance(column, array):
+            return memoryview(column).toreadonly()
+        return column
+
+    @property
+    def record_keys(self):
+        """
+        Get the keys of each record.
+
+        Returns
+        -------
+        keys : tuple
+            The keys of each record.
+        """
+        return self._keys
+
+    def __eq__(self, other):
+        """
+        Return True if the other sequence has the equal records
+        in the same order.
+
+        Parameters
+        ----------
+        other : *
+            The value to compare.
+
+        Returns
+        -------
+        result : bool
+            True if the records are equal.
+        """
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for record, other_record in zip(self, other):
+            if record != other_record:
+                return False
+        return True
+
+    __hash__ = None
+
+    def __repr__(self):
+        """
+        Get the same text as list of dicts.
+
+        Returns
+        -------
+        output_str : str
+            The text that display to console or output cell.
+        """
+        return str([dict(record.items()) for record in self])
+
+    def __setitem__(self, index, value):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Constant list value is not allowed.'
+        raise ConstantError(err_msg)
+
+    def __delitem__(self, index):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = (
+            '__delitem__ method and del operator are disallowed '
+            'to not update list value.'
+        )
+        raise ConstantError(err_msg)
+
+    def append(self, object):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'append method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def clear(self):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'clear method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def extend(self, iterable):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'extend method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def insert(self, index, object):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'insert method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def pop(self, index=-1):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'pop method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def remove(self, value):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'remove method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def reverse(self):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'reverse method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+    def sort(self, key=None, reverse=False):
+        """
+        This method will always raise error to disallow list
+        value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'sort method is disallowed to not update list value.'
+        raise ConstantError(err_msg)
+
+
+class DiskConstDict(_ConstMapping):
+    """
+    The class that provides not editable dict that is stored in the
+    indexed file and read by mmap. This can be used for constant
+    datasets that are too large to keep as ConstDict in every
+    process. Opening the file is instant, and lookups read (page in)
+    only the entries that are actually touched.
+
+    The file is created by the build method. Its format is the
+    header, the records (encoded key and pickled value) and the
+    open addressing hash table of the records.
+
+    Parameters
+    ----------
+    path : str
+        The file path that is created by the build method.
+    cache_size : int, default 128
+        The maximum number of decoded values to keep. Each read of
+        the value that is not in the cache unpickles and converts
+        the value again, so the values that are read repeatedly
+        (e.g., in a loop) will be reused from this cache. If 0 is
+        specified, values will not be cached.
+
+    Attributes
+    ----------
+    _path : str or None
+        The file path. This will be None if the object is opened by
+        the from_buffer method.
+    _file : file or None
+        The opened file.
+    _mmap : mmap.mmap or bytes
+        The mmap of the file, or the bytes buffer.
+    _length : int
+        The number of entries.
+    _capacity : int
+        The number of hash table slots (power of 2).
+    _table_offset : int
+        The byte offset of the hash table.
+    _cache_size : int
+        The maximum number of decoded values to keep.
+    _cache : OrderedDict
+        The decoded values in the order of the last access. Keys
+        are dict keys.
+    _cache_lock : threading.Lock
+        The lock of the cache.
+
+    Raises
+    ------
+    ValueError
+        If the specified file is not the DiskConstDict file (e.g.,
+        an empty or truncated file).
+
+    Notes
+    -----
+    Keys must be str, int or bytes. Keys that are equal to int (bool
+    and float of integer value) are stored and looked up as int, in
+    the same way as dict. Values are pickled when the file is built,
+    and dict or list values will be converted to ConstDict or
+    ConstList when they are read.
+
+    Because values are unpickled when they are read, reading the file
+    (or bytes) from the untrusted source can execute arbitrary code.
+    Open only the files that are built by your own application.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.GEO = const.DiskConstDict.build(
+    ...     path='geo.pconst', source={'JP': {'capital': 'Tokyo'}})
+    >>> const.GEO['JP']['capital']
+    [Out] 'Tokyo'
+    """
+
+    def __init__(self, path, cache_size=128):
+        self._path = path
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # The empty file can not be mapped.
+            self._file.close()
+            err_msg = 'The specified file is not DiskConstDict file.'
+            raise ValueError(err_msg)
+        self._read_header()
+
+    @classmethod
+    def from_buffer(cls, buffer, cache_size=128):
+        """
+        Open the bytes that are created by the build_bytes method
+        (e.g., the bytes shared with other interpreters). The bytes
+        will not be copied, and values will be decoded when they
+        are read, in the same way as the file.
+
+        Parameters
+        ----------
+        buffer : bytes-like
+            The bytes of the DiskConstDict format. Objects other than
+            bytes (e.g., bytearray) will be copied once to bytes.
+        cache_size : int, default 128
+            The maximum number of decoded values to keep.
+
+        Returns
+        -------
+        disk_const_dict : DiskConstDict
+            Opened DiskConstDict of the bytes.
+
+        Raises
+        ------
+        ValueError
+            If the specified bytes are not the DiskConstDict format.
+        """
+        disk_const_dict = cls.__new__(cls)
+        disk_const_dict._path = None
+        disk_const_dict._cache_size = cache_size
+        disk_const_dict._cache = OrderedDict()
+        disk_const_dict._cache_lock = threading.Lock()
+        disk_const_dict._file = None
+        disk_const_dict._mmap = (
+            buffer if isinstance(buffer, bytes) else bytes(buffer))
+        disk_const_dict._read_header()
+        return disk_const_dict
+
+    def _read_header(self):
+        """
+        Read and validate the header of the file (or bytes).
+
+        Raises
+        ------
+        ValueError
+            If the file is not the DiskConstDict file, or the file is
+            truncated.
+        """
+        if len(self._mmap) < _DISK_HEADER_STRUCT.size:
+            magic = None
+        else:
+            magic, length, capacity, table_offset = \
+                _DISK_HEADER_STRUCT.unpack_from(self._mmap, 0)
+        if magic == DISK_CONST_DICT_MAGIC:
+            table_end = table_offset + capacity * _DISK_SLOT_STRUCT.size
+            if (table_offset < _DISK_HEADER_STRUCT.size
+                    or table_end != len(self._mmap)
+                    or capacity & (capacity - 1)):
+                magic = None
+        if magic != DISK_CONST_DICT_MAGIC:
+            self.close()
+            err_msg = 'The specified file is not DiskConstDict file.'
+            raise ValueError(err_msg)
+        self._length = length
+        self._capacity = capacity
+        self._table_offset = table_offset
+
+    @classmethod
+    def build(cls, path, source):
+        """
+        Create the indexed file from the dict or JSON file, and open
+        it. The file will be written to the temporary file first and
+        then replaced, so readers never see the incomplete file.
+
+        Parameters
+        ----------
+        path : str
+            The file path to create.
+        source : dict or str
+            The dict value, or the path of JSON file that has an
+            object at the top level.
+
+        Returns
+        -------
+        disk_const_dict : DiskConstDict
+            Opened DiskConstDict of the created file.
+
+        Raises
+        ------
+        ValueError
+            - If the source is not dict.
+            - If the type of a key is not supported.
+        """
+        if isinstance(source, str):
+            with open(source, 'r') as f:
+                source = json.load(f)
+        tmp_path = '%s.tmp%d' % (path, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as f:
+                _write_disk_const_dict(f=f, source=source)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return cls(path=path)
+
+    @staticmethod
+    def build_bytes(source):
+        """
+        Create the bytes of the same format as the file that is
+        created by the build method. The bytes can be opened by the
+        from_buffer method.
+
+        Parameters
+        ----------
+        source : dict
+            The dict value.
+
+        Returns
+        -------
+        buffer : bytes
+            The bytes of the DiskConstDict format.
+
+        Raises
+        ------
+        ValueError
+            - If the source is not dict.
+            - If the type of a key is not supported.
+        """
+        f = io.BytesIO()
+        _write_disk_const_dict(f=f, source=source)
+        return f.getvalue()
+
+    def _find_record(self, key):
+        """
+        Get the byte offset of the record of the specified key by
+        the hash table.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        offset : int or None
+            The byte offset of the record. If the key does not
+            exist, None will be returned.
+        """
+        key_bytes = _encode_disk_key(key=key)
+        if key_bytes is None or self._capacity == 0:
+            return None
+        key_hash = _hash_disk_key(key_bytes=key_bytes)
+        mask = self._capacity - 1
+        slot = key_hash & mask
+        while True:
+            slot_offset = self._table_offset + slot * _DISK_SLOT_STRUCT.size
+            slot_hash, offset = _DISK_SLOT_STRUCT.unpack_from(
+                self._mmap, slot_offset)
+            if offset == 0:
+                return None
+            if slot_hash == key_hash:
+                key_length, _ = _DISK_RECORD_STRUCT.unpack_from(
+                    self._mmap, offset)
+                key_start = offset + _DISK_RECORD_STRUCT.size
+                if self._mmap[key_start:key_start + key_length] == key_bytes:
+                    return offset
+            slot = (slot + 1) & mask
+
+    def __getitem__(self, key):
+        """
+        Get the value of the specified key from the file.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        value : *
+            The value of the specified key. Dict or list value will
+            be converted to ConstDict or ConstList.
+
+        Raises
+        ------
+        KeyError
+            If the specified key does not exist.
+        """
+        try:
+            with self._cache_lock:
+                value = self._cache[key]
+                self._cache.move_to_end(key)
+            return value
+        except KeyError:
+            pass
+        except TypeError:
+            raise KeyError(key)
+        value = _freeze_value(value=self._read_value(key=key), adopt=True)
+        if self._cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = value
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return value
+
+    def _read_value(self, key):
+        """
+        Read and unpickle the value of the specified key. The value
+        will not be converted to not editable value.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        value : *
+            The unpickled value.
+
+        Raises
+        ------
+        KeyError
+            If the specified key does not exist.
+        """
+        offset = self._find_record(key=key)
+        if offset is None:
+            raise KeyError(key)
+        key_length, value_length = _DISK_RECORD_STRUCT.unpack_from(
+            self._mmap, offset)
+        value_start = offset + _DISK_RECORD_STRUCT.size + key_length
+        return pickle.loads(
+            self._mmap[value_start:value_start + value_length])
+
+    def __contains__(self, key):
+        """
+        Return True if the file has the specified key. The value
+        will not be read.
+
+        Parameters
+        ----------
+        key : *
+            Dict key.
+
+        Returns
+        -------
+        result : bool
+            True if the file has the specified key.
+        """
+        return self._find_record(key=key) is not None
+
+    def __iter__(self):
+        """
+        Iterate the keys in the order of the source dict.
+
+        Returns
+        -------
+        iterator : iterator
+            The iterator of the keys.
+        """
+        offset = _DISK_HEADER_STRUCT.size
+        while offset < self._table_offset:
+            key_length, value_length = _DISK_RECORD_STRUCT.unpack_from(
+                self._mmap, offset)
+            key_start = offset + _DISK_RECORD_STRUCT.size
+            yield _decode_disk_key(
+                key_bytes=self._mmap[key_start:key_start + key_length])
+            offset = key_start + key_length + value_length
+
+    def __len__(self):
+        """
+        Get the number of entries.
+
+        Returns
+        -------
+        length : int
+            The number of entries.
+        """
+        return self._length
+
+    def __repr__(self):
+        """
+        Get the text that has the file path. Entries will not be
+        displayed because the file may be very large.
+
+        Returns
+        -------
+        output_str : str
+            The text that display to console or output cell.
+        """
+        if self._path is None:
+            return '%s(<%d bytes>)' % (
+                self.__class__.__name__, len(self._mmap))
+        return '%s(%r)' % (self.__class__.__name__, self._path)
+
+    def __reduce__(self):
+        """
+        Pickle this object by the file path, so the other process
+        opens the same file instead of copying entries. The object
+        that is opened by the from_buffer method will be pickled by
+        the bytes.
+
+        Returns
+        -------
+        reduce_value : tuple
+            The function and the arguments.
+        """
+        if self._path is None:
+            return (
+                self.__class__.from_buffer, (self._mmap, self._cache_size))
+        return (self.__class__, (self._path, self._cache_size))
+
+    def close(self):
+        """
+        Close the mmap and the file. If the object is opened by the
+        from_buffer method, nothing will be done.
+        """
+        if self._file is None:
+            return
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        """
+        Use this object as the context manager that closes the file
+        at the end.
+
+        Returns
+        -------
+        self : DiskConstDict
+            This object.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the mmap and the file at the end of the with block.
+        """
+        self.close()
+
+
+ConstGroupMember = namedtuple('ConstGroupMember', ['name', 'value'])
+
+
+class ConstGroup(object):
+    """
+    The enum-like class that defines the fixed set of named constant
+    values at once (e.g., status codes or plan tiers). Each group has
+    its own class whose __slots__ are the member names, so reading a
+    member value is a slot access, and the reverse index of values is
+    built at the definition.
+
+    Parameters
+    ----------
+    group_name : str
+        The name of the group. This will be used by the class name
+        and the output of print function.
+    members : dict or list of tuple
+        Member names and values. Names must be identifiers that do
+        not start with underscore, and values must be hashable and
+        unique in the group.
+
+    Attributes
+    ----------
+    _group_name : str
+        The name of the group.
+    _members : tuple of ConstGroupMember
+        Members in the definition order.
+    _name_members : dict
+        The index of members. Keys are member names.
+    _value_members : dict
+        The reverse index of members. Keys are member values.
+
+    Raises
+    ------
+    ValueError
+        - If the group name is not str.
+        - If the member name is not acceptable.
+        - If the same member name or value is included more than once.
+        - If the member value is not hashable.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.STATUS = const.ConstGroup(
+    ...     'STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+    >>> const.STATUS.ACTIVE
+    [Out] 1
+    >>> const.STATUS.member_of(2)
+    [Out] ConstGroupMember(name='SUSPENDED', value=2)
+    >>> 3 in const.STATUS
+    [Out] False
+    """
+
+    __slots__ = ('_group_name', '_members', '_name_members', '_value_members')
+
+    def __new__(cls, group_name, members):
+        if not isinstance(group_name, str):
+            err_msg = 'The type of group name is not str.'
+            raise ValueError(err_msg)
+        if isinstance(members, Mapping):
+            members = members.items()
+        members = tuple(
+            ConstGroupMember(name=name, value=value)
+            for name, value in members)
+        name_members = {}
+        value_members = {}
+        for member in members:
+            if (not isinstance(member.name, str)
+                    or not member.name.isidentifier()
+                    or member.name.startswith('_')
+                    or hasattr(ConstGroup, member.name)):
+                err_msg = (
+                    'The member name %r is not acceptable.' % (member.name,))
+                raise ValueError(err_msg)
+            if member.name in name_members:
+                err_msg = (
+                    'The member name "%s" is included more than once.'
+                    % member.name)
+                raise ValueError(err_msg)
+            try:
+                is_duplicated = member.value in value_members
+            except TypeError:
+                err_msg = (
+                    'The value of member "%s" is not hashable.'
+                    % member.name)
+                raise ValueError(err_msg)
+            if is_duplicated:
+                err_msg = (
+                    'The value of member "%s" is the same as member "%s".'
+                    % (member.name, value_members[member.value].name))
+                raise ValueError(err_msg)
+            name_members[member.name] = member
+            value_members[member.value] = member
+        group_class = type(group_name, (cls,), {
+            '__slots__': tuple(name_members)})
+        self = object.__new__(group_class)
+        object.__setattr__(self, '_group_name', group_name)
+        object.__setattr__(self, '_members', members)
+        object.__setattr__(self, '_name_members', name_members)
+        object.__setattr__(self, '_value_members', value_members)
+        for member in members:
+            object.__setattr__(self, member.name, member.value)
+        return self
+
+    def member_of(self, value):
+        """
+        Get the member of the specified value.
+
+        Parameters
+        ----------
+        value : *
+            The member value.
+
+        Returns
+        -------
+        member : ConstGroupMember or None
+            The member that has the value. If there is no such
+            member, None will be returned.
+        """
+        try:
+            return self._value_members.get(value)
+        except TypeError:
+            return None
+
+    def __getitem__(self, name):
+        """
+        Get the member value of the specified name.
+
+        Parameters
+        ----------
+        name : str
+            The member name.
+
+        Returns
+        -------
+        value : *
+            The member value.
+
+        Raises
+        ------
+        KeyError
+            If the specified member does not exist.
+        """
+        return self._name_members[name].value
+
+    def __contains__(self, value):
+        """
+        Return True if the group has the member of specified value.
+
+        Parameters
+        ----------
+        value : *
+            The member value.
+
+        Returns
+        -------
+        result : bool
+            Return True if the group has the member of the value.
+        """
+        try:
+            return value in self._value_members
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        """
+        Iterate the members in the definition order.
+
+        Returns
+        -------
+        iterator : iterator of ConstGroupMember
+            The members.
+        """
+        return iter(self._members)
+
+    def __len__(self):
+        """
+        Get the number of members.
+
+        Returns
+        -------
+        length : int
+            The number of members.
+        """
+        return len(self._members)
+
+    def __setattr__(self, name, value):
+        """
+        This method will always raise error in order to prevent the
+        member value update.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Update of group member is not allowed.'
+        raise ConstantError(err_msg)
+
+    def __delattr__(self, name):
+        """
+        This method will always raise error in order to prevent the
+        member deletion.
+
+        Raises
+        ------
+        ConstantError
+            This method will always raise error.
+        """
+        err_msg = 'Deletion of group member is not allowed.'
+        raise ConstantError(err_msg)
+
+    def __copy__(self):
+        """
+        Return this object itself, because the value is not editable.
+
+        Returns
+        -------
+        self : ConstGroup
+            This object.
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        """
+        Return this object itself, because the value is not editable
+        recursively.
+
+        Parameters
+        ----------
+        memo : dict
+            The memo dict of deepcopy.
+
+        Returns
+        -------
+        self : ConstGroup
+            This object.
+        """
+        return self
+
+    def __reduce__(self):
+        """
+        Pickle this object by the group name and members, because
+        the class of each group is created dynamically.
+
+        Returns
+        -------
+        reduce_value : tuple
+            The class and the constructor arguments.
+        """
+        return (ConstGroup, (self._group_name, [
+            tuple(member) for member in self._members]))
+
+    def __repr__(self):
+        """
+        Get the text of the group name and members.
+
+        Returns
+        -------
+        output_str : str
+            The text that display to console or output cell.
+        """
+        return '%s(%s)' % (self._group_name, ', '.join([
+            '%s=%r' % (member.name, member.value)
+            for member in self._members]))
+
+
+def _write_disk_const_dict(f, source):
+    """
+    Write the header, records and hash table of DiskConstDict.
+
+    Parameters
+    ----------
+    f : file
+        The seekable binary file (or BytesIO) to write.
+    source : dict
+        The dict value.
+
+    Raises
+    ------
+    ValueError
+        - If the source is not dict.
+        - If the type of a key is not supported.
+    """
+    if not isinstance(source, Mapping):
+        err_msg = 'The type of passed value is not dict.'
+        raise ValueError(err_msg)
+    capacity = 1
+    while capacity < len(source) * 2:
+        capacity *= 2
+    slots = [(0, 0)] * capacity
+    mask = capacity - 1
+    f.write(_DISK_HEADER_STRUCT.pack(DISK_CONST_DICT_MAGIC, 0, 0, 0))
+    offset = _DISK_HEADER_STRUCT.size
+    for key, value in source.items():
+        key_bytes = _encode_disk_key(key=key)
+        if key_bytes is None:
+            err_msg = 'The type of key is not supported: %r' % (key,)
+            raise ValueError(err_msg)
+        value_bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        f.write(_DISK_RECORD_STRUCT.pack(len(key_bytes), len(value_bytes)))
+        f.write(key_bytes)
+        f.write(value_bytes)
+        key_hash = _hash_disk_key(key_bytes=key_bytes)
+        slot = key_hash & mask
+        while slots[slot][1] != 0:
+            slot = (slot + 1) & mask
+        slots[slot] = (key_hash, offset)
+        offset += _DISK_RECORD_STRUCT.size + len(key_bytes) + len(value_bytes)
+    for key_hash, record_offset in slots:
+        f.write(_DISK_SLOT_STRUCT.pack(key_hash, record_offset))
+    f.seek(0)
+    f.write(_DISK_HEADER_STRUCT.pack(
+        DISK_CONST_DICT_MAGIC, len(source), capacity, offset))
+
+
+def _encode_disk_key(key):
+    """
+    Encode the key of DiskConstDict to bytes.
+
+    Parameters
+    ----------
+    key : *
+        Dict key.
+
+    Returns
+    -------
+    key_bytes : bytes or None
+        Encoded key that has the type prefix. Keys that are equal to
+        int (bool and float of integer value) will be encoded as int,
+        in the same way as dict. If the type of key is not supported,
+        None will be returned.
+    """
+    if isinstance(key, str):
+        return b's' + key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, float) and key.is_integer():
+        key = int(key)
+    if isinstance(key, int):
+        return b'i' + str(int(key)).encode('ascii')
+    if isinstance(key, bytes):
+        return b'b' + key
+    return None
+
+
+def _decode_disk_key(key_bytes):
+    """
+    Decode the key of DiskConstDict from bytes.
+
+    Parameters
+    ----------
+    key_bytes : bytes
+        Encoded key that has the type prefix.
+
+    Returns
+    -------
+    key : str, int or bytes
+        Decoded key.
+    """
+    prefix = key_bytes[:1]
+    if prefix == b's':
+        return key_bytes[1:].decode('utf-8', 'surrogatepass')
+    if prefix == b'i':
+        return int(key_bytes[1:])
+    return bytes(key_bytes[1:])
+
+
+def _hash_disk_key(key_bytes):
+    """
+    Get the hash value of the encoded key. This value is stable
+    between processes (unlike the built-in hash function).
+
+    Parameters
+    ----------
+    key_bytes : bytes
+        Encoded key.
+
+    Returns
+    -------
+    key_hash : int
+        64bit hash value.
+    """
+    digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _to_typed_column(column):
+    """
+    Convert the column values to typed array if all values are int
+    (in 64bit range) or all values are float, otherwise to tuple.
+
+    Parameters
+    ----------
+    column : list
+        The column values.
+
+    Returns
+    -------
+    column : array or tuple
+        Converted column.
+    """
+    if column and all(type(value) is int for value in column):
+        try:
+            return array('q', column)
+        except OverflowError:
+            return tuple(column)
+    if column and all(type(value) is float for value in column):
+        return array('d', column)
+    return tuple(column)
+
+
+def _is_record_list(list_value, record_min_rows):
+    """
+    Get a boolean whether the specified list can be stored as
+    ConstRecordList or not.
+
+    Parameters
+    ----------
+    list_value : list
+        The list value to check.
+    record_min_rows : int or None
+        The minimum number of rows. If None is specified, result
+        will always be False.
+
+    Returns
+    -------
+    result : bool
+        True if the list has at least record_min_rows dicts and
+        all of them have the same (and not empty) keys.
+    """
+    if record_min_rows is None or len(list_value) < record_min_rows:
+        return False
+    if not list_value:
+        return False
+    keys = None
+    for value in list_value:
+        if not isinstance(value, dict) or isinstance(value, ConstDict):
+            return False
+        if keys is None:
+            keys = value.keys()
+            if not keys:
+                return False
+            continue
+        if value.keys() != keys:
+            return False
+    return True
+
+
+def _freeze_value(
+    value,
+    record_min_rows=None,
+    validator=None,
+    adopt=False,
+    shapes=None,
+):
+    """
+    Convert the value to not editable value by the freezer of the
+    value type. e.g., the dict will be converted to ConstDict and the
+    list will be converted to ConstList (or ConstRecordList). Already
+    converted values and the values of types that have no freezer
+    will be returned as they are.
+
+    Parameters
+    ----------
+    value : *
+        The value to convert.
+    record_min_rows : int or None, default None
+        The minimum number of rows to store list of same-keys dicts
+        as ConstRecordList. If None is specified, ConstRecordList
+        will not be used.
+    validator : _SchemaValidator or None, default None
+        The compiled schema of the value. The value and the nested
+        values will be validated while they are converted.
+    adopt : bool, default False
+        If False, the passed value will not be changed. If True,
+        the passed dicts and lists will be taken over and nested
+        values will be replaced in place instead of the shallow
+        copies of the dicts and lists.
+    shapes : dict or None, default None
+        The shape record classes. Dicts whose keys (tuple of keys
+        in the order) are in this dict will be converted to the
+        shape records instead of ConstDict.
+
+    Returns
+    -------
+    value : *
+        Converted value.
+
+    Raises
+    ------
+    ConstantSchemaError
+        If the value does not match the schema.
+    """
+    if validator is not None:
+        validator.check_value(value=value)
+    freezer = _FREEZER_CACHE[type(value)]
+    if freezer is None:
+        return value
+    return freezer(value, record_min_rows, validator, adopt, shapes)
+
+
+def _freeze_frozen(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of already converted values. The value will be
+    returned as it is (and validated if the validator is specified).
+    """
+    if validator is not None:
+        validator.validate_tree(value=value)
+    return value
+
+
+def _freeze_dict(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of dict. The dict will be converted to ConstDict,
+    or the shape record if the shape of the dict is in the shapes.
+    """
+    if shapes:
+        record_class = shapes.get(_get_shape_key(keys=tuple(value)))
+        if record_class is not None:
+            return record_class._from_dict(
+                dict_val=value, record_min_rows=record_min_rows,
+                validator=validator, adopt=adopt, shapes=shapes)
+    return ConstDict(
+        dict_val=value, record_min_rows=record_min_rows,
+        validator=validator, adopt=adopt, shapes=shapes)
+
+
+def _freeze_list(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of list. The list will be converted to ConstList,
+    or ConstRecordList if the list has enough same-keys dicts.
+    """
+    if _is_record_list(list_value=value, record_min_rows=record_min_rows):
+        return ConstRecordList(
+            records=value, record_min_rows=record_min_rows,
+            validator=validator, adopt=adopt, shapes=shapes)
+    return ConstList(
+        list_value=value, record_min_rows=record_min_rows,
+        validator=validator, adopt=adopt, shapes=shapes)
+
+
+def _freeze_tuple(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of tuple. Items of the tuple will be converted, and
+    the tuple type (e.g., namedtuple) will be kept. If no item is
+    changed, the tuple will be returned as it is.
+    """
+    items = [
+        _freeze_value(
+            value=item, record_min_rows=record_min_rows, adopt=adopt,
+            shapes=shapes)
+        for item in value]
+    if all(item is original for item, original in zip(items, value)):
+        return value
+    if type(value) is tuple:
+        return tuple(items)
+    if hasattr(value, '_fields'):
+        return type(value)(*items)
+    return type(value)(items)
+
+
+def _freeze_set(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of set. The set will be converted to frozenset.
+    """
+    return frozenset(value)
+
+
+def _freeze_bytearray(value, record_min_rows, validator, adopt, shapes):
+    """
+    The freezer of bytearray. The bytearray will be converted to
+    bytes.
+    """
+    return bytes(value)
+
+
+class _FreezerCache(dict):
+    """
+    The cache of freezers per concrete type. Keys are types and
+    values are freezers (or None if the type has no freezer). The
+    freezer of a type that is not cached yet will be resolved by
+    the MRO of the type at the first lookup, so freezing loops need
+    only one dict lookup per value. The classes that are created at
+    runtime (the classes of ConstShapeRecord shapes and ConstGroup
+    groups) are resolved each time and not cached, so the cache
+    does not keep them alive after their objects are freed.
+    """
+
+    def __missing__(self, value_type):
+        """
+        Resolve and cache the freezer of the specified type.
+
+        Parameters
+        ----------
+        value_type : type
+            The type of the value.
+
+        Returns
+        -------
+        freezer : function or None
+            The freezer of the nearest registered base class. If
+            there is no such class, None will be returned.
+        """
+        freezer = None
+        for cls in value_type.__mro__:
+            if cls in _FREEZERS:
+                freezer = _FREEZERS[cls]
+                break
+        if not issubclass(value_type, (ConstShapeRecord, ConstGroup)):
+            self[value_type] = freezer
+        return freezer
+
+
+_FREEZERS = {
+    dict: _freeze_dict,
+    list: _freeze_list,
+    tuple: _freeze_tuple,
+    set: _freeze_set,
+    bytearray: _freeze_bytearray,
+    ConstDict: _freeze_frozen,
+    ConstList: _freeze_frozen,
+    ConstRecordList: _freeze_frozen,
+    _ConstMapping: _freeze_frozen,
+    ConstGroup: _freeze_frozen,
+}
+
+_FREEZER_CACHE = _FreezerCache()
+
+
+_DEFAULT_FREEZERS = dict(_FREEZERS)
+
+
+def register_freezer(value_type, freezer):
+    """
+    Register the freezer of the specified type. Values of the type
+    (and its subclasses that have no other freezer) will be converted
+    by the freezer when they are set to constants.
+
+    Parameters
+    ----------
+    value_type : type
+        The type of values to convert.
+    freezer : function
+        The function that takes the value and returns the converted
+        value. The returned value will also be converted (e.g., the
+        returned list will be ConstList), so the freezer can return
+        editable containers. If the freezer returns a value of the
+        type that has the same freezer, it will be returned as it is.
+
+    Notes
+    -----
+    The registry of freezers is global (shared by all Const
+    instances in the process). Use unregister_freezer function to
+    remove the registered freezer (e.g., at the end of tests).
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.register_freezer(MyConfig, lambda value: value.to_tuple())
+    >>> const.CONFIG = MyConfig()
+    """
+    def wrapped_freezer(value, record_min_rows, validator, adopt, shapes):
+        if validator is not None:
+            validator.validate_tree(value=value)
+        value = freezer(value)
+        if _FREEZER_CACHE[type(value)] is wrapped_freezer:
+            return value
+        return _freeze_value(
+            value=value, record_min_rows=record_min_rows, adopt=adopt,
+            shapes=shapes)
+
+    _FREEZERS[value_type] = wrapped_freezer
+    _FREEZER_CACHE.clear()
+
+
+def unregister_freezer(value_type):
+    """
+    Remove the freezer that is registered by register_freezer
+    function. If the type has the default freezer (e.g., dict), the
+    default freezer will be restored. Constants that are already
+    converted will not be changed.
+
+    Parameters
+    ----------
+    value_type : type
+        The type of values that the freezer is registered.
+
+    Raises
+    ------
+    ValueError
+        If the freezer of the specified type is not registered.
+    """
+    freezer = _FREEZERS.get(value_type)
+    if freezer is None or freezer is _DEFAULT_FREEZERS.get(value_type):
+        err_msg = 'The freezer of the specified type is not registered.'
+        raise ValueError(err_msg)
+    if value_type in _DEFAULT_FREEZERS:
+        _FREEZERS[value_type] = _DEFAULT_FREEZERS[value_type]
+    else:
+        del _FREEZERS[value_type]
+    _FREEZER_CACHE.clear()
+
+
+_JSON_SEPARATORS = (',', ':')
+
+
+def _to_json_text(value, is_root=False):
+    """
+    Convert the value to the compact JSON text. The JSON text of
+    ConstDict, ConstList and ConstRecordList will be cached in the
+    root object of the export. Nested objects use their cached texts
+    if they have, but do not store new ones, because caching every
+    subtree makes the cache size grow with depth times size.
+
+    Parameters
+    ----------
+    value : *
+        The value to convert.
+    is_root : bool, default False
+        If True, the JSON text will be cached in the value.
+
+    Returns
+    -------
+    json_str : str
+        The JSON text.
+
+    Raises
+    ------
+    TypeError
+        If the value can not be converted to JSON.
+    """
+    if isinstance(value, _CACHED_EXPORT_TYPES):
+        json_str = value._json_cache
+        if json_str is None:
+            json_str = _encode_json_container(value=value)
+            if is_root:
+                value.__dict__['_json_cache'] = json_str
+        return json_str
+    if isinstance(value, (Mapping, list, tuple)):
+        return _encode_json_container(value=value)
+    if isinstance(value, (set, frozenset)):
+        return _encode_json_container(value=_get_set_items(value=value))
+    return json.dumps(value, separators=_JSON_SEPARATORS)
+
+
+def _encode_json_container(value):
+    """
+    Convert the mapping or sequence to the JSON text. Nested values
+    will be converted by _to_json_text function (so the caches of
+    nested values will be used).
+
+    Parameters
+    ----------
+    value : Mapping or Sequence
+        The value to convert.
+
+    Returns
+    -------
+    json_str : str
+        The JSON text.
+    """
+    if isinstance(value, Mapping):
+        return '{%s}' % ','.join([
+            '%s:%s' % (_to_json_key(key=key), _to_json_text(value=item))
+            for key, item in value.items()])
+    return '[%s]' % ','.join([_to_json_text(value=item) for item in value])
+
+
+def _to_json_key(key):
+    """
+    Convert the dict key to the JSON string in the same way as json
+    module (e.g., 1 will be "1" and True will be "true").
+
+    Parameters
+    ----------
+    key : str, int, float, bool or None
+        The dict key.
+
+    Returns
+    -------
+    json_str : str
+        The JSON string.
+
+    Raises
+    ------
+    TypeError
+        If the key type can not be converted to JSON key.
+    """
+    if not isinstance(key, str):
+        if key is not None and not isinstance(key, (int, float)):
+            err_msg = (
+                'keys must be str, int, float, bool or None, not %s'
+                % type(key).__name__)
+            raise TypeError(err_msg)
+        key = json.dumps(key)
+    return json.dumps(key)
+
+
+def _to_msgpack_bytes(value, is_root=False):
+    """
+    Convert the value to the msgpack bytes. The bytes of ConstDict,
+    ConstList and ConstRecordList will be cached in the same way as
+    _to_json_text function.
+
+    Parameters
+    ----------
+    value : *
+        The value to convert.
+    is_root : bool, default False
+        If True, the msgpack bytes will be cached in the value.
+
+    Returns
+    -------
+    msgpack_bytes : bytes
+        The msgpack bytes.
+
+    Raises
+    ------
+    ImportError
+        If the msgpack library is not installed.
+    """
+    if msgpack is None:
+        err_msg = (
+            'The msgpack library is required to use to_msgpack. '
+            'Please install it (pip install msgpack).')
+        raise ImportError(err_msg)
+    if isinstance(value, _CACHED_EXPORT_TYPES):
+        msgpack_bytes = value._msgpack_cache
+        if msgpack_bytes is None:
+            msgpack_bytes = _encode_msgpack_container(value=value)
+            if is_root:
+                value.__dict__['_msgpack_cache'] = msgpack_bytes
+        return msgpack_bytes
+    if isinstance(value, (Mapping, list, tuple)):
+        return _encode_msgpack_container(value=value)
+    if isinstance(value, (set, frozenset)):
+        return _encode_msgpack_container(
+            value=_get_set_items(value=value))
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _encode_msgpack_container(value):
+    """
+    Convert the mapping or sequence to the msgpack bytes. The map or
+    array header will be written directly, and nested values will be
+    converted by _to_msgpack_bytes function.
+
+    Parameters
+    ----------
+    value : Mapping or Sequence
+        The value to convert.
+
+    Returns
+    -------
+    msgpack_bytes : bytes
+        The msgpack bytes.
+    """
+    if isinstance(value, Mapping):
+        items = [
+            msgpack.packb(key, use_bin_type=True)
+            + _to_msgpack_bytes(value=item)
+            for key, item in value.items()]
+        header = _get_msgpack_header(
+            length=len(items), fix_code=0x80, code16=0xde, code32=0xdf)
+    else:
+        items = [_to_msgpack_bytes(value=item) for item in value]
+        header = _get_msgpack_header(
+            length=len(items), fix_code=0x90, code16=0xdc, code32=0xdd)
+    return header + b''.join(items)
+
+
+def _get_msgpack_header(length, fix_code, code16, code32):
+    """
+    Get the msgpack header of the map or array.
+
+    Parameters
+    ----------
+    length : int
+        The number of entries.
+    fix_code : int
+        The type code of fixmap or fixarray.
+    code16 : int
+        The type code of map 16 or array 16.
+    code32 : int
+        The type code of map 32 or array 32.
+
+    Returns
+    -------
+    header : bytes
+        The header bytes.
+    """
+    if length < 16:
+        return bytes((fix_code | length,))
+    if length < 0x10000:
+        return struct.pack('>BH', code16, length)
+    return struct.pack('>BI', code32, length)
+
+
+def _get_set_items(value):
+    """
+    Get the items of the set (or frozenset) to export it as the
+    array. Items will be sorted if they can be compared, so the
+    output does not depend on the hash order.
+
+    Parameters
+    ----------
+    value : set or frozenset
+        The set value.
+
+    Returns
+    -------
+    items : list
+        The items of the set.
+    """
+    try:
+        return sorted(value)
+    except TypeError:
+        return list(value)
+
+
+_CACHED_EXPORT_TYPES = (ConstDict, ConstList, ConstRecordList)
+
+
+_MEMOIZE_IDENTITY_MARK = object()
+_MEMOIZE_KWARGS_MARK = object()
+
+
+def _make_memoize_key(args, kwargs):
+    """
+    Make the cache key of the function arguments. Not editable values
+    (e.g., ConstDict) are keyed by the object identity instead of the
+    contents, and the other values are keyed by the values themselves.
+
+    Parameters
+    ----------
+    args : tuple
+        Positional arguments.
+    kwargs : dict
+        Keyword arguments.
+
+    Returns
+    -------
+    key : tuple
+        The hashable cache key.
+
+    Notes
+    -----
+    The key has only the ids of not editable values, so the cache
+    entry must also keep the arguments themselves to prevent the ids
+    from being reused by other objects.
+    """
+    key = ()
+    for value in args:
+        if _FREEZER_CACHE[type(value)] is _freeze_frozen:
+            key += ((_MEMOIZE_IDENTITY_MARK, id(value)),)
+        else:
+            key += (value,)
+    if kwargs:
+        key += (_MEMOIZE_KWARGS_MARK,)
+        for name in sorted(kwargs):
+            value = kwargs[name]
+            if _FREEZER_CACHE[type(value)] is _freeze_frozen:
+                key += (name, (_MEMOIZE_IDENTITY_MARK, id(value)))
+            else:
+                key += (name, value)
+    return key
+
+
+def memoize(maxsize=128):
+    """
+    The decorator that caches the results of the function that takes
+    not editable values (e.g., ConstDict or ConstList configuration).
+    Because these values never change, they are keyed by the object
+    identity, so the cache hit takes O(1) time regardless of their
+    size. The other arguments must be hashable and are keyed by
+    their values.
+
+    Parameters
+    ----------
+    maxsize : int or None, default 128
+        The maximum number of cached results. When it is exceeded,
+        the least recently used result will be evicted. If None is
+        specified, results will never be evicted.
+
+    Returns
+    -------
+    decorator : function
+        The decorator. The decorated function has cache_info method
+        that returns the statistics dict (hits, misses, evictions,
+        size and maxsize) and cache_clear method.
+
+    Raises
+    ------
+    ValueError
+        If maxsize is not positive int or None.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> @const.memoize(maxsize=256)
+    ... def compile_routes(routes):
+    ...     return {route['path']: route for route in routes}
+    >>> compile_routes(const.ROUTES)
+    """
+    if callable(maxsize):
+        return memoize()(maxsize)
+    if maxsize is not None and (
+            not isinstance(maxsize, int) or isinstance(maxsize, bool)
+            or maxsize < 1):
+        err_msg = 'maxsize must be positive int or None.'
+        raise ValueError(err_msg)
+
+    def decorator(func):
+        cache = OrderedDict()
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_memoize_key(args=args, kwargs=kwargs)
+            with lock:
+                entry = cache.get(key)
+                if entry is not None:
+                    cache.move_to_end(key)
+                    stats['hits'] += 1
+                    return entry[0]
+                stats['misses'] += 1
+            result = func(*args, **kwargs)
+            with lock:
+                # The arguments are kept with the result, so the ids
+                # in the key are not reused while the entry exists.
+                cache[key] = (result, args, kwargs)
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats['evictions'] += 1
+            return result
+
+        def cache_info():
+            with lock:
+                return {
+                    'hits': stats['hits'],
+                    'misses': stats['misses'],
+                    'evictions': stats['evictions'],
+                    'size': len(cache),
+                    'maxsize': maxsize,
+                }
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats.update(hits=0, misses=0, evictions=0)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+class SchemaRange(object):
+    """
+    The schema that checks the value is in the range. This can be
+    used in the schema of Const.set_schema method.
+
+    Parameters
+    ----------
+    minimum : * or None, default None
+        The minimum value (inclusive). If None is specified, the
+        minimum value will not be checked.
+    maximum : * or None, default None
+        The maximum value (inclusive). If None is specified, the
+        maximum value will not be checked.
+    value_type : type, tuple of types or None, default None
+        If specified, the type of value will also be checked.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.set_schema({
+    ...     'PORT': const.SchemaRange(1, 65535, value_type=int)})
+    """
+
+    def __init__(self, minimum=None, maximum=None, value_type=None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value_type = value_type
+
+
+class _SchemaValidator(object):
+    """
+    The compiled schema. The check function of each node is created
+    once by _compile_schema, so validation does not interpret the
+    schema declaration each time.
+
+    Parameters
+    ----------
+    check : function or None
+        The function that takes the value and raises
+        ConstantSchemaError if the value does not match. None means
+        any value is acceptable.
+    children : dict or None
+        Compiled schemas of the dict values. Keys are dict keys.
+    item : _SchemaValidator or None
+        Compiled schema of the list elements.
+    """
+
+    __slots__ = ('check', 'children', 'item')
+
+    def __init__(self, check, children=None, item=None):
+        self.check = check
+        self.children = children
+        self.item = item
+
+    def check_value(self, value):
+        """
+        Check the value itself (not nested values).
+
+        Parameters
+        ----------
+        value : *
+            The value to check.
+
+        Raises
+        ------
+        ConstantSchemaError
+            If the value does not match the schema.
+        """
+        if self.check is not None:
+            self.check(value)
+
+    def validate_tree(self, value):
+        """
+        Validate the value and all nested values. This will be used
+        for the values that are already converted to not editable
+        values.
+
+        Parameters
+        ----------
+        value : *
+            The value to validate.
+
+        Raises
+        ------
+        ConstantSchemaError
+            If the value does not match the schema.
+        """
+        self.check_value(value=value)
+        if self.children is not None:
+            for key, child in self.children.items():
+                try:
+                    child.validate_tree(value=value[key])
+                except ConstantSchemaError as e:
+                    e.path.append(key)
+                    raise
+        if self.item is not None:
+            for i, item in enumerate(value):
+                try:
+                    self.item.validate_tree(value=item)
+                except ConstantSchemaError as e:
+                    e.path.append(i)
+                    raise
+
+
+def _get_type_names(value_type):
+    """
+    Get the type names text for error message.
+
+    Parameters
+    ----------
+    value_type : type or tuple of types
+        The expected type(s).
+
+    Returns
+    -------
+    type_names : str
+        e.g., 'int or float'.
+    """
+    if isinstance(value_type, tuple):
+        return ' or '.join(t.__name__ for t in value_type)
+    return value_type.__name__
+
+
+def _compile_type_check(value_type):
+    """
+    Create the function that checks the type of value. bool values
+    will not be accepted as int or float, and int values will be
+    accepted as float.
+
+    Parameters
+    ----------
+    value_type : type or tuple of types
+        The expected type(s).
+
+    Returns
+    -------
+    check : function
+        The function that raises ConstantSchemaError if the type of
+        value is not expected.
+    """
+    types = value_type if isinstance(value_type, tuple) else (value_type,)
+    if float in types and int not in types:
+        types = types + (int,)
+    reject_bool = bool not in types and (int in types or float in types)
+    type_names = _get_type_names(value_type=value_type)
+
+    def check(value):
+        if isinstance(value, types) and not (
+                reject_bool and isinstance(value, bool)):
+            return
+        err_msg = 'expected %s, got %s.' % (
+            type_names, type(value).__name__)
+        raise ConstantSchemaError(err_msg)
+
+    return check
+
+
+def _compile_schema(schema):
+    """
+    Compile the schema declaration to the tree of validators.
+
+    Parameters
+    ----------
+    schema : *
+        The schema declaration. Following values are supported:
+        - None or object: any value.
+        - type or tuple of types: isinstance check.
+        - SchemaRange: range (and type) check.
+        - dict: dict that has exactly the same keys. Values are
+          schemas of the dict values.
+        - list that has one schema: list whose elements match the
+          schema.
+        - function: the value is acceptable if it returns True.
+
+    Returns
+    -------
+    validator : _SchemaValidator
+        Compiled schema.
+
+    Raises
+    ------
+    ValueError
+        If the schema declaration is not supported.
+    """
+    if schema is None or schema is object:
+        return _SchemaValidator(check=None)
+    if isinstance(schema, type) or (
+            isinstance(schema, tuple)
+            and all(isinstance(t, type) for t in schema)):
+        return _SchemaValidator(check=_compile_type_check(value_type=schema))
+    if isinstance(schema, SchemaRange):
+        return _SchemaValidator(check=_compile_range_check(schema=schema))
+    if isinstance(schema, dict):
+        children = {
+            key: _compile_schema(schema=child)
+            for key, child in schema.items()}
+        return _SchemaValidator(
+            check=_compile_dict_check(keys=set(schema.keys())),
+            children=children)
+    if isinstance(schema, list) and len(schema) == 1:
+        return _SchemaValidator(
+            check=_check_list_value, item=_compile_schema(schema=schema[0]))
+    if callable(schema):
+        function_name = getattr(schema, '__name__', repr(schema))
+
+        def check(value):
+            if schema(value):
+                return
+            err_msg = '%r is rejected by %s.' % (value, function_name)
+            raise ConstantSchemaError(err_msg)
+
+        return _SchemaValidator(check=check)
+    err_msg = 'Unsupported schema: %r' % (schema,)
+    raise ValueError(err_msg)
+
+
+def _check_list_value(value):
+    """
+    Check the value is list (or ConstRecordList).
+
+    Parameters
+    ----------
+    value : *
+        The value to check.
+
+    Raises
+    ------
+    ConstantSchemaError
+        If the value is not list.
+    """
+    if isinstance(value, (list, ConstRecordList)):
+        return
+    err_msg = 'expected list, got %s.' % type(value).__name__
+    raise ConstantSchemaError(err_msg)
+
+
+def _compile_range_check(schema):
+    """
+    Create the function that checks the value is in the range.
+
+    Parameters
+    ----------
+    schema : SchemaRange
+        The range schema.
+
+    Returns
+    -------
+    check : function
+        The function that raises ConstantSchemaError if the value
+        is not in the range.
+    """
+    type_check = None
+    if schema.value_type is not None:
+        type_check = _compile_type_check(value_type=schema.value_type)
+    minimum = schema.minimum
+    maximum = schema.maximum
+
+    def check(value):
+        if type_check is not None:
+            type_check(value)
+        try:
+            if minimum is not None and value < minimum:
+                err_msg = 'expected value >= %r, got %r.' % (minimum, value)
+                raise ConstantSchemaError(err_msg)
+            if maximum is not None and value > maximum:
+                err_msg = 'expected value <= %r, got %r.' % (maximum, value)
+                raise ConstantSchemaError(err_msg)
+        except TypeError:
+            err_msg = 'expected comparable value, got %s.' % (
+                type(value).__name__)
+            raise ConstantSchemaError(err_msg)
+
+    return check
+
+
+def _compile_dict_check(keys):
+    """
+    Create the function that checks the value is dict that has
+    exactly the specified keys.
+
+    Parameters
+    ----------
+    keys : set
+        The expected keys.
+
+    Returns
+    -------
+    check : function
+        The function that raises ConstantSchemaError if the value
+        is not dict or the keys are different.
+    """
+    def check(value):
+        if not isinstance(value, Mapping):
+            err_msg = 'expected dict, got %s.' % type(value).__name__
+            raise ConstantSchemaError(err_msg)
+        if value.keys() == keys:
+            return
+        missing_keys = keys - set(value.keys())
+        if missing_keys:
+            err_msg = 'missing keys: %r.' % sorted(missing_keys, key=repr)
+            raise ConstantSchemaError(err_msg)
+        unknown_keys = set(value.keys()) - keys
+        err_msg = 'unknown keys: %r.' % sorted(unknown_keys, key=repr)
+        raise ConstantSchemaError(err_msg)
+
+    return check
+
+
+class ConstInstrumentation(object):
+    """
+    The class that records access statistics of constants. This
+    will be created by Const.enable_instrumentation method.
+
+    While the instrumentation is enabled, the classes of Const and
+    its frozen containers are swapped to the instrumented subclasses
+    that record statistics. When disabled, the original classes are
+    restored, so there is no cost on the attribute and item access.
+
+    Item reads are the calls of the read methods of the frozen
+    containers: item access (including get), iteration, membership
+    test (in), keys, values, items, index and count. The container
+    that is shared by multiple constants (or by the namespaces of
+    new_child method) is recorded for all of them. Reads that do not
+    call these methods (e.g., len, or copying by the C functions like
+    json.dumps) are not recorded, so the 'unread_names' may include
+    constants that are only used in such ways.
+
+    Attributes
+    ----------
+    enabled : bool
+        True while the instrumentation is enabled.
+    _stats : dict
+        Keys are constant names and values are dicts of statistics.
+    _rejected_mutations : int
+        The total number of rejected mutations (ConstantError).
+    _instrumented_nodes : list
+        The objects whose classes are swapped.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._stats = {}
+        self._rejected_mutations = 0
+        self._instrumented_nodes = []
+
+    def add_name(self, name):
+        """
+        Start recording statistics of the specified constant name.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+
+        Returns
+        -------
+        stats : dict
+            The statistics of the constant name.
+        """
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = {
+                'reads': 0,
+                'item_reads': 0,
+                'first_access': None,
+                'freeze_seconds': None,
+                'freeze_size': None,
+                'rejected_mutations': 0,
+            }
+            self._stats[name] = stats
+        return stats
+
+    def record_read(self, name):
+        """
+        Record the attribute read of the specified constant name.
+        Names that are not constants will be ignored, and nothing
+        will be recorded after the instrumentation is disabled.
+
+        Parameters
+        ----------
+        name : str
+            Attribute name.
+        """
+        if not self.enabled:
+            return
+        stats = self._stats.get(name)
+        if stats is None:
+            return
+        stats['reads'] += 1
+        if stats['first_access'] is None:
+            stats['first_access'] = time.time()
+
+    def record_item_read(self, name):
+        """
+        Record the item read of the frozen container that belongs
+        to the specified constant name. Nothing will be recorded
+        after the instrumentation is disabled.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        """
+        if not self.enabled:
+            return
+        stats = self._stats.get(name)
+        if stats is None:
+            return
+        stats['item_reads'] += 1
+        if stats['first_access'] is None:
+            stats['first_access'] = time.time()
+
+    def record_rejected_mutation(self, name):
+        """
+        Record the rejected mutation (ConstantError).
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        """
+        self._rejected_mutations += 1
+        self.add_name(name=name)['rejected_mutations'] += 1
+
+    def record_freeze(self, name, seconds, size):
+        """
+        Record the freezing cost of the specified constant.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        seconds : float
+            Elapsed seconds to define (and freeze) the constant.
+        size : int
+            The number of values in the frozen tree.
+        """
+        stats = self.add_name(name=name)
+        stats['freeze_seconds'] = seconds
+        stats['freeze_size'] = size
+
+    def instrument_value(self, name, value):
+        """
+        Swap the classes of the frozen containers in the value tree
+        to the instrumented subclasses.
+
+        Parameters
+        ----------
+        name : str
+            Constant name that the value belongs to.
+        value : *
+            Constant value.
+
+        Returns
+        -------
+        size : int
+            The number of values in the tree (including the
+            containers themselves).
+        """
+        size = 0
+        stack = [value]
+        while stack:
+            node = stack.pop()
+            size += 1
+            if not isinstance(
+                    node,
+                    (ConstDict, ConstList, ConstRecordList, DiskConstDict,
+                     ConstShapeRecord)):
+                continue
+            if isinstance(node, DiskConstDict):
+                size += len(node)
+            elif isinstance(node, ConstDict):
+                stack.extend(dict.values(node))
+            elif isinstance(node, ConstList):
+                stack.extend(list.__iter__(node))
+            elif isinstance(node, ConstShapeRecord):
+                stack.extend(
+                    getattr(node, slot_name)
+                    for slot_name in node._key_slots.values())
+            else:
+                size += len(node._keys) * len(node)
+                for column in node._columns.values():
+                    if isinstance(column, tuple):
+                        stack.extend(
+                            item for item in column
+                            if isinstance(
+                                item,
+                                (ConstDict, ConstList, ConstShapeRecord)))
+            targets = getattr(node, '_instrumentation_targets', None)
+            if targets is None:
+                targets = []
+                object.__setattr__(node, '_instrumentation_targets', targets)
+                object.__setattr__(
+                    node, '__class__',
+                    _get_instrumented_class(cls=node.__class__))
+            if (self, name) in targets:
+                continue
+            if not any(target[0] is self for target in targets):
+                self._instrumented_nodes.append(node)
+            targets.append((self, name))
+        return size
+
+    def restore(self):
+        """
+        Restore the original classes of the instrumented containers
+        and stop recording.
+        """
+        for node in self._instrumented_nodes:
+            targets = node._instrumentation_targets
+            targets[:] = [
+                target for target in targets if target[0] is not self]
+            if targets:
+                # The other instrumentation (e.g., of the parent
+                # namespace) still records this node.
+                continue
+            object.__setattr__(node, '__class__', node._instrumented_base)
+            object.__delattr__(node, '_instrumentation_targets')
+        self._instrumented_nodes = []
+        self.enabled = False
+
+    def snapshot(self, names):
+        """
+        Get the copy of the current statistics.
+
+        Parameters
+        ----------
+        names : list of str
+            Defined constant names. Names that have no statistics
+            will be included with zero reads.
+
+        Returns
+        -------
+        snapshot : dict
+            The dict that has following keys:
+            - 'enabled': whether the instrumentation is enabled.
+            - 'constants': statistics per constant name.
+            - 'unread_names': constant names that are never read.
+            - 'rejected_mutations': total rejected mutations.
+        """
+        for name in names:
+            self.add_name(name=name)
+        constants = {
+            name: dict(stats) for name, stats in self._stats.items()}
+        unread_names = sorted(
+            name for name, stats in constants.items()
+            if name in names
+            and stats['reads'] == 0 and stats['item_reads'] == 0)
+        return {
+            'enabled': self.enabled,
+            'constants': constants,
+            'unread_names': unread_names,
+            'rejected_mutations': self._rejected_mutations,
+        }
+
+
+_INSTRUMENTED_READ_METHOD_NAMES = (
+    '__getitem__', 'get', '__iter__', '__contains__', 'keys', 'values',
+    'items', 'index', 'count',
+)
+
+# The mixin methods of the abstract base classes call __getitem__ or
+# __iter__ methods, so they are already recorded.
+_NOT_INSTRUMENTED_MIXIN_METHODS = tuple(
+    getattr(abc_class, method_name)
+    for abc_class in (Mapping, Sequence)
+    for method_name in _INSTRUMENTED_READ_METHOD_NAMES
+    if method_name in abc_class.__dict__)
+
+_INSTRUMENTED_MUTATION_METHOD_NAMES = (
+    '__setitem__', '__delitem__', 'append', 'clear', 'extend', 'insert',
+    'pop', 'popitem', 'remove', 'reverse', 'setdefault', 'sort', 'update',
+    '__reversed__', '__iadd__', '__imul__',
+)
+
+_INSTRUMENTED_CLASSES = {}
+
+
+def _get_instrumented_class(cls):
+    """
+    Get the instrumented subclass of the specified class. The
+    subclass will be created at the first call and cached. If the
+    class is already instrumented, it will be returned as it is.
+
+    Parameters
+    ----------
+    cls : class
+        Const or the frozen container class.
+
+    Returns
+    -------
+    instrumented_class : class
+        The subclass that records statistics.
+    """
+    if '_instrumented_base' in cls.__dict__:
+        return cls
+    instrumented_class = _INSTRUMENTED_CLASSES.get(cls)
+    if instrumented_class is not None:
+        return instrumented_class
+    if issubclass(cls, Const):
+        namespace = _make_instrumented_const_namespace(base=cls)
+    else:
+        namespace = _make_instrumented_container_namespace(base=cls)
+    namespace['_instrumented_base'] = cls
+    if not cls.__dictoffset__:
+        # Keep the layout of the __slots__ class (e.g., the shape
+        # record), so that the class of the object can be swapped.
+        namespace['__slots__'] = ()
+    instrumented_class = type('Instrumented' + cls.__name__, (cls,), namespace)
+    _INSTRUMENTED_CLASSES[cls] = instrumented_class
+    return instrumented_class
+
+
+def _make_instrumented_container_namespace(base):
+    """
+    Make the methods of the instrumented frozen container class.
+
+    Parameters
+    ----------
+    base : class
+        The frozen container class.
+
+    Returns
+    -------
+    namespace : dict
+        The methods of the instrumented class.
+    """
+    namespace = {}
+
+    def make_read_method(method):
+        def read_method(self, *args, **kwargs):
+            for instrumentation, name in self._instrumentation_targets:
+                instrumentation.record_item_read(name=name)
+            return method(self, *args, **kwargs)
+        return read_method
+
+    def make_mutation_method(method):
+        def mutation_method(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except ConstantError:
+                for instrumentation, name in self._instrumentation_targets:
+                    instrumentation.record_rejected_mutation(name=name)
+                raise
+        return mutation_method
+
+    for method_name in _INSTRUMENTED_READ_METHOD_NAMES:
+        method = getattr(base, method_name, None)
+        if method is None or method in _NOT_INSTRUMENTED_MIXIN_METHODS:
+            continue
+        namespace[method_name] = make_read_method(method=method)
+    for method_name in _INSTRUMENTED_MUTATION_METHOD_NAMES:
+        if hasattr(base, method_name):
+            namespace[method_name] = make_mutation_method(
+                method=getattr(base, method_name))
+
+    def __reduce_ex__(self, protocol):
+        reduce_value = list(base.__reduce_ex__(self, protocol))
+        if reduce_value[0] is self.__class__:
+            reduce_value[0] = base
+        reduce_value[1] = tuple(
+            base if arg is self.__class__ else arg
+            for arg in reduce_value[1])
+        if len(reduce_value) > 2 and isinstance(reduce_value[2], dict):
+            state = dict(reduce_value[2])
+            state.pop('_instrumentation_targets', None)
+            reduce_value[2] = state
+        return tuple(reduce_value)
+
+    namespace['__reduce_ex__'] = __reduce_ex__
+    return namespace
+
+
+def _make_instrumented_const_namespace(base):
+    """
+    Make the methods of the instrumented Const class.
+
+    Parameters
+    ----------
+    base : class
+        Const class.
+
+    Returns
+    -------
+    namespace : dict
+        The methods of the instrumented class.
+    """
+
+    def __getattribute__(self, name):
+        value = base.__getattribute__(self, name)
+        instrumentation = \
+            base.__getattribute__(self, '__dict__')['_instrumentation']
+        instrumentation.record_read(name=name)
+        return value
+
+    def __getattr__(self, name):
+        # The first read of the attached shared constant is not
+        # found by __getattribute__ and decoded here.
+        value = base.__getattr__(self, name)
+        instrumentation = \
+            base.__getattribute__(self, '__dict__')['_instrumentation']
+        instrumentation.record_read(name=name)
+        return value
+
+    def __setattr__(self, name, value):
+        instrumentation = self.__dict__['_instrumentation']
+        start = time.perf_counter()
+        try:
+            base.__setattr__(self, name, value)
+        except ConstantError:
+            instrumentation.record_rejected_mutation(name=name)
+            raise
+        if name.startswith('_Const__'):
+            return
+        size = instrumentation.instrument_value(
+            name=name, value=self.__dict__[name])
+        instrumentation.record_freeze(
+            name=name, seconds=time.perf_counter() - start, size=size)
+
+    def __delattr__(self, name):
+        try:
+            base.__delattr__(self, name)
+        except ConstantError:
+            self.__dict__['_instrumentation'].record_rejected_mutation(
+                name=name)
+            raise
+
+    return {
+        '__getattribute__': __getattribute__,
+        '__getattr__': __getattr__,
+        '__setattr__': __setattr__,
+        '__delattr__': __delattr__,
+    }
+
+
+def _get_deep_memory_sizes(value, seen):
+    """
+    Get the deep memory size of the value, split into the live data
+    and the bookkeeping overhead. Live data is the value that can be
+    accessed as constant (e.g., dict table, items). Overhead is the
+    instance dict of frozen containers and everything that is only
+    reachable from it (e.g., shadow copies of _original_dict and
+    _original_list, hash indexes).
+
+    Parameters
+    ----------
+    value : *
+        The value to measure.
+    seen : set of int
+        Ids of already measured objects. Measured objects will be
+        added, so shared objects are counted only once.
+
+    Returns
+    -------
+    sizes : dict
+        The dict that has 'data' and 'overhead' bytes.
+    """
+    sizes = {'data': 0, 'overhead': 0}
+    overhead_roots = []
+    for category in ('data', 'overhead'):
+        stack = [value] if category == 'data' else overhead_roots
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            sizes[category] += sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                for key, item in dict.items(obj):
+                    stack.append(key)
+                    stack.append(item)
+            elif isinstance(obj, list):
+                stack.extend(list.__iter__(obj))
+            elif isinstance(obj, (tuple, set, frozenset)):
+                stack.extend(obj)
+            elif isinstance(obj, ConstRecordList):
+                stack.append(obj._keys)
+                stack.append(obj._columns)
+            elif isinstance(obj, ConstShapeRecord):
+                stack.extend(
+                    getattr(obj, slot_name)
+                    for slot_name in obj._key_slots.values())
+            if isinstance(
+                    obj,
+                    (ConstDict, ConstList, ConstRecordList, DiskConstDict)):
+                overhead_roots.append(obj.__dict__)
+    return sizes
+
+
+def _parse_const_file(path, parser=None):
+    """
+    Parse the constants file and validate the constant names. This
+    will be called in the worker thread of Const.load_files method.
+
+    Parameters
+    ----------
+    path : str
+        The file path.
+    parser : function or None, default None
+        The function that takes the file path and returns the dict
+        of constant names and values. If None is specified, the file
+        will be parsed as JSON.
+
+    Returns
+    -------
+    path : str
+        The same file path.
+    constants : dict
+        The constant names and values.
+
+    Raises
+    ------
+    ValueError
+        If the parsed value is not dict or a constant name is not
+        str.
+    ConstantError
+        If a constant name is not settable.
+    """
+    if parser is None:
+        with open(path, 'r') as f:
+            constants = json.load(f)
+    else:
+        constants = parser(path)
+    if not isinstance(constants, dict):
+        err_msg = 'The constants file does not have dict value: %s' % path
+        raise ValueError(err_msg)
+    for name in constants:
+        if not isinstance(name, str):
+            err_msg = 'Constant name is not str: %r (%s)' % (name, path)
+            raise ValueError(err_msg)
+        if name in NOT_SETTABLE_CONST_NAMES:
+            raise ConstantError(ERR_MSG_NOT_SETTABLE_CONST_NAME)
+    return path, constants
+
+
+_ENV_TRUE_TEXTS = frozenset(['1', 'true', 'yes', 'on'])
+_ENV_FALSE_TEXTS = frozenset(['0', 'false', 'no', 'off'])
+
+
+def _convert_env_bool(text):
+    """
+    Convert the environment variable text to bool.
+
+    Parameters
+    ----------
+    text : str
+        The text (e.g., 'true', '1', 'no', case insensitive).
+
+    Returns
+    -------
+    value : bool
+        Converted value.
+
+    Raises
+    ------
+    ValueError
+        If the text is not the bool text.
+    """
+    lower_text = text.strip().lower()
+    if lower_text in _ENV_TRUE_TEXTS:
+        return True
+    if lower_text in _ENV_FALSE_TEXTS:
+        return False
+    err_msg = 'invalid bool text: %r' % text
+    raise ValueError(err_msg)
+
+
+def _make_env_json_converter(value_type):
+    """
+    Make the converter that parses the environment variable text as
+    JSON and checks the type of the parsed value.
+
+    Parameters
+    ----------
+    value_type : type
+        The expected type (list or dict).
+
+    Returns
+    -------
+    convert : function
+        The converter that takes the text and returns the value.
+    """
+    def convert(text):
+        value = json.loads(text)
+        if not isinstance(value, value_type):
+            err_msg = 'JSON value is not %s: %r' % (
+                value_type.__name__, text)
+            raise ValueError(err_msg)
+        return value
+
+    return convert
+
+
+_ENV_CONVERTERS = {
+    str: None,
+    int: int,
+    float: float,
+    bool: _convert_env_bool,
+    list: _make_env_json_converter(value_type=list),
+    dict: _make_env_json_converter(value_type=dict),
+}
+
+
+def _convert_env_json_dict(value, converters):
+    """
+    Convert the values of the dict that is parsed from the JSON text
+    of the environment variable by the nested converters, in the same
+    way as the texts of nested environment variables. Values that
+    are not str will be converted from their JSON texts (e.g., 5432
+    will be '5432'), so the converters check the values.
+
+    Parameters
+    ----------
+    value : dict
+        The parsed dict. Values will be replaced in place.
+    converters : dict
+        The nested converters that are compiled by
+        _compile_env_schema function.
+
+    Returns
+    -------
+    value : dict
+        The converted dict.
+
+    Raises
+    ------
+    ValueError
+        If a value can not be converted.
+    """
+    for key, converter in converters.items():
+        if key not in value:
+            continue
+        item = value[key]
+        try:
+            if isinstance(converter, dict):
+                if not isinstance(item, dict):
+                    err_msg = 'JSON value is not dict: %r' % (item,)
+                    raise ValueError(err_msg)
+                value[key] = _convert_env_json_dict(
+                    value=item, converters=converter)
+                continue
+            if not isinstance(item, str):
+                item = json.dumps(item)
+            value[key] = item if converter is None else converter(item)
+        except ValueError as e:
+            err_msg = '%s: %s' % (key, e)
+            raise ValueError(err_msg)
+    return value
+
+
+def _compile_env_schema(schema):
+    """
+    Compile the schema of Const.load_env method to the converters.
+
+    Parameters
+    ----------
+    schema : dict
+        Keys are constant names (or nested key names) and values are
+        str, int, float, bool, list, dict, function that takes the
+        text, or dict of nested schemas.
+
+    Returns
+    -------
+    converters : dict
+        Keys are names and values are converters (None means that
+        the text will be used as it is) or dicts of nested
+        converters.
+
+    Raises
+    ------
+    ValueError
+        If the schema declaration is not supported.
+    """
+    converters = {}
+    for name, value_schema in schema.items():
+        if isinstance(value_schema, dict):
+            converters[name] = _compile_env_schema(schema=value_schema)
+        elif isinstance(value_schema, type):
+            if value_schema not in _ENV_CONVERTERS:
+                err_msg = (
+                    'The environment variable type of "%s" is not '
+                    'supported: %s' % (name, value_schema.__name__))
+                raise ValueError(err_msg)
+            converters[name] = _ENV_CONVERTERS[value_schema]
+        elif callable(value_schema):
+            converters[name] = value_schema
+        else:
+            err_msg = (
+                'The environment variable schema of "%s" is not '
+                'supported: %r' % (name, value_schema))
+            raise ValueError(err_msg)
+    return converters
+
+
+class Const(object):
+    """
+    The class that provides const-like function on Python.
+    This will set as module, so you can skip initialization.
+
+    Attributes
+    ----------
+    ConstantError : class
+        Error class that will use when invalid constant
+        manipulation is done.
+    ConstDict : class
+        The class that makes dict value not editable.
+    ConstList : class
+        The class that makes list value not editable.
+    SortedConstList : class
+        The class that makes sorted list value not editable and
+        provides range queries.
+    ConstRecordList : class
+        The class that stores list of same-keys dicts column-wise
+        and makes them not editable.
+    DiskConstDict : class
+        The class that provides not editable dict that is stored
+        in the file and read by mmap.
+    ConstGroup : class
+        The enum-like class that defines the fixed set of named
+        constant values (e.g., status codes).
+    ConstShapeRecord : class
+        The base class of not editable dicts of repeated key shapes
+        that store only the values in __slots__.
+    ConstantSchemaError : class
+        Error class that will use when the constant value does not
+        match the schema.
+    SchemaRange : class
+        The schema that checks the value is in the range.
+    _is_constructor : bool
+        If current timing is executing constructor,
+        this bool will set to True.
+    _names : list of str
+        List of the defined constant names. This will be sorted
+        when the sorted names are needed at the first time after
+        the names are changed (see _get_sorted_names), so defining
+        many constants does not sort the names each time.
+    _is_names_sorted : bool
+        True if _names is sorted.
+    _value_names : dict
+        Reverse index of the defined constant values. Keys are
+        hashable constant values and values are lists of the
+        constant names.
+    _instrumentation : ConstInstrumentation or None
+        The access statistics that are recorded after
+        enable_instrumentation method is called.
+    _schema : dict or None
+        Compiled schemas of constants that are set by set_schema
+        method. Keys are constant names.
+    _is_strict_schema : bool
+        If True, constant names that are not in the schema will
+        not be accepted.
+    _parent : Const or None
+        The parent namespace that is set by new_child method.
+    _children : weakref.WeakSet or None
+        The child namespaces that are created by new_child method.
+    _inherited : dict
+        The flattened resolution table of the constants that are
+        defined in the ancestor namespaces and not overridden in
+        this namespace. Keys are constant names and values are the
+        values of the nearest ancestor. These values are also
+        stored as attributes, so they can be read like the
+        constants of this namespace.
+    _shared_names : dict
+        The constants that are attached by attach_shared method and
+        not read yet. Keys are constant names and values are
+        DiskConstDict objects of the shared buffers. These names
+        are also added to _names when they are attached.
+
+    Examples
+    --------
+    >>> from pconst import const
+    >>> const.a = 'apple'
+    >>> const.a
+    [Out] 'apple'
+
+    # Following code will raise ConstantError.
+    >>> const.a = 'apple'
+    >>> const.a = 'orange'
+    [Out] ConstantError: Constant value of "a" is not editable.
+
+    # Also can use dict or list.
+    >>> const.fruit = {'apple': 100}
+    >>> const.fruit['apple']
+    [Out] 100
+
+    # Following code will raise ConstantError.
+    >>> const.fruit['apple'] = 200
+    [Out] ConstantError: Update dict value is not allowed.
+
+    Notes
+    -----
+    Following names are used by this class, so you can't set the
+    same constant names (e.g., const.ConstantError = 'apple').
+    - 'ConstantError'
+    - 'ConstDict'
+    - 'ConstList'
+    - 'SortedConstList'
+    - 'ConstRecordList'
+    - 'DiskConstDict'
+    - 'ConstGroup'
+    - 'ConstShapeRecord'
+    - '_has_key'
+    - '_is_settable_const_name'
+    - '_is_constructor'
+    - '_is_acceptable_value'
+    - 'accept_same_value'
+    - 'reject_same_value'
+    - '_names'
+    - '_is_names_sorted'
+    - '_value_names'
+    - '_add_name'
+    - '_remove_name'
+    - '_get_sorted_names'
+    - '_add_to_name_index'
+    - '_remove_from_name_index'
+    - 'names_with_prefix'
+    - 'names_of_value'
+    - 'enable_columnar_records'
+    - 'disable_columnar_records'
+    - 'enable_shape_records'
+    - 'disable_shape_records'
+    - '_instrumentation'
+    - 'enable_instrumentation'
+    - 'disable_instrumentation'
+    - 'instrumentation_snapshot'
+    - 'memory_report'
+    - '_define_many'
+    - 'load_files'
+    - 'ConstantSchemaError'
+    - 'SchemaRange'
+    - '_schema'
+    - '_is_strict_schema'
+    - 'set_schema'
+    - '_freeze_const_value'
+    - 'register_freezer'
+    - 'unregister_freezer'
+    - 'adopt'
+    - 'to_json'
+    - 'to_msgpack'
+    - '_parent'
+    - '_children'
+    - '_inherited'
+    - 'new_child'
+    - '_propagate_to_children'
+    - 'load_env'
+    - 'memoize'
+    - '_shared_names'
+    - 'export_shared'
+    - 'attach_shared'
+    - '_decode_shared_name'
+    - '_decode_shared_names'
+    """
+
+    _is_constructor = True
+    __accept_same_value = False
+    __record_min_rows = None
+    __shape_min_count = None
+
+    def __init__(self):
+        super(Const, self).__init__()
+        self.__dict__['_names'] = []
+        self.__dict__['_is_names_sorted'] = True
+        self.__dict__['_value_names'] = {}
+        self.__dict__['_instrumentation'] = None
+        self.__dict__['_schema'] = None
+        self.__dict__['_is_strict_schema'] = False
+        self.__dict__['_parent'] = None
+        self.__dict__['_children'] = None
+        self.__dict__['_inherited'] = {}
+        self.__dict__['_shared_names'] = {}
+        self.ConstantError = ConstantError
+        self.ConstDict = ConstDict
+        self.ConstList = ConstList
+        self.SortedConstList = SortedConstList
+        self.ConstRecordList = ConstRecordList
+        self.DiskConstDict = DiskConstDict
+        self.ConstGroup = ConstGroup
+        self.ConstShapeRecord = ConstShapeRecord
+        self.ConstantSchemaError = ConstantSchemaError
+        self.SchemaRange = SchemaRange
+        self._is_constructor = False
+
+    def accept_same_value(self):
+        """
+        Switch to a setting that allows equivalent value to be set.
+        """
+        self.__accept_same_value = True
+
+    def reject_same_value(self):
+        """
+        Switch to a setting that does not allow equivalent value to be set.
+        """
+        self.__accept_same_value = False
+
+    def enable_columnar_records(self, min_rows=1000):
+        """
+        Switch to a setting that stores lists of same-keys dicts
+        column-wise as ConstRecordList when they are set.
+
+        Parameters
+        ----------
+        min_rows : int, default 1000
+            The minimum number of rows to store the list as
+            ConstRecordList. Smaller lists will be ConstList.
+        """
+        self.__record_min_rows = min_rows
+
+    def disable_columnar_records(self):
+        """
+        Switch to a setting that stores lists of dicts as ConstList.
+        """
+        self.__record_min_rows = None
+
+    def enable_shape_records(self, min_count=100):
+        """
+        Switch to a setting that stores dicts of repeated key shapes
+        as ConstShapeRecord when they are set. Each record stores
+        only the values in __slots__, and the keys are shared by the
+        class of the shape.
+
+        Parameters
+        ----------
+        min_count : int, default 100
+            The minimum number of dicts of the same keys in one
+            constant value to use the shape record class. Dicts of
+            other shapes will be ConstDict.
+
+        Notes
+        -----
+        The shapes are counted by walking the dicts, lists and
+        tuples of the value before it is frozen, so setting the
+        constant takes additional time (about a quarter of the
+        freezing time of the same value).
+        """
+        self.__shape_min_count = min_count
+
+    def disable_shape_records(self):
+        """
+        Switch to a setting that stores all dicts as ConstDict.
+        """
+        self.__shape_min_count = None
+
+    def enable_instrumentation(self):
+        """
+        Start recording access statistics of constants: per-name
+        read counts, first access time, freeze duration and size,
+        and rejected mutation counts. Previous statistics will be
+        reset.
+
+        Notes
+        -----
+        The classes of this object and its frozen containers will be
+        swapped to the instrumented subclasses while enabled, and
+        restored by disable_instrumentation method. So there is no
+        cost on the constant access when disabled. Attached shared
+        constants that are not read yet will be instrumented when
+        they are decoded.
+        """
+        self.disable_instrumentation()
+        instrumentation = ConstInstrumentation()
+        for name in self._get_sorted_names() + sorted(self._inherited):
+            instrumentation.add_name(name=name)
+            if name in self._shared_names:
+                continue
+            instrumentation.instrument_value(
+                name=name, value=self.__dict__[name])
+        self.__dict__['_instrumentation'] = instrumentation
+        object.__setattr__(
+            self, '__class__', _get_instrumented_class(cls=self.__class__))
+
+    def disable_instrumentation(self):
+        """
+        Stop recording access statistics and restore the original
+        classes. The recorded statistics can be still taken by
+        instrumentation_snapshot method.
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is None or not instrumentation.enabled:
+            return
+        instrumentation.restore()
+        object.__setattr__(
+            self, '__class__', self.__class__._instrumented_base)
+
+    def instrumentation_snapshot(self):
+        """
+        Get the copy of the recorded access statistics.
+
+        Returns
+        -------
+        snapshot : dict
+            The dict that has following keys:
+            - 'enabled': whether the instrumentation is enabled.
+            - 'constants': dict of statistics per constant name
+              ('reads', 'item_reads', 'first_access',
+              'freeze_seconds', 'freeze_size' and
+              'rejected_mutations').
+            - 'unread_names': constant names that are never read.
+            - 'rejected_mutations': total rejected mutations.
+
+        Raises
+        ------
+        ConstantError
+            If the instrumentation has never been enabled.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.enable_instrumentation()
+        >>> const.APPLE_PRICE = 100
+        >>> const.APPLE_PRICE
+        >>> const.instrumentation_snapshot()['constants']['APPLE_PRICE']
+        [Out] {'reads': 1, 'item_reads': 0, 'first_access': 1760000000.0,
+               'freeze_seconds': 1.2e-05, 'freeze_size': 1,
+               'rejected_mutations': 0}
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is None:
+            err_msg = 'Instrumentation has never been enabled.'
+            raise ConstantError(err_msg)
+        return instrumentation.snapshot(
+            names=self._get_sorted_names() + sorted(self._inherited))
+
+    def memory_report(self):
+        """
+        Get the deep memory size of each constant, split into the
+        live data and the bookkeeping overhead (shadow copies and
+        instance dicts of frozen containers, hash indexes, etc.).
+        Objects shared by several constants are counted only once
+        (by the first constant in name order).
+
+        Returns
+        -------
+        report : dict
+            The dict that has following keys:
+            - 'constants': dict of 'data', 'overhead' and 'total'
+              bytes per constant name.
+            - 'data', 'overhead', 'total': total bytes of all
+              constants.
+
+        Notes
+        -----
+        The contents of DiskConstDict files are not included
+        because they are not kept in memory. Attached shared
+        constants that are not read yet will be decoded.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.APPLE_DATA = {'price': 100, 'sales_list': [1, 2]}
+        >>> const.memory_report()['constants']['APPLE_DATA']
+        [Out] {'data': 501, 'overhead': 946, 'total': 1447}
+        """
+        self._decode_shared_names()
+        seen = set()
+        constants = {}
+        data = 0
+        overhead = 0
+        for name in self._get_sorted_names():
+            sizes = _get_deep_memory_sizes(
+                value=self.__dict__[name], seen=seen)
+            sizes['total'] = sizes['data'] + sizes['overhead']
+            constants[name] = sizes
+            data += sizes['data']
+            overhead += sizes['overhead']
+        return {
+            'constants': constants,
+            'data': data,
+            'overhead': overhead,
+            'total': data + overhead,
+        }
+
+    def _define_many(self, items, adopt=False):
+        """
+        Define multiple constants at once. All names are checked
+        and all values are frozen before any constant is defined,
+        so if an error is raised, no constant will be defined.
+
+        Parameters
+        ----------
+        items : list of tuple
+            Tuples of constant name, constant value and the source
+            description (e.g., the file path) that will be used by
+            error message.
+        adopt : bool, default False
+            If True, dicts and lists of the values will be taken
+            over and changed in place instead of copied.
+
+        Raises
+        ------
+        ConstantError
+            - If the same constant name is included more than once.
+            - If the same constant name attibute already exists.
+            - If the constant name is not acceptable because of
+                used by class (e.g., name='ConstantError').
+        """
+        sources = {}
+        for name, value, source in items:
+            if name in sources:
+                err_msg = (
+                    'Constant value of "%s" is defined in both %s and %s.'
+                    % (name, sources[name], source))
+                raise ConstantError(err_msg)
+            sources[name] = source
+            if self._has_key(name) and not self._is_acceptable_value(
+                const_name=name,
+                const_value=value,
+            ) and not '__' in name:
+                err_msg = 'Constant value of "%s" is not editable.' % name
+                raise ConstantError(err_msg)
+            if not self._is_settable_const_name(const_name=name):
+                raise ConstantError(ERR_MSG_NOT_SETTABLE_CONST_NAME)
+        frozen_items = [
+            (name, self._freeze_const_value(
+                name=name, value=value, adopt=adopt))
+            for name, value, _ in items]
+        for name, value in frozen_items:
+            setattr(self, name, value)
+
+    def load_files(self, paths, parser=None, max_workers=1):
+        """
+        Parse many constants files and define all of their constants
+        at once. Parsed constants are merged into this namespace with
+        the usual duplicate name checks, and converted to not editable
+        values in place (see adopt method). If any error is raised, no
+        constant will be defined.
+
+        Parameters
+        ----------
+        paths : list of str
+            The file paths. Each file must have the dict (object) of
+            constant names and values at the top level.
+        parser : function or None, default None
+            The function that takes the file path and returns the
+            dict of constant names and values. If None is specified,
+            files will be parsed as JSON.
+        max_workers : int, default 1
+            The number of threads to read and parse files. If 1 is
+            specified, files will be parsed in the current thread.
+            Threads only overlap waiting for I/O (e.g., files on the
+            network file system), so use this for I/O bound parsers.
+
+        Returns
+        -------
+        names : list of str
+            Defined constant names, in the order of files.
+
+        Raises
+        ------
+        ValueError
+            If a file does not have dict value.
+        ConstantError
+            - If the same constant name is defined in several files.
+            - If the same constant name attibute already exists.
+            - If the constant name is not settable.
+
+        Notes
+        -----
+        Files are not parsed by the process pool. Converting values
+        to not editable values (which is the most of the cost) must
+        be done in this process, and sending the parsed or converted
+        values from other processes needs unpickling that costs more
+        than converting them here.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.load_files(['prices.json', 'features.json'])
+        [Out] ['APPLE_PRICE', 'ORANGE_PRICE', 'FEATURE_SEARCH']
+        """
+        paths = list(paths)
+        if max_workers <= 1 or len(paths) <= 1:
+            results = [
+                _parse_const_file(path=path, parser=parser)
+                for path in paths]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    _parse_const_file, paths, [parser] * len(paths)))
+        items = []
+        for path, constants in results:
+            for name, value in constants.items():
+                items.append((name, value, path))
+        self._define_many(items=items, adopt=True)
+        return [name for name, _, _ in items]
+
+    def load_env(self, prefix='', schema=None, environ=None):
+        """
+        Define constants from environment variables at once. The
+        environment is scanned once, values are converted by the
+        compiled schema, and all constants are defined in one step
+        (if any error is raised, no constant will be defined).
+
+        Parameters
+        ----------
+        prefix : str, default ''
+            Only environment variables that start with this prefix
+            and the underscore separator are loaded, and the prefix
+            (and following underscores) is removed from the names.
+            e.g., APP__DB__HOST will be DB__HOST if 'APP' (or 'APP_')
+            is specified, and APPLICATION_NAME will not be loaded.
+        schema : dict or None, default None
+            Keys are constant names and values are following types:
+            - str: the text as it is (default of names that are not
+              in the schema).
+            - int or float: the number.
+            - bool: 1, true, yes or on / 0, false, no or off (case
+              insensitive).
+            - list or dict: the JSON text, that will be converted
+              to ConstList or ConstDict.
+            - function: the function that takes the text.
+            - dict of schemas: the schemas of nested names. The name
+              can be also set by the JSON text of the dict, and its
+              values are converted by the nested schemas.
+        environ : dict or None, default None
+            The environment variables. If None is specified,
+            os.environ will be used.
+
+        Returns
+        -------
+        names : list of str
+            Defined constant names, in sorted order.
+
+        Raises
+        ------
+        ValueError
+            - If the schema declaration is not supported.
+            - If a value can not be converted.
+            - If a name is used both as a value and as nested names
+              (e.g., APP__DB and APP__DB__HOST).
+        ConstantError
+            - If the same constant name attibute already exists.
+            - If the constant name is not settable.
+
+        Notes
+        -----
+        Double underscores separate nested names, so APP__DB__HOST
+        and APP__DB__PORT will be the DB constant that has the HOST
+        and PORT keys (ConstDict).
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> # APP__DEBUG=true APP__DB__HOST=localhost APP__DB__PORT=5432
+        >>> const.load_env(prefix='APP', schema={
+        ...     'DEBUG': bool, 'DB': {'PORT': int}})
+        [Out] ['DB', 'DEBUG']
+        >>> const.DB['PORT']
+        [Out] 5432
+        """
+        if environ is None:
+            environ = os.environ
+        converters = _compile_env_schema(schema=schema or {})
+        prefix = prefix.rstrip('_')
+        if prefix:
+            prefix += '_'
+        constants = {}
+        value_paths = set()
+        for env_name, text in environ.items():
+            if not env_name.startswith(prefix):
+                continue
+            keys = env_name[len(prefix):].lstrip('_').split('__')
+            if not all(keys):
+                continue
+            converter = converters
+            parent = constants
+            for depth, key in enumerate(keys):
+                if isinstance(converter, dict):
+                    converter = converter.get(key)
+                else:
+                    converter = None
+                if depth == len(keys) - 1:
+                    break
+                if tuple(keys[:depth + 1]) in value_paths:
+                    parent = None
+                    break
+                parent = parent.setdefault(key, {})
+            if parent is None or key in parent:
+                err_msg = (
+                    'Environment variable "%s" conflicts with the other '
+                    'environment variables.' % env_name)
+                raise ValueError(err_msg)
+            nested_converters = None
+            if isinstance(converter, dict):
+                nested_converters = converter
+                converter = _ENV_CONVERTERS[dict]
+            if converter is not None:
+                try:
+                    text = converter(text)
+                    if nested_converters is not None:
+                        text = _convert_env_json_dict(
+                            value=text, converters=nested_converters)
+                except ValueError as e:
+                    err_msg = (
+                        'Environment variable "%s" can not be converted: %s'
+                        % (env_name, e))
+                    raise ValueError(err_msg)
+            parent[key] = text
+            value_paths.add(tuple(keys))
+        names = sorted(constants)
+        self._define_many(items=[
+            (name, constants[name], 'environment variables')
+            for name in names], adopt=True)
+        return names
+
+    def set_schema(self, schema, strict=False):
+        """
+        Set the schema of constants. The schema will be compiled
+        once, and constant values will be validated while they are
+        converted to not editable values (in the same traversal), so
+        invalid constants fail at the definition.
+
+        Parameters
+        ----------
+        schema : dict
+            Keys are constant names and values are schema
+            declarations. Following declarations are supported:
+            - None or object: any value.
+            - type or tuple of types: isinstance check (bool values
+              are not accepted as int or float, and int values are
+              accepted as float).
+            - SchemaRange: range (and type) check.
+            - dict: dict that has exactly the same keys. Values are
+              schemas of the dict values.
+            - list that has one schema: list whose elements match
+              the schema.
+            - function: the value is acceptable if it returns True.
+        strict : bool, default False
+            If True, constant names that are not in the schema will
+            not be accepted.
+
+        Raises
+        ------
+        ValueError
+            If the schema declaration is not supported.
+        ConstantError
+            If already defined constants do not match the schema.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.set_schema({
+        ...     'DB': {'host': str, 'port': const.SchemaRange(1, 65535)},
+        ...     'HOSTS': [str]})
+        >>> const.DB = {'host': 'localhost', 'port': 0}
+        [Out] ConstantSchemaError: Constant value of "DB['port']" does
+              not match the schema: expected value >= 1, got 0.
+        """
+        compiled_schema = {
+            name: _compile_schema(schema=const_schema)
+            for name, const_schema in schema.items()}
+        for name in self._get_sorted_names():
+            validator = compiled_schema.get(name)
+            if validator is None:
+                if strict:
+                    err_msg = (
+                        'Constant name "%s" is not defined in the schema.'
+                        % name)
+                    raise ConstantError(err_msg)
+                continue
+            if name in self._shared_names:
+                continue
+            try:
+                validator.validate_tree(value=self.__dict__[name])
+            except ConstantSchemaError as e:
+                e.path.append(name)
+                raise
+        self.__dict__['_schema'] = compiled_schema
+        self.__dict__['_is_strict_schema'] = strict
+
+    def adopt(self, name, value):
+        """
+        Define the constant by taking over the passed value. Unlike
+        normal setting (e.g., const.a = {...}), nested values of the
+        dicts and lists of the value will be replaced in place, which
+        skips the shallow copy of each dict and list, so the caller
+        must not use or change the passed value after this method is
+        called. ConstDict and ConstList still store their own entries
+        (see ConstDict).
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        value : *
+            Constant value.
+
+        Raises
+        ------
+        ConstantError
+            - If the same constant name attibute already exists.
+            - If the constant name is not acceptable because of
+                used by class (e.g., name='ConstantError').
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.adopt('FRUITS', json.load(f))
+        """
+        self._define_many(items=[(name, value, 'adopt')], adopt=True)
+
+    def new_child(self):
+        """
+        Create the child namespace that inherits the constants of
+        this namespace. The child can define the same constant name
+        as this namespace to override it (e.g., base constants, then
+        environment overrides, then tenant overrides).
+
+        Returns
+        -------
+        child : Const
+            The child namespace. The schema and the settings of
+            this namespace (accept_same_value and columnar records)
+            are also inherited.
+
+        Notes
+        -----
+        The inherited constants are resolved and stored in the
+        child when it is created, and updated when constants are
+        defined in the ancestor namespaces. So reading the inherited
+        constant is the same as reading the constant of the child,
+        regardless of the depth of the chain. Methods like
+        names_with_prefix and to_json cover only the constants
+        defined in the child itself. Attached shared constants of
+        this namespace that are not read yet will be decoded.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.TIMEOUT = 30
+        >>> const.RETRY = 3
+        >>> production = const.new_child()
+        >>> production.TIMEOUT = 10
+        >>> production.TIMEOUT, production.RETRY
+        [Out] (10, 3)
+        """
+        self._decode_shared_names()
+        child = Const()
+        inherited = dict(self._inherited)
+        for name in self._get_sorted_names():
+            inherited[name] = self.__dict__[name]
+        child.__dict__.update(inherited)
+        child.__dict__['_parent'] = self
+        child.__dict__['_inherited'] = inherited
+        child.__dict__['_schema'] = self._schema
+        child.__dict__['_is_strict_schema'] = self._is_strict_schema
+        for name in (
+                '_Const__accept_same_value', '_Const__record_min_rows',
+                '_Const__shape_min_count'):
+            if name in self.__dict__:
+                child.__dict__[name] = self.__dict__[name]
+        if self._children is None:
+            self.__dict__['_children'] = weakref.WeakSet()
+        self._children.add(child)
+        return child
+
+    def _propagate_to_children(self, name, value):
+        """
+        Update the inherited constants of the descendant namespaces
+        after the constant is defined in this namespace. Descendants
+        that define the same name themselves stop the propagation.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        value : *
+            Constant value.
+        """
+        for child in list(self._children):
+            if child._has_key(name):
+                continue
+            child._inherited[name] = value
+            child.__dict__[name] = value
+            instrumentation = child._instrumentation
+            if instrumentation is not None and instrumentation.enabled:
+                instrumentation.add_name(name=name)
+                instrumentation.instrument_value(name=name, value=value)
+            if child._children:
+                child._propagate_to_children(name=name, value=value)
+
+    def export_shared(self, path=None):
+        """
+        Export the constants to the read-only buffer (bytes) or file
+        that can be attached by attach_shared method in the other
+        interpreters (or processes). Each constant is pickled
+        separately with the hash index of names, so the attaching
+        side decodes only the constants that are actually read.
+
+        Parameters
+        ----------
+        path : str or None, default None
+            If specified, the buffer will be written to the file
+            (that can be shared by mmap) instead of bytes.
+
+        Returns
+        -------
+        shared : bytes or str
+            The bytes of the buffer, or the file path if path is
+            specified.
+
+        Raises
+        ------
+        pickle.PicklingError
+            If a constant value can not be pickled.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> shared = const.export_shared()
+        >>> # In the other interpreter:
+        >>> from pconst import const
+        >>> const.attach_shared(shared)
+        """
+        source = {}
+        for name in self._get_sorted_names():
+            if name in self._shared_names:
+                source[name] = self._shared_names[name]._read_value(key=name)
+                continue
+            source[name] = self.__dict__[name]
+        if path is None:
+            return DiskConstDict.build_bytes(source=source)
+        DiskConstDict.build(path=path, source=source).close()
+        return path
+
+    def attach_shared(self, shared):
+        """
+        Attach the constants that are exported by export_shared
+        method. Constants are not decoded at this point; each
+        constant will be decoded (and validated by the schema) when
+        it is read at the first time. Attached names can override
+        the constants inherited from the parent namespace.
+
+        Parameters
+        ----------
+        shared : bytes-like or str
+            The bytes of the buffer, or the file path. The bytes
+            will not be copied, and the file will be read by mmap.
+
+        Returns
+        -------
+        names : list of str
+            Attached constant names.
+
+        Raises
+        ------
+        ValueError
+            If the specified value is not the exported buffer.
+        ConstantError
+            - If the same constant name attibute already exists.
+            - If the constant name is not settable.
+
+        Notes
+        -----
+        Constants are decoded by unpickling, and unpickling data
+        from an untrusted source can execute arbitrary code. So
+        attach only the buffers and files that your own application
+        exported.
+
+        If this namespace has child namespaces (see new_child), the
+        attached constants will be decoded immediately so that the
+        children can inherit them.
+        """
+        if isinstance(shared, str):
+            disk_const_dict = DiskConstDict(path=shared)
+        else:
+            disk_const_dict = DiskConstDict.from_buffer(buffer=shared)
+        names = list(disk_const_dict)
+        for name in names:
+            if not isinstance(name, str) or not self._is_settable_const_name(
+                    const_name=name):
+                raise ConstantError(ERR_MSG_NOT_SETTABLE_CONST_NAME)
+            if self._has_key(name):
+                err_msg = 'Constant value of "%s" is not editable.' % name
+                raise ConstantError(err_msg)
+        for name in names:
+            if name in self._inherited:
+                del self._inherited[name]
+                del self.__dict__[name]
+            self._shared_names[name] = disk_const_dict
+            self._add_name(name=name)
+        if self._children:
+            self._decode_shared_names()
+        return names
+
+    def _decode_shared_name(self, name):
+        """
+        Decode the attached shared constant and define it.
+
+        Parameters
+        ----------
+        name : str
+            Constant name that is attached and not read yet.
+        """
+        disk_const_dict = self._shared_names.pop(name)
+        self._remove_name(name=name)
+        try:
+            self._define_many(items=[(
+                name, disk_const_dict._read_value(key=name),
+                'shared constants')], adopt=True)
+        except Exception:
+            self._shared_names[name] = disk_const_dict
+            self._add_name(name=name)
+            raise
+
+    def _decode_shared_names(self):
+        """
+        Decode all of the attached shared constants that are not
+        read yet. This will be used by the methods that need all
+        constant values (e.g., to_json).
+        """
+        for name in sorted(self._shared_names):
+            self._decode_shared_name(name=name)
+
+    def to_json(self):
+        """
+        Get the JSON text of all constants. Keys are constant names
+        in sorted order. The JSON text of each dict and list constant
+        is cached (see ConstDict.to_json), so repeated exports of
+        unchanged constants only join the cached texts. Sets and
+        frozensets will be converted to arrays (sorted if their
+        items can be compared). Attached shared constants that are
+        not read yet will be decoded.
+
+        Returns
+        -------
+        json_str : str
+            The compact JSON text.
+
+        Raises
+        ------
+        TypeError
+            If a constant can not be converted to JSON.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.APPLE = {'price': 100}
+        >>> const.to_json()
+        [Out] '{"APPLE":{"price":100}}'
+        """
+        self._decode_shared_names()
+        return '{%s}' % ','.join([
+            '%s:%s' % (
+                _to_json_key(key=name),
+                _to_json_text(value=self.__dict__[name], is_root=True))
+            for name in self._get_sorted_names()])
+
+    def to_msgpack(self):
+        """
+        Get the msgpack bytes of all constants. Keys are constant
+        names in sorted order, and the bytes of each dict and list
+        constant will be cached in the same way as to_json method.
+        Attached shared constants that are not read yet will be
+        decoded.
+
+        Returns
+        -------
+        msgpack_bytes : bytes
+            The msgpack bytes.
+
+        Raises
+        ------
+        ImportError
+            If the msgpack library is not installed.
+        """
+        self._decode_shared_names()
+        items = [
+            _to_msgpack_bytes(value=name)
+            + _to_msgpack_bytes(value=self.__dict__[name], is_root=True)
+            for name in self._get_sorted_names()]
+        header = _get_msgpack_header(
+            length=len(items), fix_code=0x80, code16=0xde, code32=0xdf)
+        return header + b''.join(items)
+
+    def memoize(self, maxsize=128):
+        """
+        The decorator that caches the results of the function that
+        takes constant values. ConstDict, ConstList and the other
+        not editable values are keyed by the object identity, so
+        the cache hit takes O(1) time regardless of their size.
+
+        Parameters
+        ----------
+        maxsize : int or None, default 128
+            The maximum number of cached results (least recently
+            used results will be evicted). If None is specified,
+            results will never be evicted.
+
+        Returns
+        -------
+        decorator : function
+            The decorator. The decorated function has cache_info
+            and cache_clear methods.
+
+        Raises
+        ------
+        ValueError
+            If maxsize is not positive int or None.
+        """
+        return memoize(maxsize=maxsize)
+
+    def register_freezer(self, value_type, freezer):
+        """
+        Register the freezer of the specified type. Values of the
+        type will be converted by the freezer when they are set to
+        constants (including nested values of dicts and lists).
+
+        Parameters
+        ----------
+        value_type : type
+            The type of values to convert.
+        freezer : function
+            The function that takes the value and returns not
+            editable value.
+
+        Notes
+        -----
+        The freezers are shared by all Const instances (the registry
+        is global in the process). Use unregister_freezer method to
+        remove the registered freezer.
+        """
+        register_freezer(value_type=value_type, freezer=freezer)
+
+    def unregister_freezer(self, value_type):
+        """
+        Remove the freezer that is registered by register_freezer
+        method. Constants that are already converted will not be
+        changed.
+
+        Parameters
+        ----------
+        value_type : type
+            The type of values that the freezer is registered.
+
+        Raises
+        ------
+        ValueError
+            If the freezer of the specified type is not registered.
+        """
+        unregister_freezer(value_type=value_type)
+
+    def _has_key(self, name):
         """
         Return True if this class has the attribute of specified name.
 
@@ -559,9 +5676,13 @@ class Const(object):
         -------
         result : bool
             Return True if this class has the attribute of
-            specified name.
+            specified name. Constants inherited from the parent
+            namespace are not included, and attached shared
+            constants are included even if they are not read yet.
         """
-        return name in self.__dict__
+        if name in self._shared_names:
+            return True
+        return name in self.__dict__ and name not in self._inherited
 
     def _is_settable_const_name(self, const_name):
         """
@@ -587,7 +5708,7 @@ class Const(object):
         """
         if self._is_constructor:
             return True
-        is_in = const_name in NOT_SETTABLE_CONST_NAMES
+        is_in = const_name in _NOT_SETTABLE_CONST_NAME_SET
         if is_in:
             return False
         return True
@@ -621,11 +5742,240 @@ class Const(object):
             const_name=name)
         if not is_settable:
             raise ConstantError(ERR_MSG_NOT_SETTABLE_CONST_NAME)
-        if isinstance(value, dict):
-            value = ConstDict(dict_val=value)
-        if isinstance(value, list):
-            value = ConstList(list_value=value)
+        if self._is_constructor or name.startswith('_Const__'):
+            self.__dict__[name] = _freeze_value(value=value)
+            return
+        value = self._freeze_const_value(name=name, value=value)
+        if self._has_key(name):
+            self._remove_from_name_index(name=name)
+        elif name in self._inherited:
+            del self._inherited[name]
         self.__dict__[name] = value
+        self._add_to_name_index(name=name, value=value)
+        if self._children:
+            self._propagate_to_children(name=name, value=value)
+
+    def _freeze_const_value(self, name, value, adopt=False):
+        """
+        Convert the constant value to not editable value, with the
+        validation by the schema of the constant name.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        value : *
+            Constant value.
+        adopt : bool, default False
+            If True, dicts and lists of the value will be taken
+            over and changed in place instead of copied.
+
+        Returns
+        -------
+        value : *
+            Converted value.
+
+        Raises
+        ------
+        ConstantError
+            If the schema is strict and the constant name is not
+            in the schema.
+        ConstantSchemaError
+            If the value does not match the schema.
+        """
+        validator = None
+        if self._schema is not None:
+            validator = self._schema.get(name)
+            if validator is None and self._is_strict_schema:
+                err_msg = (
+                    'Constant name "%s" is not defined in the schema.'
+                    % name)
+                raise ConstantError(err_msg)
+        shapes = None
+        if self.__shape_min_count is not None:
+            shapes = _count_dict_shapes(
+                value=value, min_count=self.__shape_min_count)
+        try:
+            return _freeze_value(
+                value=value, record_min_rows=self.__record_min_rows,
+                validator=validator, adopt=adopt, shapes=shapes)
+        except ConstantSchemaError as e:
+            e.path.append(name)
+            raise
+
+    def _add_to_name_index(self, name, value):
+        """
+        Add the constant name to the sorted name index and the
+        value to names reverse index.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        value : *
+            Constant value. If the value is not hashable, it will
+            not be added to the reverse index.
+        """
+        self._add_name(name=name)
+        try:
+            self._value_names.setdefault(value, []).append(name)
+        except TypeError:
+            pass
+
+    def _add_name(self, name):
+        """
+        Add the constant name to the name list. The list will be
+        marked as not sorted unless the name is added to the end
+        in sorted order.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        """
+        names = self._names
+        if self._is_names_sorted and names and names[-1] > name:
+            self.__dict__['_is_names_sorted'] = False
+        names.append(name)
+
+    def _remove_name(self, name):
+        """
+        Remove the constant name from the name list.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+
+        Returns
+        -------
+        result : bool
+            True if the name was in the list.
+        """
+        names = self._names
+        if not self._is_names_sorted:
+            try:
+                names.remove(name)
+            except ValueError:
+                return False
+            return True
+        i = bisect_left(names, name)
+        if i == len(names) or names[i] != name:
+            return False
+        del names[i]
+        return True
+
+    def _get_sorted_names(self):
+        """
+        Get the sorted list of the constant names. The list will be
+        sorted here only if names are added out of order after the
+        last sort.
+
+        Returns
+        -------
+        names : list of str
+            The sorted name list (not a copy, so it must not be
+            changed by the caller).
+        """
+        if not self._is_names_sorted:
+            self._names.sort()
+            self.__dict__['_is_names_sorted'] = True
+        return self._names
+
+    def _remove_from_name_index(self, name):
+        """
+        Remove the constant name from the sorted name index and
+        the value to names reverse index. This will be used when
+        a constant that is allowed to be set again is updated.
+
+        Parameters
+        ----------
+        name : str
+            Constant name.
+        """
+        if not self._remove_name(name=name):
+            return
+        value = self.__dict__[name]
+        try:
+            names = self._value_names.get(value, [])
+        except TypeError:
+            return
+        if name in names:
+            names.remove(name)
+        if not names:
+            self._value_names.pop(value, None)
+
+    def names_with_prefix(self, prefix):
+        """
+        Get the constant names that start with the specified prefix.
+        This takes O(log n + k) time by the sorted name index (the
+        names are sorted at the first call after constants are
+        defined).
+
+        Parameters
+        ----------
+        prefix : str
+            The prefix of constant names.
+
+        Returns
+        -------
+        names : list of str
+            Sorted constant names that start with the prefix.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.FEATURE_A = True
+        >>> const.FEATURE_B = False
+        >>> const.names_with_prefix('FEATURE_')
+        [Out] ['FEATURE_A', 'FEATURE_B']
+        """
+        sorted_names = self._get_sorted_names()
+        names = []
+        i = bisect_left(sorted_names, prefix)
+        while i < len(sorted_names):
+            name = sorted_names[i]
+            if not name.startswith(prefix):
+                break
+            names.append(name)
+            i += 1
+        return names
+
+    def names_of_value(self, value):
+        """
+        Get the constant names that have the specified value.
+        Hashable values are searched by the reverse index, and
+        the other values are searched by linear scan. Attached
+        shared constants that are not read yet will be decoded.
+
+        Parameters
+        ----------
+        value : *
+            The constant value to search.
+
+        Returns
+        -------
+        names : list of str
+            Constant names that have the specified value, in
+            defined order for hashable values.
+
+        Examples
+        --------
+        >>> from pconst import const
+        >>> const.STATUS_OK = 200
+        >>> const.names_of_value(200)
+        [Out] ['STATUS_OK']
+        """
+        self._decode_shared_names()
+        try:
+            return list(self._value_names.get(value, []))
+        except TypeError:
+            pass
+        names = []
+        for name in self._get_sorted_names():
+            if self.__dict__[name] == value:
+                names.append(name)
+        return names
 
     def _is_acceptable_value(
         self,
@@ -649,6 +5999,8 @@ class Const(object):
         """
         if not self.__accept_same_value:
             return False
+        if const_name in self._shared_names:
+            self._decode_shared_name(name=const_name)
         current_attr_value = self.__dict__.get(const_name)
         return current_attr_value == const_value
 
@@ -691,7 +6043,17 @@ class Const(object):
         ------
         ConstantError
             If the specified constant is not defined.
+
+        Notes
+        -----
+        The constant that is attached by attach_shared method will be
+        decoded and defined at the first read, and after that this
+        method will not be called for the constant.
         """
+        shared_names = self.__dict__.get('_shared_names')
+        if shared_names and name in shared_names:
+            self._decode_shared_name(name=name)
+            return self.__dict__[name]
         if not self._has_key(name):
             err_msg = 'Constant value of "%s" is not defined.' % name
             raise ConstantError(err_msg)
@@ -21,6 +21,7 @@ setup(
     ),
     packages=find_packages(),
     install_requires=[],
+    extras_require={'msgpack': ['msgpack']},
     license='MIT',
     classifiers=[
         'Programming Language :: Python :: 3.8',
@@ -4,15 +4,42 @@
 The test module of const.py.
 """
 
+import gc
+import json
+import os
+import pickle
+import shutil
 import sys
+import tempfile
 sys.path.append('../')
 
+from collections import OrderedDict, namedtuple
+from copy import copy, deepcopy
 from unittest import TestCase
 from nose.tools import (  # type: ignore
     assert_equal, assert_true, assert_false,
 )
 
 from pconst import const
+from pconst.const import (
+    Const, _freeze_value, _FREEZER_CACHE, _get_shape_record_class,
+    _SHAPE_RECORD_CLASSES, _get_shape_key,
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MutableValue(object):
+    """
+    The editable value that has no freezer, to check the values
+    that are not converted.
+    """
+
+    def __init__(self):
+        self.items = [100]
 
 
 def assert_raises_if_const_added(const_name, const_value):
@@ -41,6 +68,34 @@ def assert_raises_if_const_added(const_name, const_value):
     raise AssertionError(err_msg)
 
 
+def assert_raises_if_const_added_to(const_, const_name, const_value):
+    """
+    Check the ConstantError will raise if the constant is set to the
+    specified Const object.
+
+    Parameters
+    ----------
+    const_ : Const
+        The Const object.
+    const_name : str
+        Specified target constant name.
+    const_value : *
+        Specified target constant value.
+
+    Raises
+    ------
+    AssertionError
+        If the ConstantError will not raised.
+    """
+    try:
+        setattr(const_, const_name, const_value)
+    except const.ConstantError:
+        return
+    err_msg = 'The ConstantError not raised.'
+    err_msg += '\nconst name: %s' % const_name
+    raise AssertionError(err_msg)
+
+
 def assert_class_constructor_will_raise_error(
         target_class, error_class, args):
     """
@@ -69,6 +124,34 @@ def assert_class_constructor_will_raise_error(
     err_msg += '\n error class: %s' % error_class
 
 
+def assert_msgpack_equal(export_func, expected_value):
+    """
+    Check the msgpack bytes of export function will be unpacked to
+    the expected value. If the msgpack library is not installed,
+    check the ImportError will raise instead.
+
+    Parameters
+    ----------
+    export_func : function
+        The function that returns msgpack bytes.
+    expected_value : *
+        The expected unpacked value.
+
+    Raises
+    ------
+    AssertionError
+        If the unpacked value is not the expected value.
+    """
+    if msgpack is None:
+        try:
+            export_func()
+        except ImportError:
+            return
+        raise AssertionError('ImportError not raised without msgpack.')
+    unpacked_value = msgpack.unpackb(export_func(), strict_map_key=False)
+    assert_equal(unpacked_value, expected_value)
+
+
 class TestConst(TestCase):
 
     def test__has_key(self):
@@ -161,6 +244,858 @@ class TestConst(TestCase):
 
         const.reject_same_value()
 
+    def test__add_to_name_index(self):
+        const_ = Const()
+        assert_equal(const_._get_sorted_names(), [])
+        const_.b = 100
+        const_.a = [100]
+        const_.c = 100
+        assert_equal(const_._get_sorted_names(), ['a', 'b', 'c'])
+        assert_equal(const_._value_names, {100: ['b', 'c']})
+
+    def test__add_name(self):
+        const_ = Const()
+        const_._add_name(name='a')
+        const_._add_name(name='c')
+        assert_true(const_._is_names_sorted)
+        const_._add_name(name='b')
+        assert_false(const_._is_names_sorted)
+        assert_equal(const_._names, ['a', 'c', 'b'])
+
+    def test__remove_name(self):
+        const_ = Const()
+        for name in ['a', 'c', 'b']:
+            const_._add_name(name=name)
+        assert_true(const_._remove_name(name='c'))
+        assert_false(const_._remove_name(name='d'))
+        assert_equal(const_._get_sorted_names(), ['a', 'b'])
+        assert_true(const_._remove_name(name='a'))
+        assert_false(const_._remove_name(name='a'))
+        assert_equal(const_._names, ['b'])
+
+    def test__get_sorted_names(self):
+        const_ = Const()
+        const_.b = 100
+        const_.a = 200
+        assert_false(const_._is_names_sorted)
+        assert_equal(const_._get_sorted_names(), ['a', 'b'])
+        assert_true(const_._is_names_sorted)
+        assert_true(const_._get_sorted_names() is const_._names)
+
+    def test__remove_from_name_index(self):
+        const_ = Const()
+        const_.a__b = 100
+        const_.a__b = 200
+        assert_equal(const_._get_sorted_names(), ['a__b'])
+        assert_equal(const_._value_names, {200: ['a__b']})
+
+        const_.accept_same_value()
+        const_.c = 300
+        const_.c = 300
+        assert_equal(const_._get_sorted_names(), ['a__b', 'c'])
+        assert_equal(const_._value_names, {200: ['a__b'], 300: ['c']})
+
+    def test_names_with_prefix(self):
+        const_ = Const()
+        const_.FEATURE_B = True
+        const_.FEATURE_A = False
+        const_.FEATURES = 100
+        const_.OTHER_FEATURE_C = True
+        assert_equal(
+            const_.names_with_prefix('FEATURE_'), ['FEATURE_A', 'FEATURE_B'])
+        assert_equal(
+            const_.names_with_prefix('FEATURE'),
+            ['FEATURES', 'FEATURE_A', 'FEATURE_B'])
+        assert_equal(const_.names_with_prefix('Z'), [])
+        assert_equal(len(const_.names_with_prefix('')), 4)
+
+    def test_names_of_value(self):
+        const_ = Const()
+        const_.STATUS_OK = 200
+        const_.HTTP_OK = 200
+        const_.STATUS_NOT_FOUND = 404
+        const_.PRICES = {'apple': 100}
+        assert_equal(
+            const_.names_of_value(200), ['STATUS_OK', 'HTTP_OK'])
+        assert_equal(const_.names_of_value(404), ['STATUS_NOT_FOUND'])
+        assert_equal(const_.names_of_value(500), [])
+        assert_equal(const_.names_of_value({'apple': 100}), ['PRICES'])
+
+    def test_enable_instrumentation(self):
+        const_ = Const()
+        const_.a = {'b': [100]}
+        const_.enable_instrumentation()
+        assert_true(isinstance(const_, Const))
+        assert_false(type(const_) is Const)
+        assert_false(type(const_.a) is const.ConstDict)
+        assert_false(type(const_.a['b']) is const.ConstList)
+        const_.c = {'d': 100}
+        assert_false(type(const_.c) is const.ConstDict)
+
+        unpickled_dict = pickle.loads(pickle.dumps(const_.a))
+        assert_true(type(unpickled_dict) is const.ConstDict)
+        assert_equal(unpickled_dict, {'b': [100]})
+        const_.disable_instrumentation()
+
+        const_.enable_instrumentation()
+        const_.enable_instrumentation()
+        assert_true(type(const_).__bases__ == (Const,))
+        const_.disable_instrumentation()
+        assert_true(type(const_) is Const)
+        assert_true(type(const_.a) is const.ConstDict)
+        _ = const_.c
+        snapshot = const_.instrumentation_snapshot()
+        assert_false(snapshot['enabled'])
+        assert_equal(snapshot['constants']['c']['reads'], 0)
+
+        const_ = Const()
+        const_.enable_shape_records(min_count=2)
+        const_.a = [{'b': 100, 'c': [1]}, {'b': 200, 'c': [2]}]
+        record_class = type(const_.a[0])
+        const_.enable_instrumentation()
+        assert_false(type(const_.a[0]) is record_class)
+        assert_false(type(const_.a[0]['c']) is const.ConstList)
+        item_reads = const_.instrumentation_snapshot()[
+            'constants']['a']['item_reads']
+        const_.a[0]['c'][0]
+        snapshot = const_.instrumentation_snapshot()
+        assert_equal(
+            snapshot['constants']['a']['item_reads'], item_reads + 3)
+        unpickled_record = pickle.loads(pickle.dumps(const_.a[0]))
+        assert_true(type(unpickled_record) is record_class)
+        const_.disable_instrumentation()
+        assert_true(type(const_.a[0]) is record_class)
+        assert_true(type(const_.a[0]['c']) is const.ConstList)
+
+    def test_disable_instrumentation(self):
+        const_ = Const()
+        const_.a = {'b': [100]}
+        const_.disable_instrumentation()
+        const_.enable_instrumentation()
+        const_.c = [{'d': 100}]
+        const_.disable_instrumentation()
+        assert_true(type(const_) is Const)
+        assert_true(type(const_.a) is const.ConstDict)
+        assert_true(type(const_.a['b']) is const.ConstList)
+        assert_true(type(const_.c[0]) is const.ConstDict)
+        assert_false('_instrumentation_targets' in const_.a.__dict__)
+
+        # The node that is shared with the child namespace keeps
+        # being recorded by the instrumentation of the child.
+        child = const_.new_child()
+        const_.enable_instrumentation()
+        child.enable_instrumentation()
+        const_.disable_instrumentation()
+        assert_false(type(child.a) is const.ConstDict)
+        child.disable_instrumentation()
+        assert_true(type(child.a) is const.ConstDict)
+        assert_false('_instrumentation_targets' in const_.a.__dict__)
+
+        _ = const_.a
+        snapshot = const_.instrumentation_snapshot()
+        assert_false(snapshot['enabled'])
+        assert_equal(snapshot['constants']['a']['reads'], 0)
+
+    def test_instrumentation_snapshot(self):
+        const_ = Const()
+        try:
+            const_.instrumentation_snapshot()
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('ConstantError not raised.')
+
+        const_.a = {'b': [100, 200]}
+        const_.enable_instrumentation()
+        const_.c = 300
+        const_.d = {'e': 400}
+        _ = const_.a['b'][0]
+        _ = const_.a.get('b')
+        _ = const_.c
+        _ = const_.c
+        for const_name, const_value in [('c', 500), ('ConstDict', 500)]:
+            try:
+                setattr(const_, const_name, const_value)
+            except const.ConstantError:
+                pass
+        try:
+            const_.a['b'].append(300)
+        except const.ConstantError:
+            pass
+        try:
+            del const_.c
+        except const.ConstantError:
+            pass
+
+        snapshot = const_.instrumentation_snapshot()
+        assert_true(snapshot['enabled'])
+        stats = snapshot['constants']
+        assert_equal(stats['a']['reads'], 3)
+        assert_equal(stats['a']['item_reads'], 4)
+        assert_equal(stats['a']['rejected_mutations'], 1)
+        assert_true(stats['a']['freeze_seconds'] is None)
+        assert_true(stats['a']['first_access'] is not None)
+        assert_equal(stats['c']['reads'], 2)
+        assert_equal(stats['c']['rejected_mutations'], 2)
+        assert_equal(stats['c']['freeze_size'], 1)
+        assert_true(stats['c']['freeze_seconds'] >= 0)
+        assert_equal(stats['d']['freeze_size'], 2)
+        assert_equal(stats['ConstDict']['rejected_mutations'], 1)
+        assert_equal(snapshot['unread_names'], ['d'])
+        assert_equal(snapshot['rejected_mutations'], 4)
+
+        snapshot['constants']['c']['reads'] = 100
+        assert_equal(
+            const_.instrumentation_snapshot()['constants']['c']['reads'], 2)
+        const_.disable_instrumentation()
+
+        # Iteration, membership test and views are also item reads,
+        # and the shared node is recorded for all constants.
+        const_ = Const()
+        const_.a = {'b': [100, 200]}
+        const_.c = const_.a
+        const_.f = [{'g': 100}]
+        const_.h = 'apple'
+        child = const_.new_child()
+        const_.enable_instrumentation()
+        child.enable_instrumentation()
+        const_.i = [300]
+        _ = list(const_.a)
+        _ = 'b' in const_.a
+        _ = list(const_.a.items())
+        _ = 100 in const_.f[0].values()
+        _ = const_.f.index(const_.f[0])
+        _ = child.i[0]
+        stats = const_.instrumentation_snapshot()['constants']
+        assert_equal(stats['a']['item_reads'], 3)
+        assert_equal(stats['c']['item_reads'], 3)
+        assert_equal(stats['f']['item_reads'], 4)
+        assert_equal(stats['i']['item_reads'], 1)
+        snapshot = child.instrumentation_snapshot()
+        assert_equal(snapshot['constants']['i']['item_reads'], 1)
+        assert_equal(snapshot['constants']['i']['reads'], 1)
+        assert_equal(snapshot['unread_names'], ['h'])
+        child.disable_instrumentation()
+        const_.disable_instrumentation()
+
+    def test_memory_report(self):
+        const_ = Const()
+        const_.a = {'b': [100, 200]}
+        const_.c = const_.a
+        const_.d = 'apple'
+        report = const_.memory_report()
+        constants = report['constants']
+        assert_equal(sorted(constants.keys()), ['a', 'c', 'd'])
+        assert_true(constants['a']['data'] >= sys.getsizeof(const_.a))
+        assert_true(
+            constants['a']['overhead']
+            >= sys.getsizeof(const_.a._original_dict))
+        assert_equal(
+            constants['a']['total'],
+            constants['a']['data'] + constants['a']['overhead'])
+        assert_equal(
+            constants['c'], {'data': 0, 'overhead': 0, 'total': 0})
+        assert_equal(constants['d']['data'], sys.getsizeof('apple'))
+        assert_equal(constants['d']['overhead'], 0)
+        assert_equal(
+            report['total'],
+            sum(sizes['total'] for sizes in constants.values()))
+
+        const_.enable_columnar_records(min_rows=2)
+        const_.e = [{'f': i} for i in range(100)]
+        const_.disable_columnar_records()
+        const_.g = [{'f': i} for i in range(100)]
+        constants = const_.memory_report()['constants']
+        assert_true(constants['e']['total'] < constants['g']['total'])
+
+        const_.enable_shape_records(min_count=2)
+        text = 'x' * 1000
+        const_.h = [{'i': text, 'j': [1]}, {'i': 'y', 'j': [2]}]
+        constants = const_.memory_report()['constants']
+        assert_true(
+            constants['h']['data']
+            >= sys.getsizeof(text) + sys.getsizeof(const_.h[0]['j']))
+
+    def test__define_many(self):
+        const_ = Const()
+        const_.a = 100
+        for items in [
+                [('b', 200, 'x'), ('b', 300, 'y')],
+                [('b', 200, 'x'), ('a', 300, 'y')],
+                [('b', 200, 'x'), ('ConstDict', 300, 'y')]]:
+            try:
+                const_._define_many(items=items)
+            except const.ConstantError:
+                pass
+            else:
+                raise AssertionError('ConstantError not raised.')
+            assert_false(const_._has_key('b'))
+
+        const_._define_many(items=[('b', {'c': [200]}, 'x'), ('d', 300, 'y')])
+        assert_true(isinstance(const_.b, const.ConstDict))
+        assert_true(isinstance(const_.b['c'], const.ConstList))
+        assert_equal(const_.d, 300)
+        assert_equal(const_._get_sorted_names(), ['a', 'b', 'd'])
+
+    def test_load_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for i in range(4):
+                path = os.path.join(tmp_dir, 'constants_%d.json' % i)
+                with open(path, 'w') as f:
+                    json.dump({'A_%d' % i: i, 'B_%d' % i: {'c': [i]}}, f)
+                paths.append(path)
+
+            const_ = Const()
+            names = const_.load_files(paths=paths, max_workers=2)
+            assert_equal(names[:4], ['A_0', 'B_0', 'A_1', 'B_1'])
+            assert_equal(const_.A_3, 3)
+            assert_true(isinstance(const_.B_3, const.ConstDict))
+            assert_true(isinstance(const_.B_3['c'], const.ConstList))
+
+            const_ = Const()
+            const_.load_files(paths=paths)
+            assert_equal(const_.A_1, 1)
+
+            duplicated_path = os.path.join(tmp_dir, 'duplicated.json')
+            with open(duplicated_path, 'w') as f:
+                json.dump({'Z': 100, 'A_0': 100}, f)
+            const_ = Const()
+            try:
+                const_.load_files(
+                    paths=paths + [duplicated_path], max_workers=2)
+            except const.ConstantError:
+                pass
+            else:
+                raise AssertionError('ConstantError not raised.')
+            assert_equal(const_._get_sorted_names(), [])
+
+            list_path = os.path.join(tmp_dir, 'list.json')
+            with open(list_path, 'w') as f:
+                json.dump([100], f)
+            try:
+                const_.load_files(paths=[list_path])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('ValueError not raised.')
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_load_env(self):
+        environ = {
+            'APP__DEBUG': 'Yes',
+            'APP__DB__HOST': 'localhost',
+            'APP__DB__PORT': '5432',
+            'APP__HOSTS': '["a", "b"]',
+            'APP__OPTIONS': '{"c": [1]}',
+            'APP_RATE': '1.5',
+            'APP__LEVEL': 'debug',
+            'APPLICATION_NAME': 'apple',
+            'OTHER': '100',
+        }
+        const_ = Const()
+        names = const_.load_env(prefix='APP', schema={
+            'DEBUG': bool, 'DB': {'PORT': int}, 'HOSTS': list,
+            'OPTIONS': dict, 'RATE': float, 'LEVEL': str.upper,
+        }, environ=environ)
+        assert_equal(
+            names, ['DB', 'DEBUG', 'HOSTS', 'LEVEL', 'OPTIONS', 'RATE'])
+        assert_true(const_.DEBUG is True)
+        assert_equal(const_.DB, {'HOST': 'localhost', 'PORT': 5432})
+        assert_true(isinstance(const_.DB, const.ConstDict))
+        assert_equal(const_.HOSTS, ['a', 'b'])
+        assert_true(isinstance(const_.HOSTS, const.ConstList))
+        assert_true(isinstance(const_.OPTIONS['c'], const.ConstList))
+        assert_equal(const_.RATE, 1.5)
+        assert_equal(const_.LEVEL, 'DEBUG')
+        assert_false(const_._has_key('OTHER'))
+        assert_false(const_._has_key('LICATION_NAME'))
+
+        const_ = Const()
+        names = const_.load_env(prefix='APP_', schema={
+            'DB': {'PORT': int, 'TLS': {'ENABLED': bool}},
+        }, environ={
+            'APP__DB': '{"HOST": "a", "PORT": "5432", '
+                       '"TLS": {"ENABLED": "on"}}',
+            'APPLICATION_NAME': 'apple',
+        })
+        assert_equal(names, ['DB'])
+        assert_equal(
+            const_.DB,
+            {'HOST': 'a', 'PORT': 5432, 'TLS': {'ENABLED': True}})
+
+        invalid_environs = [
+            {'APP__PORT': 'a'},
+            {'APP__DEBUG': 'maybe'},
+            {'APP__HOSTS': '{"a": 1}'},
+            {'APP__DB': 'a', 'APP__DB__HOST': 'b'},
+            {'APP__DB__HOST': 'b', 'APP__DB': 'a'},
+            {'APP__CACHE': '{"SIZE": "large"}'},
+            {'APP__CACHE': '{"SIZE": 1.5}'},
+            {'APP__CACHE': '{"TLS": true}'},
+        ]
+        for environ in invalid_environs:
+            const_ = Const()
+            try:
+                const_.load_env(prefix='APP', schema={
+                    'PORT': int, 'DEBUG': bool, 'HOSTS': list,
+                    'CACHE': {'SIZE': int, 'TLS': {'ENABLED': bool}}},
+                    environ=environ)
+            except ValueError:
+                assert_equal(const_._get_sorted_names(), [])
+                continue
+            raise AssertionError('Invalid environment is accepted.')
+
+        const_ = Const()
+        const_.A = 100
+        try:
+            const_.load_env(environ={'A': '200', 'B': '300'})
+        except const.ConstantError:
+            assert_false(const_._has_key('B'))
+        else:
+            raise AssertionError('Defined constant is overwritten.')
+
+        os.environ['PCONST_TEST__VALUE'] = '100'
+        try:
+            const_ = Const()
+            const_.load_env(prefix='PCONST_TEST', schema={'VALUE': int})
+            assert_equal(const_.VALUE, 100)
+        finally:
+            del os.environ['PCONST_TEST__VALUE']
+
+    def test_set_schema(self):
+        const_ = Const()
+        const_.a = {'b': 100}
+        try:
+            const_.set_schema(schema={'a': {'b': str}})
+        except const.ConstantSchemaError as e:
+            assert_equal(
+                str(e),
+                'Constant value of "a[\'b\']" does not match the schema: '
+                'expected str, got int.')
+        else:
+            raise AssertionError('ConstantSchemaError not raised.')
+        assert_true(const_._schema is None)
+        try:
+            const_.set_schema(schema={'c': int}, strict=True)
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('ConstantError not raised.')
+        try:
+            const_.set_schema(schema={'c': 'int'})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('ValueError not raised.')
+
+        const_.set_schema(schema={
+            'a': {'b': int},
+            'PORT': const.SchemaRange(1, 65535, value_type=int),
+            'RATE': float,
+            'HOSTS': [str],
+            'RECORDS': [{'id': int, 'tags': [str]}],
+            'ANY': None,
+            'EVEN': lambda value: value % 2 == 0,
+        })
+        const_.PORT = 8080
+        const_.RATE = 1
+        const_.HOSTS = ['a', 'b']
+        const_.RECORDS = [{'id': 1, 'tags': ['x']}, {'id': 2, 'tags': []}]
+        const_.ANY = [object()]
+        const_.EVEN = 2
+        const_.OTHER = 'apple'
+        assert_true(isinstance(const_.RECORDS[0], const.ConstDict))
+
+        for const_name, const_value, err_msg in [
+                ('PORT', 0, 'expected value >= 1, got 0.'),
+                ('PORT', True, 'expected int, got bool.'),
+                ('RATE', 'a', 'expected float, got str.'),
+                ('HOSTS', 'a', 'expected list, got str.'),
+                ('HOSTS', ['a', 1], 'expected str, got int.'),
+                ('RECORDS', [{'id': 1}], "missing keys: ['tags']."),
+                ('RECORDS', [{'id': 1, 'tags': [], 'c': 1}],
+                 "unknown keys: ['c']."),
+                ('RECORDS', [{'id': 1, 'tags': [1]}],
+                 'expected str, got int.'),
+                ('EVEN', 3, '3 is rejected by <lambda>.')]:
+            try:
+                const_._freeze_const_value(
+                    name=const_name, value=const_value)
+            except const.ConstantSchemaError as e:
+                assert_equal(e.err_msg, err_msg)
+                assert_equal(e.path[-1], const_name)
+                continue
+            raise AssertionError(
+                'ConstantSchemaError not raised: %s' % const_name)
+
+        const_.set_schema(schema={'RECORDS_2': [{'id': int, 'tags': [str]}]})
+        try:
+            const_.RECORDS_2 = [{'id': 1, 'tags': ['x', 2]}]
+        except const.ConstantSchemaError as e:
+            assert_equal(e.path, [1, 'tags', 0, 'RECORDS_2'])
+        else:
+            raise AssertionError('ConstantSchemaError not raised.')
+
+        const_ = Const()
+        const_.set_schema(schema={'a': {'b': int}}, strict=True)
+        const_.a = {'b': 100}
+        try:
+            const_.NEW_NAME = 100
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('ConstantError not raised.')
+
+    def test__freeze_const_value(self):
+        const_ = Const()
+        const_.enable_columnar_records(min_rows=2)
+        const_.set_schema(schema={'a': [{'b': int, 'c': [int]}]})
+        records = [{'b': 1, 'c': [1]}, {'b': 2, 'c': [2]}]
+        value = const_._freeze_const_value(name='a', value=records)
+        assert_true(isinstance(value, const.ConstRecordList))
+        assert_true(isinstance(value[1]['c'], const.ConstList))
+        try:
+            const_._freeze_const_value(
+                name='a', value=[{'b': 1, 'c': [1]}, {'b': 2, 'c': ['x']}])
+        except const.ConstantSchemaError as e:
+            assert_equal(e.path, [0, 'c', 1, 'a'])
+            assert_equal(
+                str(e),
+                'Constant value of "a[1][\'c\'][0]" does not match '
+                'the schema: expected int, got str.')
+        else:
+            raise AssertionError('ConstantSchemaError not raised.')
+        frozen_value = const.ConstList(list_value=[{'b': 1, 'c': ['x']}])
+        try:
+            const_._freeze_const_value(name='a', value=frozen_value)
+        except const.ConstantSchemaError as e:
+            assert_equal(e.path, [0, 'c', 0, 'a'])
+        else:
+            raise AssertionError('ConstantSchemaError not raised.')
+
+    def test_memoize(self):
+        const_ = Const()
+        const_.ROUTES = [{'path': '/a'}, {'path': '/b'}]
+        const_.OTHER_ROUTES = [{'path': '/a'}, {'path': '/b'}]
+        calls = []
+
+        @const_.memoize(maxsize=2)
+        def compile_routes(routes, prefix=''):
+            calls.append(routes)
+            return {prefix + route['path']: route for route in routes}
+
+        result = compile_routes(const_.ROUTES)
+        assert_equal(result, {'/a': {'path': '/a'}, '/b': {'path': '/b'}})
+        assert_true(compile_routes(const_.ROUTES) is result)
+        assert_true(compile_routes(const_.OTHER_ROUTES) is not result)
+        compile_routes(const_.ROUTES, prefix='/v1')
+        compile_routes(const_.ROUTES, prefix='/v1')
+        assert_equal(len(calls), 3)
+        assert_equal(compile_routes.cache_info(), {
+            'hits': 2, 'misses': 3, 'evictions': 1, 'size': 2,
+            'maxsize': 2})
+        assert_equal(compile_routes.__name__, 'compile_routes')
+
+        compile_routes.cache_clear()
+        assert_equal(compile_routes.cache_info()['size'], 0)
+        compile_routes(const_.ROUTES)
+        assert_equal(len(calls), 4)
+
+        @const_.memoize
+        def get_length(value):
+            return len(value)
+
+        assert_equal(get_length('abc'), 3)
+        assert_equal(get_length.cache_info()['maxsize'], 128)
+        try:
+            get_length([1])
+        except TypeError:
+            pass
+        else:
+            raise AssertionError('Unhashable argument is accepted.')
+        for maxsize in [0, -1, 1.5, True]:
+            try:
+                const_.memoize(maxsize=maxsize)
+            except ValueError:
+                continue
+            raise AssertionError('Invalid maxsize is accepted.')
+
+    def test_register_freezer(self):
+
+        class Point(object):
+
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class Point3D(Point):
+            pass
+
+        const_ = Const()
+        const_.register_freezer(Point, lambda value: (value.x, value.y))
+        try:
+            const_.a = Point(1, 2)
+            const_.b = {'c': [Point3D(3, 4)]}
+            assert_equal(const_.a, (1, 2))
+            assert_equal(const_.b['c'][0], (3, 4))
+
+            # The returned value is also converted.
+            const_.register_freezer(Point, lambda value: [value.x, [1]])
+            const_.d = Point(5, 6)
+            assert_true(isinstance(const_.d, const.ConstList))
+            assert_true(isinstance(const_.d[1], const.ConstList))
+            try:
+                const_.d.append(7)
+            except const.ConstantError:
+                pass
+            else:
+                raise AssertionError('ConstantError not raised.')
+            point = Point(7, 8)
+            const_.register_freezer(Point, lambda value: value)
+            const_.e = point
+            assert_true(const_.e is point)
+        finally:
+            const_.unregister_freezer(Point)
+        const_.f = Point(9, 10)
+        assert_true(isinstance(const_.f, Point))
+
+        for value_type in [Point, dict]:
+            try:
+                const_.unregister_freezer(value_type)
+            except ValueError:
+                continue
+            raise AssertionError('ValueError not raised: %s' % value_type)
+        const_.register_freezer(dict, lambda value: tuple(value))
+        const_.unregister_freezer(dict)
+        const_.g = {'h': 100}
+        assert_true(isinstance(const_.g, const.ConstDict))
+
+    def test_adopt(self):
+        const_ = Const()
+        value = {'a': [{'b': 100}]}
+        const_.c = value
+        assert_equal(type(value['a']), list)
+
+        const_.adopt('d', value)
+        assert_true(const_.d._original_dict is value)
+        assert_true(isinstance(value['a'], const.ConstList))
+        assert_equal(const_.d['a'][0]['b'], 100)
+        assert_equal(const_.names_with_prefix(prefix='d'), ['d'])
+
+        try:
+            const_.adopt('d', {'a': 200})
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('Re-definition by adopt is not rejected.')
+        try:
+            const_.adopt('adopt', 100)
+        except const.ConstantError:
+            return
+        raise AssertionError('Not settable name is accepted by adopt.')
+
+    def test_new_child(self):
+        base = Const()
+        base.a = 100
+        base.b = {'c': 200}
+        base.enable_columnar_records(min_rows=2)
+        environment = base.new_child()
+        environment.a = 300
+        tenant = environment.new_child()
+        assert_true(tenant._parent is environment)
+        assert_equal(tenant.a, 300)
+        assert_true(tenant.b is base.b)
+        assert_equal(base.a, 100)
+
+        base.d = 400
+        environment.e = 500
+        assert_equal(tenant.d, 400)
+        assert_equal(tenant.e, 500)
+        tenant.d = 600
+        assert_equal(tenant.d, 600)
+        assert_equal(environment.d, 400)
+        assert_equal(tenant.names_with_prefix(prefix=''), ['d'])
+
+        base.accept_same_value()
+        base.d = 400
+        assert_equal(environment.d, 400)
+        assert_equal(tenant.d, 600)
+
+        tenant.f = [{'g': 1}, {'g': 2}]
+        assert_true(isinstance(tenant.f, const.ConstRecordList))
+        assert_raises_if_const_added(const_name='new_child', const_value=1)
+        try:
+            tenant.h
+        except const.ConstantError:
+            return
+        raise AssertionError('Undefined constant is read from child.')
+
+    def test_export_shared(self):
+        const_ = Const()
+        const_.a = {'b': [100]}
+        const_.c = const.ConstGroup('C', {'D': 1})
+        buffer = const_.export_shared()
+        disk_dict = const.DiskConstDict.from_buffer(buffer=buffer)
+        assert_equal(list(disk_dict), ['a', 'c'])
+        assert_equal(disk_dict['a'], {'b': [100]})
+
+        attached_const = Const()
+        attached_const.attach_shared(shared=buffer)
+        assert_equal(attached_const.export_shared(), buffer)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'shared.pconst')
+            assert_equal(const_.export_shared(path=path), path)
+            with open(path, 'rb') as f:
+                assert_equal(f.read(), buffer)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_attach_shared(self):
+        source_const = Const()
+        source_const.a = {'b': [100]}
+        source_const.c = 200
+        buffer = source_const.export_shared()
+
+        const_ = Const()
+        assert_equal(const_.attach_shared(shared=buffer), ['a', 'c'])
+        assert_true(const_._has_key('a'))
+        assert_false('a' in const_.__dict__)
+        assert_true(isinstance(const_.a['b'], const.ConstList))
+        assert_true('a' in const_.__dict__)
+        assert_false('a' in const_._shared_names)
+        assert_equal(const_.names_with_prefix(prefix=''), ['a', 'c'])
+        assert_true('c' in const_._shared_names)
+        assert_raises_if_const_added_to(
+            const_=const_, const_name='c', const_value=300)
+        assert_equal(const_.c, 200)
+
+        const_ = Const()
+        const_.set_schema(schema={'c': str})
+        const_.attach_shared(shared=buffer)
+        try:
+            const_.c
+        except const.ConstantSchemaError:
+            assert_true('c' in const_._shared_names)
+            assert_equal(const_._get_sorted_names(), ['a', 'c'])
+        else:
+            raise AssertionError('Schema is not validated.')
+
+        const_ = Const()
+        const_.attach_shared(shared=buffer)
+        assert_equal(const_.to_json(), '{"a":{"b":[100]},"c":200}')
+        assert_equal(const_._shared_names, {})
+        assert_equal(const_._get_sorted_names(), ['a', 'c'])
+
+        const_ = Const()
+        const_.attach_shared(shared=buffer)
+        assert_equal(const_.names_of_value(value=200), ['c'])
+        assert_equal(
+            sorted(const_.memory_report()['constants']), ['a', 'c'])
+
+        const_ = Const()
+        const_.attach_shared(shared=buffer)
+        child = const_.new_child()
+        assert_equal(child.c, 200)
+        grandchild = child.new_child()
+        override_const = Const()
+        override_const.c = 300
+        child.attach_shared(shared=override_const.export_shared())
+        assert_equal(child._shared_names, {})
+        assert_equal(child.c, 300)
+        assert_equal(grandchild.c, 300)
+
+        const_ = Const()
+        const_.accept_same_value()
+        const_.attach_shared(shared=buffer)
+        assert_raises_if_const_added_to(
+            const_=const_, const_name='c', const_value=None)
+        assert_equal(const_.c, 200)
+        const_.c = 200
+
+        const_ = Const()
+        const_.attach_shared(shared=buffer)
+        const_.enable_instrumentation()
+        const_.a['b']
+        snapshot = const_.instrumentation_snapshot()
+        assert_equal(snapshot['unread_names'], ['c'])
+        assert_equal(snapshot['constants']['a']['reads'], 1)
+        assert_equal(snapshot['constants']['a']['item_reads'], 1)
+
+        const_ = Const()
+        const_.c = 300
+        try:
+            const_.attach_shared(shared=buffer)
+        except const.ConstantError:
+            assert_equal(const_._shared_names, {})
+        else:
+            raise AssertionError('Defined constant is overwritten.')
+
+    def test_to_json(self):
+        const_ = Const()
+        assert_equal(const_.to_json(), '{}')
+        const_.b = {'c': [100]}
+        const_.a = 'd'
+        assert_equal(const_.to_json(), '{"a":"d","b":{"c":[100]}}')
+        assert_equal(const_.b._json_cache, '{"c":[100]}')
+        const_.e = 1.5
+        assert_equal(
+            const_.to_json(), '{"a":"d","b":{"c":[100]},"e":1.5}')
+
+    def test_to_msgpack(self):
+        const_ = Const()
+        const_.b = {'c': [100]}
+        const_.a = 'd'
+        assert_msgpack_equal(
+            export_func=const_.to_msgpack,
+            expected_value={'a': 'd', 'b': {'c': [100]}})
+
+
+class TestFreezeValue(TestCase):
+
+    def test__freeze_value(self):
+        Pair = namedtuple('Pair', ['key', 'value'])
+        const_ = Const()
+        const_.a = ([1, 2], {'b': 3}, 'c')
+        const_.d = {'e': {1, 2}, 'f': bytearray(b'gh'), 'i': (1, 2)}
+        const_.j = [Pair('k', [1])]
+        assert_true(isinstance(const_.a, tuple))
+        assert_true(isinstance(const_.a[0], const.ConstList))
+        assert_true(isinstance(const_.a[1], const.ConstDict))
+        assert_equal(const_.d['e'], frozenset([1, 2]))
+        assert_true(isinstance(const_.d['e'], frozenset))
+        assert_equal(const_.d['f'], b'gh')
+        assert_true(isinstance(const_.d['f'], bytes))
+        assert_true(isinstance(const_.j[0], Pair))
+        assert_true(isinstance(const_.j[0].value, const.ConstList))
+
+        tuple_value = (1, 'a', (2, 3))
+        assert_true(_freeze_value(value=tuple_value) is tuple_value)
+        const_dict = const.ConstDict(dict_val={'a': 1})
+        assert_true(_freeze_value(value=const_dict) is const_dict)
+        assert_equal(_freeze_value(value=100), 100)
+
+    def test__freezer_cache(self):
+        _freeze_value(value=OrderedDict())
+        assert_true(_FREEZER_CACHE[OrderedDict] is _FREEZER_CACHE[dict])
+        assert_true(_FREEZER_CACHE[int] is None)
+        assert_true(int in _FREEZER_CACHE)
+
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        record = _get_shape_record_class(keys=('x', 'z'))._from_dict(
+            dict_val={'x': 1, 'z': 2})
+        assert_true(_freeze_value(value=[group, record])[0] is group)
+        assert_false(type(group) in _FREEZER_CACHE)
+        assert_false(type(record) in _FREEZER_CACHE)
+        del record
+        gc.collect()
+        assert_false(
+            _get_shape_key(keys=('x', 'z')) in _SHAPE_RECORD_CLASSES)
+
 
 class TestConstDict(TestCase):
 
@@ -179,6 +1114,17 @@ class TestConstDict(TestCase):
             {'apple': 100})
         assert_equal(const_dict['apple'], 100)
 
+        dict_val = {'a': {'b': [100]}, 'c': 200}
+        const_dict = const.ConstDict(dict_val=dict_val)
+        assert_equal(type(dict_val['a']), dict)
+        assert_equal(type(dict_val['a']['b']), list)
+        assert_true(isinstance(const_dict['a']['b'], const.ConstList))
+
+        const_dict = const.ConstDict(dict_val=dict_val, adopt=True)
+        assert_true(const_dict._original_dict is dict_val)
+        assert_true(dict_val['a'] is const_dict['a'])
+        assert_true(isinstance(dict_val['a']['b'], const.ConstList))
+
     def test___setitem__(self):
         const_dict =  const.ConstDict(dict_val={'a': 100})
         try:
@@ -193,6 +1139,68 @@ class TestConstDict(TestCase):
         output_str = const_dict.__repr__()
         assert_equal(output_str, "{'a': 200}")
 
+    def test___reduce__(self):
+        const_dict = const.ConstDict(dict_val={'a': [100, {'b': 200}]})
+        unpickled_dict = pickle.loads(pickle.dumps(const_dict))
+        assert_true(isinstance(unpickled_dict, const.ConstDict))
+        assert_equal(unpickled_dict, {'a': [100, {'b': 200}]})
+        assert_true(isinstance(unpickled_dict['a'], const.ConstList))
+        assert_true(isinstance(unpickled_dict['a'][1], const.ConstDict))
+        assert_equal(unpickled_dict.__repr__(), const_dict.__repr__())
+
+        # copy and deepcopy also use __reduce__ method.
+        mutable_value = MutableValue()
+        const_dict = const.ConstDict(
+            dict_val={'a': [100], 'b': mutable_value})
+        copied_dict = copy(const_dict)
+        assert_true(isinstance(copied_dict, const.ConstDict))
+        assert_true(copied_dict['b'] is mutable_value)
+        copied_dict = deepcopy(const_dict)
+        assert_true(isinstance(copied_dict, const.ConstDict))
+        assert_true(isinstance(copied_dict['a'], const.ConstList))
+        assert_equal(copied_dict['a'], [100])
+        assert_false(copied_dict['b'] is mutable_value)
+        assert_equal(copied_dict['b'].items, [100])
+
+    def test_to_json(self):
+        dict_val = {
+            'a': [100, 1.5, None, True], 1: {'b': ('c', 'd')},
+            'e': {'f': {}}}
+        const_dict = const.ConstDict(dict_val=dict_val)
+        json_str = const_dict.to_json()
+        assert_equal(json_str, json.dumps(dict_val, separators=(',', ':')))
+        assert_equal(const_dict._json_cache, json_str)
+        assert_true(const_dict['e']._json_cache is None)
+        assert_true(const_dict.to_json() is json_str)
+        nested_json_str = const_dict['e'].to_json()
+        assert_equal(nested_json_str, '{"f":{}}')
+        assert_true(const_dict['e']._json_cache is nested_json_str)
+
+        const_dict = const.ConstDict(
+            dict_val={'a': {2, 1}, 'b': frozenset(['c', 1])})
+        json_value = json.loads(const_dict.to_json())
+        assert_equal(json_value['a'], [1, 2])
+        assert_equal(sorted(json_value['b'], key=str), [1, 'c'])
+
+        const_dict = const.ConstDict(dict_val={'a': object()})
+        try:
+            const_dict.to_json()
+        except TypeError:
+            return
+        raise AssertionError('TypeError not raised by not JSON value.')
+
+    def test_to_msgpack(self):
+        dict_val = {'a': [100, 1.5, None, b'b'], 1: {'c': list(range(20))}}
+        const_dict = const.ConstDict(dict_val=dict_val)
+        assert_msgpack_equal(
+            export_func=const_dict.to_msgpack, expected_value=dict_val)
+        if msgpack is not None:
+            assert_true(const_dict.to_msgpack() is const_dict._msgpack_cache)
+            assert_true(const_dict[1]._msgpack_cache is None)
+        assert_msgpack_equal(
+            export_func=const.ConstDict(dict_val={'a': {2, 1}}).to_msgpack,
+            expected_value={'a': [1, 2]})
+
     def test___delitem__(self):
         const_dict = const.ConstDict(dict_val={'a': 300})
         try:
@@ -273,6 +1281,63 @@ class TestConstList(TestCase):
         assert_equal(const_list[1][1], 400)
         assert_equal(const_list[2], 500)
 
+        list_value = [{'a': [100]}, [200]]
+        const_list = const.ConstList(list_value=list_value)
+        assert_equal(type(list_value[0]), dict)
+        assert_equal(type(list_value[0]['a']), list)
+        assert_equal(type(list_value[1]), list)
+        assert_true(isinstance(const_list[0]['a'], const.ConstList))
+
+        const_list = const.ConstList(list_value=list_value, adopt=True)
+        assert_true(const_list._original_list is list_value)
+        assert_true(list_value[0] is const_list[0])
+        assert_true(isinstance(list_value[0]['a'], const.ConstList))
+        assert_true(isinstance(list_value[1], const.ConstList))
+
+    def test___reduce__(self):
+        const_list = const.ConstList(list_value=[100, [200]])
+        unpickled_list = pickle.loads(pickle.dumps(const_list))
+        assert_true(isinstance(unpickled_list, const.ConstList))
+        assert_equal(unpickled_list, [100, [200]])
+        assert_true(isinstance(unpickled_list[1], const.ConstList))
+
+        sorted_list = const.SortedConstList(list_value=[100, 200])
+        unpickled_list = pickle.loads(pickle.dumps(sorted_list))
+        assert_true(isinstance(unpickled_list, const.SortedConstList))
+
+        # copy and deepcopy also use __reduce__ method.
+        mutable_value = MutableValue()
+        const_list = const.ConstList(list_value=[[100], mutable_value])
+        copied_list = copy(const_list)
+        assert_true(isinstance(copied_list, const.ConstList))
+        assert_true(copied_list[1] is mutable_value)
+        copied_list = deepcopy(const_list)
+        assert_true(isinstance(copied_list[0], const.ConstList))
+        assert_false(copied_list[1] is mutable_value)
+        assert_true(isinstance(
+            deepcopy(sorted_list), const.SortedConstList))
+
+    def test_to_json(self):
+        list_value = [100, 'a', [{'b': None}], {'c': [1.5]}]
+        const_list = const.ConstList(list_value=list_value)
+        json_str = const_list.to_json()
+        assert_equal(json_str, json.dumps(list_value, separators=(',', ':')))
+        assert_true(const_list[3]._json_cache is None)
+        assert_true(const_list.to_json() is json_str)
+
+        const_ = Const()
+        const_.enable_columnar_records(min_rows=2)
+        const_.a = [[{'b': 1, 'c': 'd'}, {'b': 2, 'c': 'e'}]]
+        assert_equal(
+            const_.a.to_json(), '[[{"b":1,"c":"d"},{"b":2,"c":"e"}]]')
+        assert_true(isinstance(const_.a[0], const.ConstRecordList))
+
+    def test_to_msgpack(self):
+        list_value = [100, 'a', [{'b': None}], {'c': list(range(70000))}]
+        const_list = const.ConstList(list_value=list_value)
+        assert_msgpack_equal(
+            export_func=const_list.to_msgpack, expected_value=list_value)
+
     def test_append(self):
         const_list = const.ConstList(list_value=[100])
         try:
@@ -370,6 +1435,29 @@ class TestConstList(TestCase):
         err_msg = 'Error not raised when __reversed__ method is called.'
         raise AssertionError(err_msg)
 
+    def test___iadd__(self):
+        const_list = const.ConstList(list_value=[100, 200])
+        try:
+            const_list += [300]
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('Error not raised when += is used.')
+        assert_equal(const_list, [100, 200])
+        assert_false(300 in const_list)
+        assert_equal(const_list.count(300), 0)
+
+    def test___imul__(self):
+        const_list = const.ConstList(list_value=[100, 200])
+        try:
+            const_list *= 2
+        except const.ConstantError:
+            pass
+        else:
+            raise AssertionError('Error not raised when *= is used.')
+        assert_equal(const_list, [100, 200])
+        assert_equal(const_list.count(100), 1)
+
     def test___setitem__(self):
         const_list = const.ConstList(list_value=[100])
         try:
@@ -383,3 +1471,643 @@ class TestConstList(TestCase):
         const_list = const.ConstList(list_value=[100, 200])
         output_str = const_list.__repr__()
         assert_equal(output_str, '[100, 200]')
+
+    def test_build_index(self):
+        const_list = const.ConstList(list_value=[100, 200, 100, [300]])
+        assert_true(const_list._first_positions is None)
+        const_list.build_index()
+        assert_equal(const_list._first_positions, {100: 0, 200: 1})
+        assert_equal(const_list._duplicate_positions, {100: [0, 2]})
+        assert_equal(const_list._unhashable_positions, [3])
+
+    def test___contains__(self):
+        const_list = const.ConstList(list_value=[100, 'a', [300]])
+        assert_true(100 in const_list)
+        assert_true('a' in const_list)
+        assert_true([300] in const_list)
+        assert_false(200 in const_list)
+        assert_false([400] in const_list)
+
+    def test_index(self):
+        const_list = const.ConstList(
+            list_value=[100, 200, 100, [300], 100])
+        assert_equal(const_list.index(100), 0)
+        assert_equal(const_list.index(100, 1), 2)
+        assert_equal(const_list.index(100, -1), 4)
+        assert_equal(const_list.index(200), 1)
+        assert_equal(const_list.index([300]), 3)
+        try:
+            const_list.index(100, 3, 4)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('ValueError not raised.')
+        try:
+            const_list.index(500)
+        except ValueError:
+            return
+        raise AssertionError('ValueError not raised.')
+
+    def test_count(self):
+        const_list = const.ConstList(
+            list_value=[100, 200, 100, [300], 100.0])
+        assert_equal(const_list.count(100), 3)
+        assert_equal(const_list.count(200), 1)
+        assert_equal(const_list.count([300]), 1)
+        assert_equal(const_list.count(500), 0)
+
+
+class TestSortedConstList(TestCase):
+
+    def test___init__(self):
+        assert_class_constructor_will_raise_error(
+            target_class=const.SortedConstList,
+            error_class=ValueError,
+            args=[[300, 100]])
+        for list_value in [[300, 100], [100, 'a']]:
+            try:
+                const.SortedConstList(list_value=list_value)
+            except ValueError:
+                continue
+            raise AssertionError('ValueError not raised: %s' % list_value)
+
+        sorted_list = const.SortedConstList(list_value=[100, 100, 200])
+        assert_true(isinstance(sorted_list, const.ConstList))
+        assert_equal(sorted_list, [100, 100, 200])
+        assert_false(sorted_list._is_constructor)
+
+    def test_floor(self):
+        sorted_list = const.SortedConstList(list_value=[100, 200, 300])
+        assert_equal(sorted_list.floor(250), 200)
+        assert_equal(sorted_list.floor(200), 200)
+        assert_equal(sorted_list.floor(1000), 300)
+        assert_true(sorted_list.floor(50) is None)
+
+    def test_ceiling(self):
+        sorted_list = const.SortedConstList(list_value=[100, 200, 300])
+        assert_equal(sorted_list.ceiling(150), 200)
+        assert_equal(sorted_list.ceiling(200), 200)
+        assert_equal(sorted_list.ceiling(50), 100)
+        assert_true(sorted_list.ceiling(1000) is None)
+
+    def test_rank(self):
+        sorted_list = const.SortedConstList(list_value=[100, 200, 300])
+        assert_equal(sorted_list.rank(50), 0)
+        assert_equal(sorted_list.rank(200), 1)
+        assert_equal(sorted_list.rank(250), 2)
+        assert_equal(sorted_list.rank(1000), 3)
+
+    def test_range_slice(self):
+        sorted_list = const.SortedConstList(
+            list_value=[100, 200, 300, 400])
+        sliced_list = sorted_list.range_slice(lower=200, upper=400)
+        assert_true(isinstance(sliced_list, const.SortedConstList))
+        assert_equal(sliced_list, [200, 300])
+        assert_equal(sorted_list.range_slice(lower=250), [300, 400])
+        assert_equal(sorted_list.range_slice(upper=250), [100, 200])
+        assert_equal(sorted_list.range_slice(lower=300, upper=100), [])
+
+    def test_set_to_const(self):
+        const.SORTED_CONST_LIST_TEST = const.SortedConstList(
+            list_value=[100, 200])
+        assert_true(
+            isinstance(const.SORTED_CONST_LIST_TEST, const.SortedConstList))
+        const_dict = const.ConstDict(
+            dict_val={'a': const.SortedConstList(list_value=[100])})
+        assert_true(isinstance(const_dict['a'], const.SortedConstList))
+
+
+class TestConstRecord(TestCase):
+
+    def test___getitem__(self):
+        record_list = const.ConstRecordList(
+            records=[{'a': 100, 'b': 'x'}, {'a': 200, 'b': 'y'}])
+        record = record_list[1]
+        assert_equal(record['a'], 200)
+        assert_equal(record['b'], 'y')
+        assert_equal(record.get('c', 300), 300)
+        assert_equal(list(record.keys()), ['a', 'b'])
+        assert_equal(len(record), 2)
+        assert_true('a' in record)
+        assert_false('c' in record)
+        assert_equal(record, {'a': 200, 'b': 'y'})
+
+    def test___repr__(self):
+        record_list = const.ConstRecordList(records=[{'a': 100}])
+        assert_equal(record_list[0].__repr__(), "{'a': 100}")
+
+    def test___setitem__(self):
+        record_list = const.ConstRecordList(records=[{'a': 100}])
+        record = record_list[0]
+        for method, args in [
+                (record.__setitem__, ['a', 200]),
+                (record.__delitem__, ['a']),
+                (record.clear, []),
+                (record.update, [{'a': 200}]),
+                (record.pop, ['a']),
+                (record.popitem, []),
+                (record.setdefault, ['b', 200])]:
+            try:
+                method(*args)
+            except const.ConstantError:
+                continue
+            raise AssertionError('ConstantError not raised: %s' % method)
+
+
+class TestConstRecordList(TestCase):
+
+    def test___init__(self):
+        assert_class_constructor_will_raise_error(
+            target_class=const.ConstRecordList,
+            error_class=ValueError,
+            args=[[{'a': 100}, {'b': 200}]])
+
+        record_list = const.ConstRecordList(
+            records=[
+                {'a': 100, 'b': 1.5, 'c': 'x', 'd': [1]},
+                {'a': 200, 'b': 2.5, 'c': 'y', 'd': [2]}])
+        assert_equal(record_list._keys, ('a', 'b', 'c', 'd'))
+        assert_equal(record_list._columns['a'].typecode, 'q')
+        assert_equal(record_list._columns['b'].typecode, 'd')
+        assert_equal(record_list._columns['c'], ('x', 'y'))
+        assert_true(
+            isinstance(record_list._columns['d'][0], const.ConstList))
+        assert_equal(len(record_list), 2)
+
+        # Value checks of the record schema are applied to all rows.
+        const_ = Const()
+        const_.enable_columnar_records(min_rows=2)
+        const_.set_schema(schema={
+            'a': [lambda record: record['price'] > 0],
+            'b': [{'price': const.SchemaRange(minimum=0)}],
+        })
+        for name, expected_path in [
+                ('a', [2, 'a']), ('b', ['price', 2, 'b'])]:
+            try:
+                setattr(const_, name, [
+                    {'price': 100}, {'price': 200}, {'price': -5}])
+            except const.ConstantSchemaError as e:
+                assert_equal(e.path, expected_path)
+                continue
+            raise AssertionError('ConstantSchemaError not raised: %s' % name)
+        assert_equal(const_._get_sorted_names(), [])
+        const_.a = [{'price': 100}, {'price': 200}]
+        assert_true(isinstance(const_.a, const.ConstRecordList))
+
+    def test___getitem__(self):
+        record_list = const.ConstRecordList(
+            records=[{'a': 100}, {'a': 200}, {'a': 300}])
+        assert_equal(record_list[0]['a'], 100)
+        assert_equal(record_list[-1]['a'], 300)
+        assert_equal(
+            [record['a'] for record in record_list[1:]], [200, 300])
+        try:
+            record_list[3]
+        except IndexError:
+            return
+        raise AssertionError('IndexError not raised.')
+
+    def test_column(self):
+        record_list = const.ConstRecordList(
+            records=[{'a': 100, 'b': 'x'}, {'a': 200, 'b': 'y'}])
+        column = record_list.column('a')
+        assert_equal(sum(column), 300)
+        assert_true(column.readonly)
+        assert_equal(record_list.column('b'), ('x', 'y'))
+
+    def test___eq__(self):
+        records = [{'a': 100}, {'a': 200}]
+        record_list = const.ConstRecordList(records=records)
+        assert_true(record_list == records)
+        assert_false(record_list == [{'a': 100}])
+        assert_false(record_list == [{'a': 100}, {'a': 300}])
+
+    def test___repr__(self):
+        record_list = const.ConstRecordList(records=[{'a': 100}])
+        assert_equal(record_list.__repr__(), "[{'a': 100}]")
+
+    def test_append(self):
+        record_list = const.ConstRecordList(records=[{'a': 100}])
+        for method, args in [
+                (record_list.__setitem__, [0, {'a': 200}]),
+                (record_list.__delitem__, [0]),
+                (record_list.append, [{'a': 200}]),
+                (record_list.clear, []),
+                (record_list.extend, [[{'a': 200}]]),
+                (record_list.insert, [0, {'a': 200}]),
+                (record_list.pop, []),
+                (record_list.remove, [{'a': 100}]),
+                (record_list.reverse, []),
+                (record_list.sort, [])]:
+            try:
+                method(*args)
+            except const.ConstantError:
+                continue
+            raise AssertionError('ConstantError not raised: %s' % method)
+
+    def test_enable_columnar_records(self):
+        const_ = Const()
+        const_.enable_columnar_records(min_rows=2)
+        const_.a = [{'b': 100}, {'b': 200}]
+        const_.c = [{'b': 100}]
+        const_.d = {'e': [{'b': 100}, {'b': 200}]}
+        assert_true(isinstance(const_.a, const.ConstRecordList))
+        assert_true(isinstance(const_.c, const.ConstList))
+        assert_true(isinstance(const_.d['e'], const.ConstRecordList))
+
+        const_.disable_columnar_records()
+        const_.f = [{'b': 100}, {'b': 200}]
+        assert_true(isinstance(const_.f, const.ConstList))
+        assert_equal(const_._get_sorted_names(), ['a', 'c', 'd', 'f'])
+
+
+class TestConstShapeRecord(TestCase):
+
+    def _make_record(self):
+        record_class = _get_shape_record_class(keys=('a', 'b'))
+        return record_class._from_dict(dict_val={'a': 100, 'b': [1, 2]})
+
+    def test__from_dict(self):
+        record = self._make_record()
+        assert_true(isinstance(record, const.ConstShapeRecord))
+        assert_false(hasattr(record, '__dict__'))
+        assert_true(isinstance(record['b'], const.ConstList))
+        assert_true(
+            _get_shape_record_class(keys=('a', 'b')) is type(record))
+        record_class = _get_shape_record_class(keys=('x', 'y'))
+        assert_true(
+            _get_shape_key(keys=('x', 'y')) in _SHAPE_RECORD_CLASSES)
+        del record_class
+        gc.collect()
+        assert_false(
+            _get_shape_key(keys=('x', 'y')) in _SHAPE_RECORD_CLASSES)
+
+        record_class = _get_shape_record_class(keys=('a', 'b'))
+        const_ = Const()
+        const_.set_schema(schema={'x': {'a': int, 'b': [int]}})
+        validator = const_._schema['x']
+        try:
+            record_class._from_dict(
+                dict_val={'a': 100, 'b': ['c']}, validator=validator)
+        except const.ConstantSchemaError as e:
+            assert_equal(e.path, [0, 'b'])
+        else:
+            raise AssertionError('ConstantSchemaError not raised.')
+
+    def test___getitem__(self):
+        record = self._make_record()
+        assert_equal(record['a'], 100)
+        assert_equal(record.get('c', 300), 300)
+        assert_equal(record, {'a': 100, 'b': [1, 2]})
+        try:
+            record['c']
+        except KeyError:
+            pass
+        else:
+            raise AssertionError('KeyError not raised.')
+
+    def test___iter__(self):
+        record = self._make_record()
+        assert_equal(list(record), ['a', 'b'])
+        assert_equal(list(record.values()), [100, [1, 2]])
+
+    def test___len__(self):
+        record = self._make_record()
+        assert_equal(len(record), 2)
+
+    def test___contains__(self):
+        record = self._make_record()
+        assert_true('a' in record)
+        assert_false('c' in record)
+        assert_false([] in record)
+
+    def test___setattr__(self):
+        record = self._make_record()
+        for method, args in [
+                (record.__setattr__, ['_v0', 200]),
+                (record.__delattr__, ['_v0']),
+                (record.__setitem__, ['a', 200]),
+                (record.__delitem__, ['a']),
+                (record.update, [{'a': 200}]),
+                (record.pop, ['a'])]:
+            try:
+                method(*args)
+            except const.ConstantError:
+                continue
+            raise AssertionError('ConstantError not raised: %s' % method)
+        assert_equal(record['a'], 100)
+
+    def test___reduce__(self):
+        record = self._make_record()
+        unpickled_record = pickle.loads(pickle.dumps(record))
+        assert_true(type(unpickled_record) is type(record))
+        assert_equal(unpickled_record, record)
+
+    def test___repr__(self):
+        record = self._make_record()
+        assert_equal(record.__repr__(), "{'a': 100, 'b': [1, 2]}")
+
+    def test_enable_shape_records(self):
+        const_ = Const()
+        const_.enable_shape_records(min_count=2)
+        const_.a = [{'b': 100, 'c': {'d': 1}}, {'b': 200, 'c': {'d': 2}}]
+        const_.e = [{'b': 100}, {'f': 200}]
+        assert_true(isinstance(const_.a[0], const.ConstShapeRecord))
+        assert_true(isinstance(const_.a[1]['c'], const.ConstShapeRecord))
+        assert_true(isinstance(const_.e[0], const.ConstDict))
+        assert_equal(
+            json.loads(const_.a.to_json()),
+            [{'b': 100, 'c': {'d': 1}}, {'b': 200, 'c': {'d': 2}}])
+        assert_equal(
+            pickle.loads(pickle.dumps(const_.a)), const_.a)
+        child = const_.new_child()
+        child.g = [{'b': 100}, {'b': 200}]
+        assert_true(isinstance(child.g[0], const.ConstShapeRecord))
+
+        const_.i = [{True: 1}, {True: 2}]
+        const_.j = [{1: 1}, {1: 2}, {1.0: 3}, {1.0: 4}]
+        assert_equal(list(const_.i[0].keys()), [True])
+        assert_equal(list(const_.j[0].keys()), [1])
+        assert_true(type(list(const_.j[2].keys())[0]) is float)
+        assert_false(type(const_.i[0]) is type(const_.j[0]))
+        assert_equal(
+            const_.j.to_json(), '[{"1":1},{"1":2},{"1.0":3},{"1.0":4}]')
+
+        const_.disable_shape_records()
+        const_.h = [{'b': 100}, {'b': 200}]
+        assert_true(isinstance(const_.h[0], const.ConstDict))
+        assert_equal(
+            const_._get_sorted_names(), ['a', 'e', 'h', 'i', 'j'])
+
+
+class TestConstGroup(TestCase):
+
+    def test___new__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+        assert_true(isinstance(group, const.ConstGroup))
+        assert_equal(type(group).__name__, 'STATUS')
+        assert_equal(type(group).__slots__, ('ACTIVE', 'SUSPENDED'))
+        assert_false(hasattr(group, '__dict__'))
+        assert_equal(group.ACTIVE, 1)
+        assert_equal(group.SUSPENDED, 2)
+
+        group = const.ConstGroup('TIER', [('FREE', 'free'), ('PRO', 'pro')])
+        assert_equal(group.PRO, 'pro')
+
+        invalid_args_list = [
+            [100, {'A': 1}],
+            ['G', {'_A': 1}],
+            ['G', {'member_of': 1}],
+            ['G', {'1A': 1}],
+            ['G', [('A', 1), ('A', 2)]],
+            ['G', {'A': 1, 'B': 1}],
+            ['G', {'A': [1]}],
+        ]
+        for args in invalid_args_list:
+            assert_class_constructor_will_raise_error(
+                target_class=const.ConstGroup,
+                error_class=ValueError,
+                args=args)
+
+    def test_member_of(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+        member = group.member_of(2)
+        assert_equal(member.name, 'SUSPENDED')
+        assert_equal(member.value, 2)
+        assert_true(group.member_of(3) is None)
+        assert_true(group.member_of([1]) is None)
+
+    def test___getitem__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        assert_equal(group['ACTIVE'], 1)
+        try:
+            group['SUSPENDED']
+        except KeyError:
+            return
+        raise AssertionError('KeyError not raised.')
+
+    def test___contains__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        assert_true(1 in group)
+        assert_false(2 in group)
+        assert_false('ACTIVE' in group)
+        assert_false([1] in group)
+
+    def test___iter__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+        assert_equal(list(group), [('ACTIVE', 1), ('SUSPENDED', 2)])
+        assert_equal(dict(group), {'ACTIVE': 1, 'SUSPENDED': 2})
+
+    def test___len__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+        assert_equal(len(group), 2)
+
+    def test___setattr__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        for name in ['ACTIVE', 'SUSPENDED', '_members']:
+            try:
+                setattr(group, name, 2)
+            except const.ConstantError:
+                continue
+            raise AssertionError('Update of group member is not rejected.')
+        assert_equal(group.ACTIVE, 1)
+
+    def test___delattr__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        try:
+            del group.ACTIVE
+        except const.ConstantError:
+            return
+        raise AssertionError('Deletion of group member is not rejected.')
+
+    def test___copy__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        assert_true(copy(group) is group)
+
+    def test___deepcopy__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        assert_true(deepcopy(group) is group)
+
+    def test___reduce__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'SUSPENDED': 2})
+        unpickled_group = pickle.loads(pickle.dumps(group))
+        assert_equal(unpickled_group.SUSPENDED, 2)
+        assert_equal(unpickled_group.member_of(1).name, 'ACTIVE')
+        assert_equal(type(unpickled_group).__name__, 'STATUS')
+
+    def test___repr__(self):
+        group = const.ConstGroup('STATUS', {'ACTIVE': 1, 'NAME': 'a'})
+        assert_equal(group.__repr__(), "STATUS(ACTIVE=1, NAME='a')")
+
+    def test_set_to_const(self):
+        const_ = Const()
+        const_.STATUS = const.ConstGroup('STATUS', {'ACTIVE': 1})
+        assert_equal(const_.STATUS.ACTIVE, 1)
+        assert_equal(const_.names_of_value(value=const_.STATUS), ['STATUS'])
+
+
+class TestDiskConstDict(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'test.pconst')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test___init__(self):
+        not_disk_path = os.path.join(self.tmp_dir, 'not_disk.txt')
+        with open(not_disk_path, 'wb') as f:
+            f.write(b'apple')
+        assert_class_constructor_will_raise_error(
+            target_class=const.DiskConstDict,
+            error_class=ValueError,
+            args=[not_disk_path])
+        const.DiskConstDict.build(path=self.path, source={'a': 100}).close()
+        with open(self.path, 'rb') as f:
+            buffer = f.read()
+        for invalid_bytes in [b'', buffer[:-1]]:
+            with open(not_disk_path, 'wb') as f:
+                f.write(invalid_bytes)
+            try:
+                const.DiskConstDict(path=not_disk_path)
+            except ValueError:
+                continue
+            raise AssertionError('ValueError not raised.')
+
+        disk_dict = const.DiskConstDict(path=self.path)
+        assert_equal(disk_dict._length, 1)
+        assert_equal(disk_dict._capacity, 2)
+        assert_equal(disk_dict['a'], 100)
+        disk_dict.close()
+
+    def test_build(self):
+        json_path = os.path.join(self.tmp_dir, 'source.json')
+        with open(json_path, 'w') as f:
+            json.dump({'JP': {'capital': 'Tokyo'}}, f)
+        with const.DiskConstDict.build(
+                path=self.path, source=json_path) as disk_dict:
+            assert_equal(disk_dict['JP'], {'capital': 'Tokyo'})
+        assert_false(os.path.exists(self.path + '.tmp%d' % os.getpid()))
+
+        try:
+            const.DiskConstDict.build(path=self.path, source={1.5: 100})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('ValueError not raised.')
+        assert_false(os.path.exists(self.path + '.tmp%d' % os.getpid()))
+
+    def test_build_bytes(self):
+        buffer = const.DiskConstDict.build_bytes(source={'a': [100]})
+        assert_true(isinstance(buffer, bytes))
+        const.DiskConstDict.build(path=self.path, source={'a': [100]}).close()
+        with open(self.path, 'rb') as f:
+            assert_equal(f.read(), buffer)
+        try:
+            const.DiskConstDict.build_bytes(source=[100])
+        except ValueError:
+            return
+        raise AssertionError('ValueError not raised.')
+
+    def test_from_buffer(self):
+        buffer = const.DiskConstDict.build_bytes(
+            source={'a': {'b': [100]}, 1: 200})
+        disk_dict = const.DiskConstDict.from_buffer(buffer=buffer)
+        assert_true(disk_dict._mmap is buffer)
+        assert_true(isinstance(disk_dict['a']['b'], const.ConstList))
+        assert_equal(list(disk_dict), ['a', 1])
+        assert_true(1 in disk_dict)
+        assert_equal(
+            disk_dict.__repr__(), 'DiskConstDict(<%d bytes>)' % len(buffer))
+        unpickled_dict = pickle.loads(pickle.dumps(disk_dict))
+        assert_equal(unpickled_dict[1], 200)
+        disk_dict.close()
+
+        disk_dict = const.DiskConstDict.from_buffer(
+            buffer=memoryview(buffer))
+        assert_equal(disk_dict[1], 200)
+        assert_class_constructor_will_raise_error(
+            target_class=const.DiskConstDict.from_buffer,
+            error_class=ValueError,
+            args=[b'apple'])
+
+    def test___getitem__(self):
+        source = {'s%d' % i: i for i in range(1000)}
+        source.update({1: [100], b'b': {'c': [200]}})
+        with const.DiskConstDict.build(
+                path=self.path, source=source) as disk_dict:
+            assert_equal(disk_dict['s999'], 999)
+            assert_true(isinstance(disk_dict[1], const.ConstList))
+            assert_true(isinstance(disk_dict[b'b'], const.ConstDict))
+            assert_true(
+                isinstance(disk_dict[b'b']['c'], const.ConstList))
+            assert_equal(disk_dict.get('s1000'), None)
+            assert_equal(disk_dict[True], [100])
+            assert_equal(disk_dict[1.0], [100])
+            assert_true(disk_dict[b'b'] is disk_dict[b'b'])
+            assert_equal(disk_dict.get([1]), None)
+            try:
+                disk_dict['1']
+            except KeyError:
+                pass
+            else:
+                raise AssertionError('KeyError not raised.')
+
+        disk_dict = const.DiskConstDict(path=self.path, cache_size=1)
+        value = disk_dict[1]
+        assert_true(disk_dict[1] is value)
+        disk_dict[b'b']
+        assert_false(disk_dict[1] is value)
+        assert_equal(list(disk_dict._cache), [1])
+        disk_dict.close()
+
+    def test___contains__(self):
+        with const.DiskConstDict.build(
+                path=self.path, source={'a': 100, 2: 200}) as disk_dict:
+            assert_true('a' in disk_dict)
+            assert_true(2 in disk_dict)
+            assert_false('2' in disk_dict)
+            assert_false([2] in disk_dict)
+
+    def test___iter__(self):
+        source = {'a': 100, 2: 200, b'c': 300}
+        with const.DiskConstDict.build(
+                path=self.path, source=source) as disk_dict:
+            assert_equal(list(disk_dict), ['a', 2, b'c'])
+            assert_equal(len(disk_dict), 3)
+            assert_equal(disk_dict, source)
+
+        with const.DiskConstDict.build(
+                path=self.path, source={}) as disk_dict:
+            assert_equal(list(disk_dict), [])
+            assert_false('a' in disk_dict)
+
+    def test___repr__(self):
+        with const.DiskConstDict.build(
+                path=self.path, source={'a': 100}) as disk_dict:
+            assert_equal(
+                disk_dict.__repr__(), 'DiskConstDict(%r)' % self.path)
+
+    def test___reduce__(self):
+        with const.DiskConstDict.build(
+                path=self.path, source={'a': 100}) as disk_dict:
+            unpickled_dict = pickle.loads(pickle.dumps(disk_dict))
+            assert_equal(unpickled_dict['a'], 100)
+            unpickled_dict.close()
+
+    def test___setitem__(self):
+        with const.DiskConstDict.build(
+                path=self.path, source={'a': 100}) as disk_dict:
+            for method, args in [
+                    (disk_dict.__setitem__, ['a', 200]),
+                    (disk_dict.__delitem__, ['a']),
+                    (disk_dict.clear, []),
+                    (disk_dict.update, [{'a': 200}]),
+                    (disk_dict.pop, ['a'])]:
+                try:
+                    method(*args)
+                except const.ConstantError:
+                    continue
+                raise AssertionError(
+                    'ConstantError not raised: %s' % method)